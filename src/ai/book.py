@@ -0,0 +1,206 @@
+import argparse, mmap, random
+from array import array
+from bisect import bisect_left
+
+from src.engine.board_bitboard import BoardBitboard, squares
+from src.engine.symmetry import INVERSE, canonical, transform_square
+from src.ai.transposition import zobrist_hash
+
+# File layout, native byte order, one record per position sorted by key :
+#   magic (8 bytes) | n (Q) | keys Q[n] | scores f[n] | counts I[n] | moves B[n]
+# Each column is cast in place from the mapping, nothing is parsed on load.
+# Positions are stored in canonical form (cf engine.symmetry), symmetric
+# positions share one record ; moves are those of the canonical position.
+MAGIC = b"OTHBOOK2"
+HEADER_BYTES = 16
+
+
+def position_key(board: BoardBitboard, color: int) -> tuple[int, int]:
+    """
+    Book key of a position and the transform to its canonical form
+    """
+    white, black, t = canonical(board.white, board.black)
+    return zobrist_hash(white, black, color), t
+
+
+class OpeningBook:
+    """
+    Read-only, memory-mapped opening book. Positions are found by binary
+    search on the sorted Zobrist keys (~17 probes for 100k positions).
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mm)
+        if view[:8] != MAGIC:
+            view.release()
+            self._mm.close()
+            raise ValueError(f"Not an opening book : {path}")
+        n = view[8:16].cast("Q")[0]
+        o = HEADER_BYTES
+        self.keys = view[o : o + 8 * n].cast("Q")
+        o += 8 * n
+        self.scores = view[o : o + 4 * n].cast("f")
+        o += 4 * n
+        self.counts = view[o : o + 4 * n].cast("I")
+        o += 4 * n
+        self.moves = view[o : o + n]
+        self._view = view
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup(self, key: int) -> tuple[int, float, int] | None:
+        """
+        Returns (move, score, count) stored for key, or None
+        """
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return self.moves[i], self.scores[i], self.counts[i]
+        return None
+
+    def probe(
+        self, board: BoardBitboard, color: int
+    ) -> tuple[int, float, int] | None:
+        """
+        Book entry of a position, only if its move is legal there
+        """
+        key, t = position_key(board, color)
+        entry = self.lookup(key)
+        if entry is not None:
+            move = transform_square(entry[0], INVERSE[t])
+            if board.legal_moves_bb(color) >> move & 1:
+                self.hits += 1
+                return move, entry[1], entry[2]
+        self.misses += 1
+        return None
+
+    def close(self):
+        for col in (self.keys, self.scores, self.counts, self.moves, self._view):
+            col.release()
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BookBuilder:
+    """
+    Collects (position, move, score) samples from games or analysis and
+    writes the book, keeping the most played move of each position.
+    Scores are from the side to move point of view.
+    """
+
+    def __init__(self):
+        # key -> {move: [count, score sum]}
+        self.positions: dict[int, dict[int, list]] = {}
+
+    def add(self, board: BoardBitboard, color: int, move: int, score: float):
+        key, t = position_key(board, color)
+        move = transform_square(move, t)
+        stats = self.positions.setdefault(key, {}).setdefault(move, [0, 0.0])
+        stats[0] += 1
+        stats[1] += score
+
+    def add_game(self, moves: list[int], max_plies: int = 20):
+        """
+        Replays a game from the start position (passes are implicit) and adds
+        its first max_plies moves, scored with the final disc margin
+        """
+        board, color = BoardBitboard(), 2
+        played = []
+        for move in moves:
+            if not board.legal_moves_bb(color) >> move & 1:
+                color = 3 - color
+            played.append((board.copy(), color, move))
+            board.make(move, color)
+            color = 3 - color
+        margin = board.black.bit_count() - board.white.bit_count()
+        for b, c, move in played[:max_plies]:
+            self.add(b, c, move, margin if c == 2 else -margin)
+
+    def write(self, path: str, min_count: int = 1) -> int:
+        """
+        Writes the book, positions seen less than min_count times are dropped.
+        Ties on the count go to the best average score.
+        Returns the nb of positions written.
+        """
+        keys, scores, counts, moves = array("Q"), array("f"), array("I"), array("B")
+        for key in sorted(self.positions):
+            total = sum(n for n, _ in self.positions[key].values())
+            if total < min_count:
+                continue
+            move, (n, s) = max(
+                self.positions[key].items(),
+                key=lambda kv: (kv[1][0], kv[1][1] / kv[1][0]),
+            )
+            keys.append(key)
+            scores.append(s / n)
+            counts.append(total)
+            moves.append(move)
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(array("Q", [len(keys)]).tobytes())
+            for col in (keys, scores, counts, moves):
+                col.tofile(f)
+        return len(keys)
+
+
+def self_play(
+    n_games: int,
+    depth: int = 3,
+    random_plies: int = 6,
+    seed: int = 0,
+) -> list[list[int]]:
+    """
+    Games of negamax-ab against itself, after random_plies random moves so
+    the games spread over different openings
+    """
+    from src.ai.negamax import choose_move_negamax
+    from src.ai.transposition import TranspositionTable
+
+    rng = random.Random(seed)
+    tt = TranspositionTable(16)
+    games = []
+    for _ in range(n_games):
+        board, color, moves = BoardBitboard(), 2, []
+        while True:
+            legal = board.legal_moves_bb(color)
+            if not legal:
+                color = 3 - color
+                legal = board.legal_moves_bb(color)
+                if not legal:
+                    break
+            if len(moves) < random_plies:
+                move = rng.choice(list(squares(legal)))
+            else:
+                (r, c), _ = choose_move_negamax(board, color, depth, tt=tt)
+                move = r * 8 + c
+            board.make(move, color)
+            moves.append(move)
+            color = 3 - color
+        games.append(moves)
+    return games
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Builds an opening book")
+    parser.add_argument("out")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--plies", type=int, default=16, help="book depth")
+    parser.add_argument("--min-count", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    builder = BookBuilder()
+    for game in self_play(args.games, args.depth, seed=args.seed):
+        builder.add_game(game, args.plies)
+    n = builder.write(args.out, args.min_count)
+    print(f"{n} positions written to {args.out}")
@@ -0,0 +1,209 @@
+import time
+from dataclasses import dataclass
+
+from src.engine.board_bitboard import FULL, BoardBitboard, flips_bb, moves_bb, squares
+from src.ai.stability import stable_discs
+
+# Solver modes
+# - exact : final disc margin
+# - wld : win / loss / draw only (+1 / -1 / 0), null window, much faster
+SOLVE_MODES = ("exact", "wld")
+
+# above this nb of empties moves are sorted fastest-first (fewest replies)
+FASTEST_FIRST_EMPTIES = 7
+
+# stability cutoff, tried from this alpha (or -beta) by nb of empties : below
+# it the stable discs are too few to bound the score (thresholds from Edax)
+STABILITY_THRESHOLD = (
+    (99,) * 4
+    + (6, 8, 10, 12, 14, 16, 20, 22, 24, 26, 28, 30, 32, 34, 36, 38, 40, 42)
+    + (44, 46, 48, 48, 50, 50, 52, 52, 54, 54, 56, 56, 58, 58, 60, 60, 62, 62)
+    + (64,) * 25
+)
+
+# 4x4 quadrants, the parity regions
+QUADRANTS = (
+    0x000000000F0F0F0F,
+    0x00000000F0F0F0F0,
+    0x0F0F0F0F00000000,
+    0xF0F0F0F000000000,
+)
+
+
+@dataclass
+class SolveStats:
+    nodes: int = 0
+    ms: int = 0
+    stability_cuts: int = 0
+
+    @property
+    def nps(self) -> int:
+        return int(self.nodes * 1000 / self.ms) if self.ms else 0
+
+
+def _final_score(P: int, O: int) -> int:
+    """
+    Disc margin of a finished game, empties go to the winner
+    """
+    p, o = P.bit_count(), O.bit_count()
+    if p > o:
+        return 64 - 2 * o
+    if p < o:
+        return 2 * p - 64
+    return 0
+
+
+def _last1(P: int, O: int, idx: int, stats: SolveStats) -> int:
+    """
+    Exact score with one empty left (idx), no move generation
+    """
+    stats.nodes += 1
+    n = P.bit_count()
+    f = flips_bb(P, O, idx).bit_count()
+    if f:
+        # P fills the board
+        return 2 * (n + f + 1) - 64
+    f = flips_bb(O, P, idx).bit_count()
+    if f:
+        return 2 * (n - f) - 64
+    # nobody can play the last square
+    return _final_score(P, O)
+
+
+def _last2(
+    P: int, O: int, a: int, b: int, alpha: int, beta: int, stats: SolveStats
+) -> int:
+    """
+    Exact score with two empties left (a, b)
+    """
+    stats.nodes += 1
+    best = -65
+    for x, y in ((a, b), (b, a)):
+        f = flips_bb(P, O, x)
+        if f:
+            bit = 1 << x
+            score = -_last1(O & ~f, P | bit | f, y, stats)
+            if score > best:
+                best = score
+                if best >= beta:
+                    return best
+    if best > -65:
+        return best
+
+    # P passes
+    best = 65
+    for x, y in ((a, b), (b, a)):
+        f = flips_bb(O, P, x)
+        if f:
+            bit = 1 << x
+            score = _last1(P & ~f, O | bit | f, y, stats)
+            if score < best:
+                best = score
+                if best <= alpha:
+                    return best
+    if best < 65:
+        return best
+    return _final_score(P, O)
+
+
+def _ordered(P: int, O: int, moves: int, empty: int, n_empty: int) -> list[int]:
+    """
+    Parity first (moves in regions with an odd nb of empties), then
+    fastest-first (fewest opponent replies) while the tree is still large
+    """
+    odd = 0
+    for q in QUADRANTS:
+        if (empty & q).bit_count() & 1:
+            odd |= q
+    if n_empty <= FASTEST_FIRST_EMPTIES:
+        return list(squares(moves & odd)) + list(squares(moves & ~odd))
+
+    keyed = []
+    for idx in squares(moves):
+        f = flips_bb(P, O, idx)
+        replies = moves_bb(O & ~f, P | (1 << idx) | f).bit_count()
+        keyed.append((replies, not (odd >> idx) & 1, idx))
+    keyed.sort()
+    return [idx for _, _, idx in keyed]
+
+
+def _solve(P: int, O: int, alpha: int, beta: int, stats: SolveStats) -> int:
+    empty = ~(P | O) & FULL
+    n_empty = empty.bit_count()
+    if n_empty == 2:
+        a = (empty & -empty).bit_length() - 1
+        b = empty.bit_length() - 1
+        return _last2(P, O, a, b, alpha, beta, stats)
+    if n_empty == 1:
+        return _last1(P, O, empty.bit_length() - 1, stats)
+
+    stats.nodes += 1
+    # stable discs keep their color : O's bound P's score from above, P's
+    # from below
+    # (skipped unless even all the discs being stable would cut)
+    threshold = STABILITY_THRESHOLD[n_empty]
+    if alpha >= threshold and 64 - 2 * O.bit_count() <= alpha:
+        upper = 64 - 2 * stable_discs(O, P).bit_count()
+        if upper <= alpha:
+            stats.stability_cuts += 1
+            return upper
+    elif beta <= -threshold and 2 * P.bit_count() - 64 >= beta:
+        lower = 2 * stable_discs(P, O).bit_count() - 64
+        if lower >= beta:
+            stats.stability_cuts += 1
+            return lower
+
+    moves = moves_bb(P, O)
+    if not moves:
+        if not moves_bb(O, P):
+            return _final_score(P, O)
+        return -_solve(O, P, -beta, -alpha, stats)
+
+    best = -65
+    for idx in _ordered(P, O, moves, empty, n_empty):
+        f = flips_bb(P, O, idx)
+        score = -_solve(O & ~f, P | (1 << idx) | f, -beta, -alpha, stats)
+        if score > best:
+            best = score
+            if best > alpha:
+                alpha = best
+                if alpha >= beta:
+                    break
+    return best
+
+
+def solve(
+    board: BoardBitboard, color: int, mode: str = "exact"
+) -> tuple[int | None, int, SolveStats]:
+    """
+    Perfect play from the position : returns (best move idx, score, stats).
+    Score is the final disc margin for `color` (exact) or its sign (wld).
+    """
+    if mode not in SOLVE_MODES:
+        raise ValueError(f"Unknown solve mode : {mode}")
+    t0 = time.perf_counter()
+    stats = SolveStats()
+    P = board.white if color == 1 else board.black
+    O = board.black if color == 1 else board.white
+    # wld : null windows around 0
+    alpha, beta = (-1, 1) if mode == "wld" else (-64, 64)
+
+    moves = moves_bb(P, O)
+    best_move, best = None, -65
+    if not moves:
+        best = _solve(P, O, alpha, beta, stats)
+    else:
+        empty = ~(P | O) & FULL
+        for idx in _ordered(P, O, moves, empty, empty.bit_count()):
+            f = flips_bb(P, O, idx)
+            score = -_solve(O & ~f, P | (1 << idx) | f, -beta, -alpha, stats)
+            if score > best:
+                best, best_move = score, idx
+                if best > alpha:
+                    alpha = best
+                    if alpha >= beta:
+                        break
+    if mode == "wld":
+        best = (best > 0) - (best < 0)
+    stats.ms = int((time.perf_counter() - t0) * 1000)
+    return best_move, best, stats
@@ -0,0 +1,113 @@
+from array import array
+
+from src.engine.symmetry import canonical
+from src.ai.heuristics import evaluate
+
+# keys white, black (Q) + tag (q) + value (d)
+SLOT_BYTES = 8 + 8 + 8 + 8
+WAYS = 2
+
+MODES = ("absolute", "positional", "mobility", "mixed", "pattern")
+# custom evaluation settings holding a tag id, all dropped (with their cached
+# values) when one more is needed
+MAX_CUSTOM = 256
+
+
+class EvalCache:
+    """
+    Bounded cache of leaf evaluations keyed on (white, black, color, mode).
+    2-way buckets : a miss replaces the least recently used slot of its
+    bucket, one bit per bucket.
+    symmetric : named modes are keyed on the canonical position, so the 8
+    symmetric forms share a slot (their square weights are symmetric).
+    Not pattern, whose instances read their squares in a fixed order.
+    """
+
+    def __init__(self, size_mb: float = 8, symmetric: bool = False):
+        self.symmetric = symmetric
+        n = max(WAYS, int(size_mb * 1024 * 1024) // SLOT_BYTES) // WAYS
+        self.buckets = 1 << (n.bit_length() - 1)
+        self.mask = self.buckets - 1
+        # custom (mode, weights, pos_tables) values -> tag id, after the named
+        # modes
+        self._custom = {}
+        # last pos_tables seen and their square weights
+        self._tables = (None, None)
+        self.clear()
+
+    def clear(self):
+        n = self.buckets * WAYS
+        self.whites = array("Q", bytes(8 * n))
+        self.blacks = array("Q", bytes(8 * n))
+        self.tags = array("q", [-1]) * n
+        self.values = array("d", bytes(8 * n))
+        self.lru = bytearray(self.buckets)  # way to replace next
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _mode_id(self, mode: str, weights, pos_tables) -> int:
+        if weights is None and pos_tables is None:
+            return MODES.index(mode) if mode in MODES else MODES.index("mixed")
+        key = (
+            mode,
+            None if weights is None else tuple(sorted(weights.items())),
+            None if pos_tables is None else self._tables_key(pos_tables),
+        )
+        tag_id = self._custom.get(key)
+        if tag_id is None:
+            if len(self._custom) >= MAX_CUSTOM:
+                # the tag ids are given again : forget their values
+                self._custom.clear()
+                self.tags = array("q", [-1]) * len(self.tags)
+            tag_id = self._custom[key] = len(MODES) + len(self._custom)
+        return tag_id
+
+    def _tables_key(self, tables) -> tuple:
+        """
+        Square weights of compiled pos_tables, read back from their single
+        square entries
+        """
+        if tables is not self._tables[0]:
+            weights = tuple(t[1 << k] for t in tables for k in range(8))
+            self._tables = (tables, weights)
+        return self._tables[1]
+
+    def evaluate(
+        self, board, color: int, mode: str = "mixed", weights=None, pos_tables=None
+    ) -> float:
+        """
+        Drop-in for heuristics.evaluate
+        """
+        w, b = board.white, board.black
+        named = weights is None and pos_tables is None
+        if self.symmetric and named and mode != "pattern":
+            w, b, _ = canonical(w, b)
+        tag = self._mode_id(mode, weights, pos_tables) << 2 | color
+        bucket = hash((w, b, tag)) & self.mask
+        slot = bucket * WAYS
+        for way in range(WAYS):
+            i = slot + way
+            if self.tags[i] == tag and self.whites[i] == w and self.blacks[i] == b:
+                self.hits += 1
+                self.lru[bucket] = 1 - way
+                return self.values[i]
+
+        self.misses += 1
+        value = evaluate(board, color, mode, weights, pos_tables)
+        way = self.lru[bucket]
+        i = slot + way
+        if self.tags[i] != -1:
+            self.evictions += 1
+        self.whites[i], self.blacks[i], self.tags[i] = w, b, tag
+        self.values[i] = value
+        self.lru[bucket] = 1 - way
+        return value
+
+    def stats(self) -> tuple[int, int, int]:
+        return self.hits, self.misses, self.evictions
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
@@ -1,4 +1,6 @@
-from src.engine.board_bitboard import FULL, DIRECTIONS
+from src.engine.board_bitboard import FULL, LEFT, RIGHT
+from src.ai.patterns import evaluate_patterns
+from src.ai.stability import stable_discs
 
 # cf Thomas Eberhart video
 STABILITY = [
@@ -17,20 +19,46 @@ def _popcount(x: int) -> int:
     return x.bit_count()
 
 
-def _positional(board, color: int) -> int:
-    w, b = board.white, board.black
-    score = 0
-    for idx in range(64):
-        bit = 1 << idx
-        if not ((w | b) & bit):
-            continue
-        r, c = divmod(idx, 8)
-        v = STABILITY[r][c]
-        if (color == 1 and (w & bit)) or (color == 2 and (b & bit)):
-            score += v
-        else:
-            score -= v
-    return score
+def compile_square_weights(table: list[list[int]]) -> list[list[int]]:
+    """
+    Compiles an 8x8 square weight table into 8 per-row lookup tables :
+    tables[r][byte] = sum of the weights of row r squares set in byte
+    """
+    tables = []
+    for row in table:
+        t = [0] * 256
+        for v in range(1, 256):
+            lsb = v & -v
+            t[v] = t[v & (v - 1)] + row[lsb.bit_length() - 1]
+        tables.append(t)
+    return tables
+
+
+POSITIONAL_TABLES = compile_square_weights(STABILITY)
+
+
+def _positional(board, color: int, tables=POSITIONAL_TABLES) -> int:
+    P = board.white if color == 1 else board.black
+    O = board.black if color == 1 else board.white
+    t0, t1, t2, t3, t4, t5, t6, t7 = tables
+    return (
+        t0[P & 0xFF]
+        + t1[(P >> 8) & 0xFF]
+        + t2[(P >> 16) & 0xFF]
+        + t3[(P >> 24) & 0xFF]
+        + t4[(P >> 32) & 0xFF]
+        + t5[(P >> 40) & 0xFF]
+        + t6[(P >> 48) & 0xFF]
+        + t7[P >> 56]
+        - t0[O & 0xFF]
+        - t1[(O >> 8) & 0xFF]
+        - t2[(O >> 16) & 0xFF]
+        - t3[(O >> 24) & 0xFF]
+        - t4[(O >> 32) & 0xFF]
+        - t5[(O >> 40) & 0xFF]
+        - t6[(O >> 48) & 0xFF]
+        - t7[O >> 56]
+    )
 
 
 def _disc_diff(board, color: int) -> float:
@@ -43,8 +71,8 @@ def _disc_diff(board, color: int) -> float:
 
 
 def _mobility(board, color: int) -> float:
-    player = len(board.legal_moves(color))
-    opp = len(board.legal_moves(3 - color))
+    player = board.mobility_count(color)
+    opp = board.mobility_count(3 - color)
     tot = player + opp
     if tot == 0:
         return 0.0
@@ -56,9 +84,10 @@ def _frontier(board, color: int) -> float:
     Penalizes adjacent discs to at least 1 empty cell
     """
     empty = ~(board.white | board.black) & FULL
-    neighbors = 0
-    for d in DIRECTIONS:
-        neighbors |= d(empty)
+    # 8-neighborhood of the empties : e/w shifts, then n/s of those & empties
+    horiz = ((empty & ~RIGHT) << 1) | ((empty & ~LEFT) >> 1)
+    vert = empty | horiz
+    neighbors = (horiz | (vert << 8) | (vert >> 8)) & FULL
     player = _popcount((board.white if color == 1 else board.black) & neighbors)
     opp = _popcount((board.black if color == 1 else board.white) & neighbors)
     tot = player + opp
@@ -67,34 +96,74 @@ def _frontier(board, color: int) -> float:
     return -100.0 * (player - opp) / tot
 
 
-def evaluate(board, color: int, mode: str = "mixed", weights=None) -> float:
+def _stability(board, color: int) -> float:
+    """
+    Stable discs difference, cf ai.stability
+    """
+    P = board.white if color == 1 else board.black
+    O = board.black if color == 1 else board.white
+    player = stable_discs(P, O).bit_count()
+    opp = stable_discs(O, P).bit_count()
+    tot = player + opp
+    if tot == 0:
+        return 0.0
+    return 100.0 * (player - opp) / tot
+
+
+# term weights of each strategy, mixed ones by game phase. "stab" (stable
+# discs, costly) is opt-in through custom weights, 0 when missing
+WEIGHTS_ABSOLUTE = {"disc": 1.0, "pos": 0.0, "mob": 0.0, "front": 0.0, "stab": 0.0}
+WEIGHTS_POSITIONAL = {"disc": 0.2, "pos": 1.0, "mob": 0.0, "front": 0.0, "stab": 0.0}
+WEIGHTS_MOBILITY = {"disc": 0.2, "pos": 0.3, "mob": 1.0, "front": 0.3, "stab": 0.0}
+WEIGHTS_MIXED_OPENING = {"disc": 0.1, "pos": 1.0, "mob": 1.3, "front": 0.6, "stab": 0.0}
+WEIGHTS_MIXED_MIDGAME = {"disc": 0.4, "pos": 0.8, "mob": 1.0, "front": 0.4, "stab": 0.0}
+WEIGHTS_MIXED_ENDGAME = {"disc": 1.6, "pos": 0.3, "mob": 0.4, "front": 0.0, "stab": 0.0}
+
+
+def mode_weights(mode: str, empties: int) -> dict[str, float]:
+    """
+    Term weights of a strategy (shared dicts, not to be modified)
+    """
+    if mode == "absolute":
+        return WEIGHTS_ABSOLUTE
+    if mode == "positional":
+        return WEIGHTS_POSITIONAL
+    if mode == "mobility":
+        return WEIGHTS_MOBILITY
+    # mixed
+    if empties > 40:
+        return WEIGHTS_MIXED_OPENING
+    if empties > 12:
+        return WEIGHTS_MIXED_MIDGAME
+    return WEIGHTS_MIXED_ENDGAME
+
+
+def evaluate(
+    board, color: int, mode: str = "mixed", weights=None, pos_tables=None
+) -> float:
     """
     Evaluates current board position for a given color and strategy :
     - absolute : score based on the disc nb difference
     - positional : based on static positional weights of the board
     - mobility : prioritizing available moves and reducing opp's mobility
     - mixed : dynamic strategy depending on the game state
+    - pattern : trained pattern weights (in discs), cf ai.patterns
+    pos_tables : custom square weights, from compile_square_weights
     """
+    if mode == "pattern":
+        return evaluate_patterns(board, color)
     empties = 64 - _popcount(board.white | board.black)
 
     if weights is None:
-        if mode == "absolute":
-            weights = {"disc": 1.0, "pos": 0.0, "mob": 0.0, "front": 0.0}
-        elif mode == "positional":
-            weights = {"disc": 0.2, "pos": 1.0, "mob": 0.0, "front": 0.0}
-        elif mode == "mobility":
-            weights = {"disc": 0.2, "pos": 0.3, "mob": 1.0, "front": 0.3}
-        else:  # mixed
-            if empties > 40:
-                weights = {"disc": 0.1, "pos": 1.0, "mob": 1.3, "front": 0.6}
-            elif empties > 12:
-                weights = {"disc": 0.4, "pos": 0.8, "mob": 1.0, "front": 0.4}
-            else:
-                weights = {"disc": 1.6, "pos": 0.3, "mob": 0.4, "front": 0.0}
+        weights = mode_weights(mode, empties)
 
-    return (
+    score = (
         weights["disc"] * _disc_diff(board, color)
-        + weights["pos"] * _positional(board, color)
+        + weights["pos"] * _positional(board, color, pos_tables or POSITIONAL_TABLES)
         + weights["mob"] * _mobility(board, color)
         + weights["front"] * _frontier(board, color)
     )
+    stab = weights.get("stab", 0.0)
+    if stab:
+        score += stab * _stability(board, color)
+    return score
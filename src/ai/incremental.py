@@ -0,0 +1,81 @@
+from src.engine.board_bitboard import BoardBitboard, squares
+from src.ai.heuristics import (
+    POSITIONAL_TABLES,
+    _frontier,
+    _mobility,
+    _stability,
+    mode_weights,
+)
+from src.ai.patterns import evaluate_patterns
+
+
+class IncrementalEvaluator:
+    """
+    Plays moves on a board through make/unmake while keeping disc counts and
+    positional sums up to date in O(popcount(flips)). Only mobility,
+    frontier and stability are computed at the leaf.
+    Scores are equal to heuristics.evaluate for every mode, pattern leaves
+    are evaluated in full.
+    """
+
+    __slots__ = ("board", "mode", "weights", "square_weights", "counts", "pos")
+
+    def __init__(
+        self,
+        board: BoardBitboard,
+        mode: str = "mixed",
+        weights=None,
+        pos_tables=None,
+    ):
+        tables = pos_tables or POSITIONAL_TABLES
+        self.board = board
+        self.mode = mode
+        self.weights = weights
+        # single square weights, read back from the row tables
+        self.square_weights = [tables[idx >> 3][1 << (idx & 7)] for idx in range(64)]
+        # indexed by color, 0 unused
+        self.counts = [0, board.white.bit_count(), board.black.bit_count()]
+        self.pos = [0, self._square_sum(board.white), self._square_sum(board.black)]
+
+    def _square_sum(self, bb: int) -> int:
+        sw = self.square_weights
+        return sum(sw[idx] for idx in squares(bb))
+
+    def make(self, move_idx: int, color: int) -> int:
+        flips = self.board.make(move_idx, color)
+        n = flips.bit_count()
+        flipped = self._square_sum(flips)
+        self.counts[color] += n + 1
+        self.counts[3 - color] -= n
+        self.pos[color] += self.square_weights[move_idx] + flipped
+        self.pos[3 - color] -= flipped
+        return flips
+
+    def unmake(self, move_idx: int, flips: int, color: int):
+        self.board.unmake(move_idx, flips, color)
+        n = flips.bit_count()
+        flipped = self._square_sum(flips)
+        self.counts[color] -= n + 1
+        self.counts[3 - color] += n
+        self.pos[color] -= self.square_weights[move_idx] + flipped
+        self.pos[3 - color] += flipped
+
+    def evaluate(self, color: int) -> float:
+        if self.mode == "pattern":
+            return evaluate_patterns(self.board, color)
+        player, opp = self.counts[color], self.counts[3 - color]
+        tot = player + opp
+        weights = self.weights or mode_weights(self.mode, 64 - tot)
+
+        disc = 100.0 * (player - opp) / tot if tot else 0.0
+        score = weights["disc"] * disc + weights["pos"] * (
+            self.pos[color] - self.pos[3 - color]
+        )
+        # non incremental terms, skipped when unused
+        if weights["mob"]:
+            score += weights["mob"] * _mobility(self.board, color)
+        if weights["front"]:
+            score += weights["front"] * _frontier(self.board, color)
+        if weights.get("stab"):
+            score += weights["stab"] * _stability(self.board, color)
+        return score
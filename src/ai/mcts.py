@@ -0,0 +1,295 @@
+import math, random, time
+from array import array
+from typing import TYPE_CHECKING, Callable
+
+from src.engine.board_bitboard import BoardBitboard, flips_bb, moves_bb, squares
+from src.ai.heuristics import evaluate
+from src.ai.search_info import SearchInfo, SearchTimeout
+
+if TYPE_CHECKING:
+    from threading import Event
+
+# playouts between two progress reports
+PROGRESS_PLAYOUTS = 64
+EXPLORATION = 1.4
+PRIOR_TEMPERATURE = 20.0  # softmax temperature over heuristic scores
+
+
+class MCTSTree:
+    """
+    UCT tree stored in flat arrays, one slot per node :
+    - white, black, color : position and side to move
+    - parent, move : move played from the parent (square idx, -1 pass)
+    - first, count : children are the nodes [first, first + count), first is
+      -1 until the node is expanded (count 0 then means game over)
+    - visits, wins : playouts through the node and their result for the
+      player who played `move` (1 win, 0.5 draw)
+    - prior : heuristic probability of `move` among its siblings
+    Children of a node are allocated together at its expansion. The tree is
+    kept between moves : the next search starts from the subtree of the
+    position reached, if any.
+    """
+
+    def __init__(self, max_nodes: int = 1 << 18):
+        self.capacity = max_nodes
+        self.clear()
+
+    def clear(self):
+        n = self.capacity
+        self.white = array("Q", bytes(8 * n))
+        self.black = array("Q", bytes(8 * n))
+        self.color = array("B", bytes(n))
+        self.parent = array("i", bytes(4 * n))
+        self.move = array("b", bytes(n))
+        self.first = array("i", [-1]) * n
+        self.count = array("B", bytes(n))
+        self.visits = array("I", bytes(4 * n))
+        self.wins = array("d", bytes(8 * n))
+        self.prior = array("f", bytes(4 * n))
+        self.size = 0
+        self.reused = 0
+
+    def _columns(self):
+        return (
+            self.white,
+            self.black,
+            self.color,
+            self.move,
+            self.count,
+            self.visits,
+            self.wins,
+            self.prior,
+        )
+
+    def set_root(self, board: BoardBitboard, color: int):
+        """
+        Root on the position : the matching subtree of the previous search
+        (the root itself, a child or a grandchild) is kept, else a new tree
+        """
+        self.reused = 0
+        key = (board.white, board.black, color)
+        level = [0] if self.size else []
+        for _ in range(3):
+            for node in level:
+                if (self.white[node], self.black[node], self.color[node]) == key:
+                    self._reroot(node)
+                    self.reused = self.visits[0]
+                    return
+            level = [
+                ch
+                for node in level
+                if self.first[node] >= 0
+                for ch in range(self.first[node], self.first[node] + self.count[node])
+            ]
+        self.size = 1
+        self.white[0], self.black[0], self.color[0] = key
+        self.parent[0], self.move[0], self.first[0] = -1, -1, -1
+        self.count[0], self.visits[0], self.wins[0], self.prior[0] = 0, 0, 0.0, 1.0
+
+    def _reroot(self, node: int):
+        """
+        Moves the subtree of node to the front of the arrays, breadth first so
+        that sibling blocks stay contiguous
+        """
+        if node == 0:
+            return
+        order, first = [node], {}
+        i = 0
+        while i < len(order):
+            x = order[i]
+            i += 1
+            if self.first[x] >= 0:
+                first[x] = len(order)
+                order.extend(range(self.first[x], self.first[x] + self.count[x]))
+        new_idx = {x: j for j, x in enumerate(order)}
+        n = len(order)
+        for col in self._columns():
+            col[:n] = array(col.typecode, [col[x] for x in order])
+        self.parent[:n] = array("i", [new_idx.get(self.parent[x], -1) for x in order])
+        self.first[:n] = array("i", [first.get(x, -1) for x in order])
+        self.parent[0] = -1
+        self.size = n
+
+    def expand(self, node: int, prior_mode: str | None) -> bool:
+        """
+        Creates the children of node, False when the arrays are full
+        """
+        if self.size + 64 > self.capacity:
+            return False
+        white, black, color = self.white[node], self.black[node], self.color[node]
+        P, O = (white, black) if color == 1 else (black, white)
+        moves = moves_bb(P, O)
+        first = self.first[node] = self.size
+        if not moves:
+            if not moves_bb(O, P):
+                # game over, no children
+                self.count[node] = 0
+                return True
+            children = [(-1, white, black)]
+        else:
+            children = []
+            for idx in squares(moves):
+                f = flips_bb(P, O, idx)
+                p, o = P | (1 << idx) | f, O & ~f
+                children.append((idx, *((p, o) if color == 1 else (o, p))))
+        priors = self._priors(children, color, prior_mode)
+        for i, (move, w, b) in enumerate(children):
+            ch = first + i
+            self.white[ch], self.black[ch], self.color[ch] = w, b, 3 - color
+            self.parent[ch], self.move[ch], self.first[ch] = node, move, -1
+            self.count[ch], self.visits[ch], self.wins[ch] = 0, 0, 0.0
+            self.prior[ch] = priors[i]
+        self.count[node] = len(children)
+        self.size += len(children)
+        return True
+
+    @staticmethod
+    def _priors(children, color: int, mode: str | None) -> list[float]:
+        """
+        Softmax of the heuristic score of each child for the mover
+        """
+        if mode is None or len(children) == 1:
+            return [1.0 / len(children)] * len(children)
+        board = BoardBitboard.__new__(BoardBitboard)
+        scores = []
+        for _, w, b in children:
+            board.white, board.black = w, b
+            scores.append(evaluate(board, color, mode) / PRIOR_TEMPERATURE)
+        top = max(scores)
+        exp = [math.exp(s - top) for s in scores]
+        tot = sum(exp)
+        return [e / tot for e in exp]
+
+    def select(self, node: int, c: float, prior_weight: float) -> int:
+        """
+        Child maximizing UCB1, plus a prior bias fading with the visits.
+        Unvisited children come first, by prior.
+        """
+        first = self.first[node]
+        visits, wins, prior = self.visits, self.wins, self.prior
+        log_n = math.log(visits[node] or 1)
+        best, best_ucb = first, -math.inf
+        for ch in range(first, first + self.count[node]):
+            n = visits[ch]
+            if n == 0:
+                ucb = 1e9 + prior[ch]
+            else:
+                ucb = (
+                    wins[ch] / n
+                    + c * math.sqrt(log_n / n)
+                    + prior_weight * prior[ch] / (n + 1)
+                )
+            if ucb > best_ucb:
+                best, best_ucb = ch, ucb
+        return best
+
+    def backpropagate(self, node: int, white_result: float):
+        """
+        white_result : 1 white won, 0.5 draw, 0 black won
+        """
+        while node >= 0:
+            self.visits[node] += 1
+            # credited to the player who moved into the node
+            won = white_result if self.color[node] == 2 else 1 - white_result
+            self.wins[node] += won
+            node = self.parent[node]
+
+    def best_child(self) -> int:
+        first = self.first[0]
+        return max(range(first, first + self.count[0]), key=self.visits.__getitem__)
+
+
+def playout(white: int, black: int, color: int, rng: random.Random) -> float:
+    """
+    Uniformly random game to the end : 1 white won, 0.5 draw, 0 black won
+    """
+    P, O = (white, black) if color == 1 else (black, white)
+    passed = False
+    while True:
+        moves = moves_bb(P, O)
+        if not moves:
+            if passed:
+                break
+            passed = True
+        else:
+            passed = False
+            idx = rng.choice(list(squares(moves)))
+            f = flips_bb(P, O, idx)
+            P, O = P | (1 << idx) | f, O & ~f
+        P, O = O, P
+        color = 3 - color
+    w, b = (P, O) if color == 1 else (O, P)
+    diff = w.bit_count() - b.bit_count()
+    return 1.0 if diff > 0 else 0.0 if diff < 0 else 0.5
+
+
+def choose_move_mcts(
+    board: BoardBitboard,
+    color: int,
+    playouts: int = 2000,
+    time_ms: int | None = None,
+    tree: MCTSTree | None = None,
+    c: float = EXPLORATION,
+    prior_mode: str | None = None,
+    prior_weight: float = 1.0,
+    seed: int | None = None,
+    stop: "Event | None" = None,
+    progress: "Callable[[SearchInfo, int, int], None] | None" = None,
+) -> tuple[tuple[int, int] | None, SearchInfo]:
+    """
+    Monte Carlo tree search (UCT) with random playouts, `playouts` of them or
+    as many as fit in time_ms. Returns the most visited move.
+    tree : kept by the caller to reuse the subtree of the position reached
+    prior_mode : heuristics mode scoring the moves at expansion, their
+    softmax biases selection (prior_weight) while they have few visits
+    stop : event ending the search, with the best move so far (SearchTimeout
+    if no playout was done)
+    progress : called with (info, max depth, best move idx) periodically
+    """
+    t0 = time.perf_counter()
+    info = SearchInfo(algo="mcts" if prior_mode is None else f"mcts-{prior_mode}")
+    legal = board.legal_moves_bb(color)
+    if not legal:
+        info.ms = int((time.perf_counter() - t0) * 1000)
+        return None, info
+
+    rng = random.Random(seed)
+    tree = tree if tree is not None else MCTSTree()
+    tree.set_root(board, color)
+    size0 = tree.size
+    deadline = t0 + time_ms / 1000 if time_ms is not None else math.inf
+    budget = playouts if time_ms is None else math.inf
+    if tree.first[0] < 0:
+        tree.expand(0, prior_mode)
+
+    done = 0
+    while done < budget:
+        if time.perf_counter() > deadline or (stop is not None and stop.is_set()):
+            break
+        if progress is not None and done % PROGRESS_PLAYOUTS == 0:
+            info.nodes, info.playouts = tree.size - size0, done
+            progress(info, info.depth, tree.move[tree.best_child()])
+        # selection down to a leaf, expanded on its second visit
+        node, depth = 0, 0
+        while tree.first[node] >= 0 and tree.count[node]:
+            node = tree.select(node, c, prior_weight)
+            depth += 1
+        if tree.first[node] < 0 and tree.visits[node] and tree.expand(node, prior_mode):
+            if tree.count[node]:
+                node = tree.select(node, c, prior_weight)
+                depth += 1
+        info.depth = max(info.depth, depth)
+        result = playout(tree.white[node], tree.black[node], tree.color[node], rng)
+        tree.backpropagate(node, result)
+        done += 1
+
+    if not tree.visits[0] and stop is not None and stop.is_set():
+        raise SearchTimeout
+    best = tree.best_child()
+    n = tree.visits[best]
+    info.score = 2 * tree.wins[best] / n - 1 if n else 0.0
+    info.nodes = tree.size - size0
+    info.playouts = done
+    info.timed_out = time_ms is not None and time.perf_counter() > deadline
+    info.ms = int((time.perf_counter() - t0) * 1000)
+    return divmod(tree.move[best], 8), info
@@ -1,28 +1,34 @@
 import math, time
-from dataclasses import dataclass
-from src.engine.board_bitboard import BoardBitboard
+from typing import TYPE_CHECKING, Callable
+from src.engine.board_bitboard import BoardBitboard, squares
+from src.ai.book import OpeningBook
+from src.ai.eval_cache import EvalCache
 from src.ai.heuristics import evaluate
+from src.ai.incremental import IncrementalEvaluator
+from src.ai.move_ordering import MoveOrderer
+from src.ai.search_info import SearchContext, SearchInfo, SearchTimeout
+from src.ai.transposition import (
+    EXACT,
+    LOWER,
+    UPPER,
+    TranspositionTable,
+    hash_move_first,
+    zobrist_hash,
+)
 
+if TYPE_CHECKING:
+    from threading import Event
 
-@dataclass
-class SearchInfo:
-    nodes: int = 0
-    ms: int = 0
-    score: float = 0.0
-    depth: int = 0
-    algo: str = ""
+# nb of nodes between two stop checks
+STOP_CHECK_NODES = 64
 
 
-def _clone_and_play(
-    board: BoardBitboard, move: tuple[int, int], color: int
-) -> BoardBitboard:
-    """
-    Clone board & apply move
-    """
-    nb = BoardBitboard.__new__(BoardBitboard)
-    nb.white, nb.black = board.white, board.black
-    nb.apply_move(move, color)
-    return nb
+def _evaluate(board: BoardBitboard, color: int, ctx: SearchContext) -> float:
+    if ctx.eval_cache is not None:
+        return ctx.eval_cache.evaluate(board, color, ctx.mode, ctx.weights)
+    if ctx.evaluator is not None:
+        return ctx.evaluator.evaluate(color)
+    return evaluate(board, color, ctx.mode, ctx.weights)
 
 
 def _minimax(
@@ -31,80 +37,116 @@ def _minimax(
     root_color: int,
     depth: int,
     maximizing: bool,
-    use_ab: bool,
     alpha: float,
     beta: float,
-    info: SearchInfo,
-) -> tuple[float, tuple[int, int]]:
-    legal = board.legal_moves(color)
+    ply: int,
+    ctx: SearchContext,
+) -> tuple[float, int | None]:
+    info = ctx.info
+    stop = ctx.stop
+    if stop is not None and info.nodes % STOP_CHECK_NODES == 0 and stop.is_set():
+        raise SearchTimeout
+    if depth == 0:
+        return _evaluate(board, root_color, ctx), None
+    moves = board.legal_moves_bb(color)
     # end game
-    if depth == 0 or (not legal and not board.legal_moves(3 - color)):
-        sc = evaluate(board, root_color)
+    if not moves and not board.legal_moves_bb(3 - color):
+        sc = _evaluate(board, root_color, ctx)
         return sc, None
 
     # pass move
-    if not legal:
+    if not moves:
         return _minimax(
             board,
             3 - color,
             root_color,
             depth,
             not maximizing,
-            use_ab,
             alpha,
             beta,
-            info,
+            ply + 1,
+            ctx,
         )
 
+    # tt values are from the side to move pov, scores here from root's pov
+    sign = 1 if maximizing else -1
+    alpha_orig, beta_orig = alpha, beta
+    hash_move = -1
+    tt = ctx.tt
+    if tt is not None:
+        key = zobrist_hash(board.white, board.black, color)
+        entry = tt.lookup(key)
+        if entry is not None:
+            e_depth, e_value, e_flag, hash_move = entry
+            if e_flag != EXACT and not maximizing:
+                e_flag = LOWER if e_flag == UPPER else UPPER
+            e_value *= sign
+            if e_depth >= depth and hash_move >= 0:
+                if e_flag == EXACT:
+                    return e_value, hash_move
+                if e_flag == LOWER and e_value >= beta:
+                    return e_value, hash_move
+                if e_flag == UPPER and e_value <= alpha:
+                    return e_value, hash_move
+    legal = list(squares(moves))
+    if ctx.orderer is not None:
+        legal = ctx.orderer.order(
+            board, color, legal, ply, depth, hash_move, ctx.mode, ctx.weights
+        )
+    else:
+        legal = hash_move_first(legal, hash_move)
+
+    mover = board if ctx.evaluator is None else ctx.evaluator
     best_move = None
-    if maximizing:
-        value = -math.inf
-        for move in legal:
-            child = _clone_and_play(board, move, color)
-            info.nodes += 1
-            score, _ = _minimax(
-                child,
-                3 - color,
-                root_color,
-                depth - 1,
-                False,
-                use_ab,
-                alpha,
-                beta,
-                info,
-            )
+    if ply == 0 and ctx.progress is not None:
+        ctx.progress(info, depth, -1)
+    value = -math.inf if maximizing else +math.inf
+    for i, move in enumerate(legal):
+        flips = mover.make(move, color)
+        info.nodes += 1
+        score, _ = _minimax(
+            board,
+            3 - color,
+            root_color,
+            depth - 1,
+            not maximizing,
+            alpha,
+            beta,
+            ply + 1,
+            ctx,
+        )
+        mover.unmake(move, flips, color)
+        if maximizing:
             if score > value:
                 value = score
                 best_move = move
-            if use_ab:
+                if ply == 0 and ctx.progress is not None:
+                    ctx.progress(info, depth, move)
+            if ctx.use_ab:
                 alpha = max(alpha, value)
-                if alpha >= beta:
-                    break
-        return value, best_move
-    else:
-        value = +math.inf
-        for move in legal:
-            child = _clone_and_play(board, move, color)
-            info.nodes += 1
-            score, _ = _minimax(
-                child,
-                3 - color,
-                root_color,
-                depth - 1,
-                True,
-                use_ab,
-                alpha,
-                beta,
-                info,
-            )
+        else:
             if score < value:
                 value = score
                 best_move = move
-            if use_ab:
+            if ctx.use_ab:
                 beta = min(beta, value)
-                if alpha >= beta:
-                    break
-        return value, best_move
+        if ctx.use_ab and alpha >= beta:
+            info.cutoffs += 1
+            if i == 0:
+                info.first_move_cutoffs += 1
+            if ctx.orderer is not None:
+                ctx.orderer.cutoff(move, color, ply, depth)
+            break
+
+    if tt is not None:
+        if value <= alpha_orig:
+            flag = UPPER if maximizing else LOWER
+        elif value >= beta_orig:
+            flag = LOWER if maximizing else UPPER
+        else:
+            flag = EXACT
+        tt.store(key, depth, sign * value, flag, best_move)
+    return value, best_move
 
 
 def choose_move_minimax(
@@ -112,12 +154,62 @@ def choose_move_minimax(
     color: int,
     depth: int = 4,
     use_ab: bool = False,
+    tt: TranspositionTable | None = None,
+    ordering: MoveOrderer | None = None,
+    incremental: bool = False,
+    eval_cache: EvalCache | None = None,
+    book: OpeningBook | None = None,
+    stop: "Event | None" = None,
+    progress: "Callable[[SearchInfo, int, int], None] | None" = None,
+    mode: str = "mixed",
+    weights: dict[str, float] | None = None,
 ) -> tuple[tuple[int, int] | None, SearchInfo]:
+    """
+    stop : event aborting the search (raises SearchTimeout)
+    progress : called with (info, depth, move idx) on root best move changes,
+    move is -1 when the search starts
+    mode, weights : evaluation strategy, cf heuristics.evaluate
+    """
     t0 = time.perf_counter()
     info = SearchInfo(depth=depth, algo=f"minimax{'-ab' if use_ab else ''}")
+    entry = book.probe(board, color) if book is not None else None
+    if entry is not None:
+        move, info.score, _ = entry
+        info.algo, info.depth = "book", 0
+        info.ms = int((time.perf_counter() - t0) * 1000)
+        return divmod(move, 8), info
+
+    ctx = SearchContext(
+        info,
+        use_ab,
+        tt,
+        ordering,
+        stop=stop,
+        progress=progress,
+        mode=mode,
+        weights=weights,
+    )
+    board = board.copy()
+    if incremental:
+        ctx.evaluator = IncrementalEvaluator(board, mode, weights)
+    ctx.eval_cache = eval_cache
+    if eval_cache is not None:
+        eval0 = eval_cache.stats()
+    if tt is not None:
+        tt.new_search()
+        stats0 = tt.stats()
+    if ordering is not None:
+        ordering.new_search()
     score, best = _minimax(
-        board, color, color, depth, True, use_ab, -math.inf, +math.inf, info
+        board, color, color, depth, True, -math.inf, +math.inf, 0, ctx
     )
+    if tt is not None:
+        info.tt_hits, info.tt_misses, info.tt_collisions = (
+            s - s0 for s, s0 in zip(tt.stats(), stats0)
+        )
+    if eval_cache is not None:
+        hits, misses, _ = eval_cache.stats()
+        info.eval_hits, info.eval_misses = hits - eval0[0], misses - eval0[1]
     info.ms = int((time.perf_counter() - t0) * 1000)
     info.score = score
-    return best, info
+    return (divmod(best, 8) if best is not None else None), info
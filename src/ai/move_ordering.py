@@ -0,0 +1,100 @@
+from src.engine.board_bitboard import BoardBitboard
+from src.ai.heuristics import STABILITY, evaluate
+
+# Dynamic orderings, tried before history & static priority
+# - shallow : static eval of the child position
+# - mobility : fewest opponent replies first
+DYNAMIC_MODES = (None, "shallow", "mobility")
+
+# STABILITY flattened by square idx
+SQUARE_PRIORITY = [v for row in STABILITY for v in row]
+
+KILLERS_PER_PLY = 2
+MAX_PLY = 128
+
+
+class MoveOrderer:
+    """
+    Sorts legal moves for alpha-beta :
+    hash move > killers of the ply > dynamic score > history > static priority
+    """
+
+    def __init__(
+        self,
+        killers: bool = True,
+        history: bool = True,
+        static: bool = True,
+        dynamic: str | None = None,
+        dynamic_min_depth: int = 3,
+    ):
+        if dynamic not in DYNAMIC_MODES:
+            raise ValueError(f"Unknown dynamic ordering : {dynamic}")
+        self.use_killers = killers
+        self.use_history = history
+        self.use_static = static
+        self.dynamic = dynamic
+        self.dynamic_min_depth = dynamic_min_depth
+        self.killers = [[-1] * KILLERS_PER_PLY for _ in range(MAX_PLY)]
+        # history[color][square idx]
+        self.history = [[0] * 64 for _ in range(3)]
+
+    def new_search(self):
+        """
+        Forgets killers and ages the history scores
+        """
+        for k in self.killers:
+            k[:] = [-1] * KILLERS_PER_PLY
+        for h in self.history:
+            h[:] = [v >> 1 for v in h]
+
+    def order(
+        self,
+        board: BoardBitboard,
+        color: int,
+        legal: list[int],
+        ply: int,
+        depth: int,
+        hash_move: int = -1,
+        mode: str = "mixed",
+        weights: dict[str, float] | None = None,
+    ) -> list[int]:
+        """
+        mode, weights : evaluation of the search, scores the shallow ordering
+        """
+        if len(legal) < 2:
+            return legal
+        killers = self.killers[ply] if self.use_killers else ()
+        history = self.history[color]
+        dynamic = self.dynamic if depth >= self.dynamic_min_depth else None
+
+        def key(idx):
+            if idx == hash_move:
+                return (2, 0, 0, 0, 0)
+            killer = (
+                KILLERS_PER_PLY - killers.index(idx) if idx in killers else 0
+            )
+            dyn = 0
+            if dynamic is not None:
+                flips = board.make(idx, color)
+                if dynamic == "shallow":
+                    dyn = evaluate(board, color, mode, weights)
+                else:
+                    dyn = -board.mobility_count(3 - color)
+                board.unmake(idx, flips, color)
+            hist = history[idx] if self.use_history else 0
+            stat = SQUARE_PRIORITY[idx] if self.use_static else 0
+            return (1, killer, dyn, hist, stat)
+
+        return sorted(legal, key=key, reverse=True)
+
+    def cutoff(self, idx: int, color: int, ply: int, depth: int):
+        """
+        Records a move (square idx) that produced a beta cutoff
+        """
+        if self.use_killers:
+            k = self.killers[ply]
+            if k[0] != idx:
+                k[1:] = k[:-1]
+                k[0] = idx
+        if self.use_history:
+            self.history[color][idx] += depth * depth
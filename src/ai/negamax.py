@@ -1,98 +1,460 @@
 import math, time
-from dataclasses import dataclass
-from src.engine.board_bitboard import BoardBitboard
+from typing import TYPE_CHECKING, Callable
+from src.engine.board_bitboard import BoardBitboard, squares
+from src.ai.book import OpeningBook
+from src.ai.endgame import solve
+from src.ai.eval_cache import EvalCache
 from src.ai.heuristics import evaluate
+from src.ai.incremental import IncrementalEvaluator
+from src.ai.move_ordering import MoveOrderer
+from src.ai.probcut import PROBCUT_MIN_DEPTH, ProbCut
+from src.ai.search_info import SearchContext, SearchInfo, SearchTimeout
+from src.ai.transposition import (
+    EXACT,
+    LOWER,
+    UPPER,
+    TranspositionTable,
+    hash_move_first,
+    zobrist_hash,
+)
 
+if TYPE_CHECKING:
+    from threading import Event
+    from src.ai.parallel import ParallelSearch
 
-@dataclass
-class SearchInfo:
-    nodes: int = 0
-    ms: int = 0
-    score: float = 0.0
-    depth: int = 0
-    algo: str = ""
 
+# nb of nodes between two clock checks
+TIME_CHECK_NODES = 64
+# principal variation search : width of the null windows, and half width of
+# the root aspiration window around the previous iteration's score, widened
+# by ASPIRATION_GROWTH on each miss and fully open past ASPIRATION_MAX
+NULL_WINDOW = 1e-6
+ASPIRATION_WINDOW = 30.0
+ASPIRATION_GROWTH = 4.0
+ASPIRATION_MAX = 500.0
+# late move reductions : from the LMR_MOVES-th move on, at depths from
+# LMR_DEPTH, moves are first searched LMR_PLIES shallower with a null window
+LMR_MOVES = 3
+LMR_DEPTH = 3
+LMR_PLIES = 1
 
-def _clone_and_play(
-    board: BoardBitboard, move: tuple[int, int], color: int
-) -> BoardBitboard:
+
+def _order(
+    board: BoardBitboard,
+    color: int,
+    legal: list[int],
+    ply: int,
+    depth: int,
+    hash_move: int,
+    ctx: SearchContext,
+) -> list[int]:
+    if ctx.orderer is not None:
+        return ctx.orderer.order(
+            board, color, legal, ply, depth, hash_move, ctx.mode, ctx.weights
+        )
+    return hash_move_first(legal, hash_move)
+
+
+def _evaluate(board: BoardBitboard, color: int, ctx: SearchContext) -> float:
+    if ctx.eval_cache is not None:
+        return ctx.eval_cache.evaluate(board, color, ctx.mode, ctx.weights)
+    if ctx.evaluator is not None:
+        return ctx.evaluator.evaluate(color)
+    return evaluate(board, color, ctx.mode, ctx.weights)
+
+
+def _child(
+    board: BoardBitboard,
+    color: int,
+    depth: int,
+    alpha: float,
+    beta: float,
+    ply: int,
+    i: int,
+    ctx: SearchContext,
+) -> float:
     """
-    Clone board & apply move
+    Score of the i-th move (already played). With PVS, the moves after the
+    first are only proven no better than alpha with a null window, and
+    searched again with the full window when they are. With LMR, late moves
+    proven so by a reduced search are not searched at full depth.
     """
-    nb = BoardBitboard.__new__(BoardBitboard)
-    nb.white, nb.black = board.white, board.black
-    nb.apply_move(move, color)
-    return nb
+    if ctx.lmr and ply and i >= LMR_MOVES and depth >= LMR_DEPTH:
+        score = -_negamax(
+            board,
+            3 - color,
+            depth - 1 - LMR_PLIES,
+            -alpha - NULL_WINDOW,
+            -alpha,
+            ply + 1,
+            ctx,
+        )
+        if score <= alpha:
+            ctx.info.reductions += 1
+            return score
+    if not ctx.use_pvs or i == 0:
+        return -_negamax(board, 3 - color, depth - 1, -beta, -alpha, ply + 1, ctx)
+    score = -_negamax(
+        board, 3 - color, depth - 1, -alpha - NULL_WINDOW, -alpha, ply + 1, ctx
+    )
+    if alpha < score < beta:
+        ctx.info.researches += 1
+        score = -_negamax(board, 3 - color, depth - 1, -beta, -alpha, ply + 1, ctx)
+    return score
+
+
+def _probcut(
+    board: BoardBitboard,
+    color: int,
+    depth: int,
+    alpha: float,
+    beta: float,
+    ply: int,
+    ctx: SearchContext,
+) -> float | None:
+    """
+    Multi-ProbCut : beta (alpha) when a shallow search predicts that the
+    depth search fails high (low), None when no test is conclusive
+    """
+    empties = 64 - (board.white | board.black).bit_count()
+    checks = ctx.probcut.checks(ctx.mode, ctx.weights, empties, depth)
+    for shallow, a, b, margin in checks:
+        if beta < math.inf:
+            bound = (beta + margin - b) / a
+            score = _negamax(
+                board, color, shallow, bound - NULL_WINDOW, bound, ply, ctx
+            )
+            if score >= bound:
+                ctx.info.probcuts += 1
+                return beta
+        if alpha > -math.inf:
+            bound = (alpha - margin - b) / a
+            score = _negamax(
+                board, color, shallow, bound, bound + NULL_WINDOW, ply, ctx
+            )
+            if score <= bound:
+                ctx.info.probcuts += 1
+                return alpha
+    return None
 
 
 def _negamax(
     board: BoardBitboard,
     color: int,
-    root_color: int,
     depth: int,
     alpha: float,
     beta: float,
-    info: SearchInfo,
-    do_ab: bool,
+    ply: int,
+    ctx: SearchContext,
 ) -> float:
-    legal = board.legal_moves(color)
+    info = ctx.info
+    if info.nodes % TIME_CHECK_NODES == 0 and (
+        time.perf_counter() > ctx.deadline
+        or (ctx.stop is not None and ctx.stop.is_set())
+    ):
+        raise SearchTimeout
+    if depth == 0:
+        return _evaluate(board, color, ctx)
+    moves = board.legal_moves_bb(color)
 
     # end game
-    if depth == 0 or (not legal and not board.legal_moves(3 - color)):
-        return evaluate(board, root_color)
+    if not moves and not board.legal_moves_bb(3 - color):
+        return _evaluate(board, color, ctx)
 
     # pass move
-    if not legal:
-        return -_negamax(
-            board, 3 - color, root_color, depth, -beta, -alpha, info, do_ab
-        )
+    if not moves:
+        return -_negamax(board, 3 - color, depth, -beta, -alpha, ply + 1, ctx)
 
+    alpha_orig = alpha
+    hash_move = -1
+    tt = ctx.tt
+    if tt is not None:
+        key = zobrist_hash(board.white, board.black, color)
+        entry = tt.lookup(key)
+        if entry is not None:
+            e_depth, e_value, e_flag, hash_move = entry
+            if e_depth >= depth:
+                if e_flag == EXACT:
+                    return e_value
+                if e_flag == LOWER and e_value >= beta:
+                    return e_value
+                if e_flag == UPPER and e_value <= alpha:
+                    return e_value
+    if ctx.probcut is not None and depth >= PROBCUT_MIN_DEPTH:
+        cut = _probcut(board, color, depth, alpha, beta, ply, ctx)
+        if cut is not None:
+            return cut
+    legal = _order(board, color, list(squares(moves)), ply, depth, hash_move, ctx)
+
+    mover = board if ctx.evaluator is None else ctx.evaluator
     value = -math.inf
-    for move in legal:
-        child = _clone_and_play(board, move, color)
+    best = None
+    for i, move in enumerate(legal):
+        flips = mover.make(move, color)
         info.nodes += 1
-        score = -_negamax(
-            child, 3 - color, root_color, depth - 1, -beta, -alpha, info, do_ab
-        )
+        score = _child(board, color, depth, alpha, beta, ply, i, ctx)
+        mover.unmake(move, flips, color)
         if score > value:
             value = score
-        if do_ab:
+            best = move
+        if ctx.use_ab:
             if value > alpha:
                 alpha = value
             if alpha >= beta:
+                info.cutoffs += 1
+                if i == 0:
+                    info.first_move_cutoffs += 1
+                if ctx.orderer is not None:
+                    ctx.orderer.cutoff(move, color, ply, depth)
                 break
+
+    if tt is not None:
+        if value <= alpha_orig:
+            flag = UPPER
+        elif value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        tt.store(key, depth, value, flag, best)
     return value
 
 
+def _search_root(
+    board: BoardBitboard,
+    color: int,
+    legal: list[int],
+    depth: int,
+    ctx: SearchContext,
+    pv_move: int = -1,
+    alpha: float = -math.inf,
+    beta: float = math.inf,
+) -> tuple[int, float]:
+    """
+    Best root move and its score, a bound when outside (alpha, beta)
+    """
+    hash_move = pv_move
+    if ctx.tt is not None:
+        key = zobrist_hash(board.white, board.black, color)
+        entry = ctx.tt.lookup(key)
+        if entry is not None:
+            hash_move = entry[3]
+    legal = _order(board, color, legal, 0, depth, hash_move, ctx)
+
+    mover = board if ctx.evaluator is None else ctx.evaluator
+    best, best_score = None, -math.inf
+    alpha_orig = alpha
+    if ctx.progress is not None:
+        ctx.progress(ctx.info, depth, -1)
+
+    for i, move in enumerate(legal):
+        flips = mover.make(move, color)
+        ctx.info.nodes += 1
+        score = _child(board, color, depth, alpha, beta, 0, i, ctx)
+        mover.unmake(move, flips, color)
+        if score > best_score:
+            best_score, best = score, move
+            if ctx.progress is not None:
+                ctx.progress(ctx.info, depth, move)
+        if ctx.use_ab and score > alpha:
+            alpha = score
+            if alpha >= beta:
+                break
+
+    if ctx.tt is not None:
+        if best_score <= alpha_orig:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        ctx.tt.store(key, depth, best_score, flag, best)
+    return best, best_score
+
+
+def _search_aspiration(
+    board: BoardBitboard,
+    color: int,
+    legal: list[int],
+    depth: int,
+    ctx: SearchContext,
+    pv_move: int,
+    guess: float,
+) -> tuple[int, float]:
+    """
+    Root search in a window around guess (the previous iteration's score),
+    redone with the missed side widened until the score falls inside
+    """
+    delta = ASPIRATION_WINDOW
+    alpha, beta = guess - delta, guess + delta
+    while True:
+        move, score = _search_root(
+            board, color, legal, depth, ctx, pv_move, alpha, beta
+        )
+        if alpha < score < beta:
+            return move, score
+        ctx.info.aspiration_fails += 1
+        delta *= ASPIRATION_GROWTH
+        if score <= alpha:
+            alpha = score - delta if delta < ASPIRATION_MAX else -math.inf
+        else:
+            beta = score + delta if delta < ASPIRATION_MAX else math.inf
+            # failing high, move is at least better than the others
+            pv_move = move
+
+
 def choose_move_negamax(
     board: BoardBitboard,
     color: int,
     depth: int = 4,
     use_ab: bool = True,
+    pvs: bool = False,
+    probcut: ProbCut | None = None,
+    lmr: bool = False,
+    tt: TranspositionTable | None = None,
+    time_ms: int | None = None,
+    ordering: MoveOrderer | None = None,
+    incremental: bool = False,
+    eval_cache: EvalCache | None = None,
+    endgame_empties: int = 0,
+    endgame_mode: str = "exact",
+    book: OpeningBook | None = None,
+    parallel: "ParallelSearch | None" = None,
+    stop: "Event | None" = None,
+    progress: "Callable[[SearchInfo, int, int], None] | None" = None,
+    mode: str = "mixed",
+    weights: dict[str, float] | None = None,
 ) -> tuple[tuple[int, int] | None, SearchInfo]:
+    """
+    Fixed depth search, or iterative deepening when a time budget is given :
+    deepens one ply at a time (up to the nb of empties) and returns the best
+    move of the last completed depth. Depth 1 is always completed.
+    pvs : principal variation search, alpha-beta with null windows after the
+    first move, and aspiration windows at the root of iterative deepening
+    probcut, lmr : selective search, Multi-ProbCut with these parameters
+    (cf ai.probcut) and late move reductions. Both imply alpha-beta.
+    incremental : keeps disc & positional terms updated along make/unmake
+    eval_cache : leaf evaluations cache, can be shared across calls
+    endgame_empties : solves perfectly (endgame_mode exact / wld) from this
+    nb of empties, the score is then the final disc margin (or its sign)
+    book : opening book consulted before searching
+    parallel : runs the search on its worker pool (tt / ordering / incremental /
+    eval_cache are then the workers' own, stop / progress are not supported)
+    stop : event aborting the search, raises SearchTimeout unless iterative
+    deepening has a completed depth to fall back on
+    progress : called with (info, depth, move idx) on root best move changes,
+    move is -1 when a depth starts
+    mode, weights : evaluation strategy, cf heuristics.evaluate
+    """
 
     t0 = time.perf_counter()
-    info = SearchInfo(depth=depth, algo=f"negamax{'-ab' if use_ab else ''}")
+    algo = "-pvs" if pvs else "-ab" if use_ab else ""
+    algo += "-mpc" if probcut is not None else ""
+    algo += "-lmr" if lmr else ""
+    info = SearchInfo(depth=depth, algo=f"negamax{algo}")
+    ctx = SearchContext(
+        info,
+        use_ab or pvs or probcut is not None or lmr,
+        tt,
+        ordering,
+        stop=stop,
+        progress=progress,
+        mode=mode,
+        weights=weights,
+        use_pvs=pvs,
+        probcut=probcut,
+        lmr=lmr,
+    )
 
-    legal = board.legal_moves(color)
+    if parallel is not None and (stop is not None or progress is not None):
+        raise ValueError("stop and progress are not supported with parallel")
+
+    legal = list(squares(board.legal_moves_bb(color)))
     if not legal:
         info.ms = int((time.perf_counter() - t0) * 1000)
         return None, info
 
-    best, best_score = None, -math.inf
-    alpha, beta = -math.inf, math.inf
+    entry = book.probe(board, color) if book is not None else None
+    if entry is not None:
+        move, info.score, _ = entry
+        info.algo, info.depth = "book", 0
+        info.ms = int((time.perf_counter() - t0) * 1000)
+        return divmod(move, 8), info
 
-    for move in legal:
-        child = _clone_and_play(board, move, color)
-        info.nodes += 1
-        score = -_negamax(
-            child, 3 - color, color, depth - 1, -beta, -alpha, info, use_ab
+    empties = 64 - (board.white | board.black).bit_count()
+    if parallel is not None and empties > endgame_empties:
+        return parallel.search(
+            board,
+            color,
+            depth,
+            time_ms,
+            mode,
+            weights,
+            pvs=pvs,
+            probcut=probcut,
+            lmr=lmr,
         )
-        if score > best_score:
-            best_score, best = score, move
-        if use_ab and score > alpha:
-            alpha = score
+    if empties <= endgame_empties:
+        move, score, stats = solve(board, color, endgame_mode)
+        info.algo += f"-solve-{endgame_mode}"
+        info.depth = empties
+        info.nodes = stats.nodes
+        info.solve_nps = stats.nps
+        info.ms = int((time.perf_counter() - t0) * 1000)
+        info.score = score
+        return divmod(move, 8), info
+
+    # searched in place with make/unmake, an aborted search leaves it dirty
+    board = board.copy()
+    if incremental:
+        ctx.evaluator = IncrementalEvaluator(board, mode, weights)
+    ctx.eval_cache = eval_cache
+    if eval_cache is not None:
+        eval0 = eval_cache.stats()
+    if tt is not None:
+        tt.new_search()
+        stats0 = tt.stats()
+    if ordering is not None:
+        ordering.new_search()
+
+    if time_ms is None:
+        best, best_score = _search_root(board, color, legal, depth, ctx)
+    else:
+        info.algo += "-id"
+        deadline = t0 + time_ms / 1000
+        best, best_score = None, -math.inf
+        pv_move = -1
+        for d in range(1, max(1, empties) + 1):
+            t_iter = time.perf_counter()
+            ctx.deadline = deadline if d > 1 else math.inf
+            try:
+                if pvs and best is not None:
+                    move, score = _search_aspiration(
+                        board, color, legal, d, ctx, pv_move, best_score
+                    )
+                else:
+                    move, score = _search_root(board, color, legal, d, ctx, pv_move)
+            except SearchTimeout:
+                if best is None:
+                    # stopped from outside during depth 1
+                    raise
+                info.timed_out = True
+                break
+            best, best_score = move, score
+            info.depth = d
+            info.iter_ms.append(int((time.perf_counter() - t_iter) * 1000))
+            # previous best first for the next iteration
+            pv_move = move
+            if time.perf_counter() > deadline:
+                break
+
+    if tt is not None:
+        info.tt_hits, info.tt_misses, info.tt_collisions = (
+            s - s0 for s, s0 in zip(tt.stats(), stats0)
+        )
+    if eval_cache is not None:
+        hits, misses, _ = eval_cache.stats()
+        info.eval_hits, info.eval_misses = hits - eval0[0], misses - eval0[1]
 
     info.ms = int((time.perf_counter() - t0) * 1000)
     info.score = best_score
-    return best, info
+    return divmod(best, 8), info
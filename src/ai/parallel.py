@@ -0,0 +1,310 @@
+import math, os, time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Event, Value
+
+from src.engine.board_bitboard import BoardBitboard, squares
+from src.ai.move_ordering import MoveOrderer
+from src.ai.negamax import (
+    SearchTimeout,
+    _negamax,
+    _search_aspiration,
+    _search_root,
+)
+from src.ai.probcut import ProbCut
+from src.ai.search_info import SearchContext, SearchInfo
+from src.ai.transposition import SharedTranspositionTable, hash_move_first
+
+# Parallel modes
+# - root : root moves split over the workers, the best score so far is shared
+#          as alpha ; the first (pv) move is searched alone to set it
+# - lazy : Lazy SMP, every worker deepens the whole tree on the shared table,
+#          odd workers one ply deeper ; the deepest completed result wins,
+#          never deeper than the requested depth
+PARALLEL_MODES = ("root", "lazy")
+
+# worker process state, set by _init_worker
+_tt = _alpha = _stop = _orderer = None
+
+
+def _init_worker(tt, alpha, stop):
+    global _tt, _alpha, _stop, _orderer
+    _tt, _alpha, _stop = tt, alpha, stop
+    _orderer = MoveOrderer()
+
+
+def _context(deadline: float, generation: int, settings: dict) -> SearchContext:
+    """
+    settings : SearchContext fields of the caller (evaluation mode, weights,
+    pvs and selective search)
+    """
+    if generation != _tt.generation:
+        _tt.generation = generation
+        _orderer.new_search()
+    info = SearchInfo()
+    info.tt_hits, info.tt_misses, info.tt_collisions = _tt.stats()
+    return SearchContext(info, True, _tt, _orderer, deadline, stop=_stop, **settings)
+
+
+def _done(ctx: SearchContext) -> SearchInfo:
+    info = ctx.info
+    info.tt_hits, info.tt_misses, info.tt_collisions = (
+        s - s0
+        for s, s0 in zip(
+            _tt.stats(), (info.tt_hits, info.tt_misses, info.tt_collisions)
+        )
+    )
+    return info
+
+
+def _root_task(
+    board: BoardBitboard,
+    color: int,
+    move: int,
+    depth: int,
+    deadline: float,
+    generation: int,
+    settings: dict,
+) -> tuple[float | None, SearchInfo]:
+    """
+    Searches one root move with the shared best score as alpha. Returns its
+    score (an upper bound when <= alpha, None if aborted) and the worker stats.
+    """
+    ctx = _context(deadline, generation, settings)
+    board.make(move, color)
+    ctx.info.nodes += 1
+    try:
+        beta = -_alpha.value
+        score = -_negamax(board, 3 - color, depth - 1, -math.inf, beta, 1, ctx)
+    except SearchTimeout:
+        return None, _done(ctx)
+    with _alpha.get_lock():
+        if score > _alpha.value:
+            _alpha.value = score
+    return score, _done(ctx)
+
+
+def _lazy_task(
+    board: BoardBitboard,
+    color: int,
+    first_depth: int,
+    max_depth: int,
+    deadline: float,
+    generation: int,
+    main: bool,
+    settings: dict,
+) -> tuple[list[tuple[int, int, float, float]], SearchInfo]:
+    """
+    Iterative deepening until max_depth, the deadline or the stop event.
+    Returns (depth, move, score, completion time) of each completed depth.
+    The main worker always completes its first depth.
+    """
+    ctx = _context(deadline, generation, settings)
+    legal = list(squares(board.legal_moves_bb(color)))
+    done, pv = [], -1
+    for d in range(first_depth, max_depth + 1):
+        first = main and not done
+        ctx.deadline = math.inf if first else deadline
+        ctx.stop = None if first else _stop
+        try:
+            if ctx.use_pvs and done:
+                move, score = _search_aspiration(
+                    board.copy(), color, legal, d, ctx, pv, done[-1][2]
+                )
+            else:
+                move, score = _search_root(board.copy(), color, legal, d, ctx, pv)
+        except SearchTimeout:
+            break
+        done.append((d, move, score, time.perf_counter()))
+        pv = move
+    return done, _done(ctx)
+
+
+class ParallelSearch:
+    """
+    Negamax alpha-beta over a pool of worker processes sharing one
+    transposition table. Keep one instance for the whole game : the pool and
+    the table live across moves.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        mode: str = "lazy",
+        tt_size_mb: float = 64,
+    ):
+        if mode not in PARALLEL_MODES:
+            raise ValueError(f"Unknown parallel mode : {mode}")
+        self.workers = workers or os.cpu_count() or 1
+        self.mode = mode
+        self.tt = SharedTranspositionTable(tt_size_mb)
+        self._alpha = Value("d", -math.inf)
+        self._stop = Event()
+        self._pool = ProcessPoolExecutor(
+            self.workers,
+            initializer=_init_worker,
+            initargs=(self.tt, self._alpha, self._stop),
+        )
+
+    def close(self):
+        self._pool.shutdown()
+        self.tt.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def search(
+        self,
+        board: BoardBitboard,
+        color: int,
+        depth: int = 4,
+        time_ms: int | None = None,
+        mode: str = "mixed",
+        weights: dict[str, float] | None = None,
+        pvs: bool = False,
+        probcut: ProbCut | None = None,
+        lmr: bool = False,
+    ) -> tuple[tuple[int, int] | None, SearchInfo]:
+        """
+        Fixed depth search, or iterative deepening when a time budget is given
+        mode, weights : evaluation strategy, cf heuristics.evaluate
+        pvs, probcut, lmr : cf negamax.choose_move_negamax, lazy workers also
+        use aspiration windows with pvs, root splitting does not
+        """
+        t0 = time.perf_counter()
+        algo = f"negamax-{self.mode}x{self.workers}"
+        algo += "-pvs" if pvs else ""
+        algo += "-mpc" if probcut is not None else ""
+        algo += "-lmr" if lmr else ""
+        info = SearchInfo(depth=depth, algo=algo, workers=self.workers)
+        legal = list(squares(board.legal_moves_bb(color)))
+        if not legal:
+            info.ms = int((time.perf_counter() - t0) * 1000)
+            return None, info
+
+        self.tt.new_search()
+        self._stop.clear()
+        empties = 64 - (board.white | board.black).bit_count()
+        deadline = math.inf if time_ms is None else t0 + time_ms / 1000
+        if time_ms is not None:
+            info.algo += "-id"
+            depth = max(1, empties)
+        settings = {"mode": mode, "weights": weights, "use_pvs": pvs}
+        settings.update({"probcut": probcut, "lmr": lmr})
+        if self.mode == "root":
+            best, score = self._split(
+                board, color, legal, depth, deadline, info, settings
+            )
+        else:
+            best, score = self._lazy(board, color, depth, deadline, t0, info, settings)
+
+        info.ms = int((time.perf_counter() - t0) * 1000)
+        info.score = score
+        return divmod(best, 8), info
+
+    def _collect(self, info: SearchInfo, worker: SearchInfo):
+        info.nodes += worker.nodes
+        info.tt_hits += worker.tt_hits
+        info.tt_misses += worker.tt_misses
+        info.tt_collisions += worker.tt_collisions
+        info.cutoffs += worker.cutoffs
+        info.first_move_cutoffs += worker.first_move_cutoffs
+        info.researches += worker.researches
+        info.aspiration_fails += worker.aspiration_fails
+        info.probcuts += worker.probcuts
+        info.reductions += worker.reductions
+
+    def _split(
+        self,
+        board: BoardBitboard,
+        color: int,
+        legal: list[int],
+        max_depth: int,
+        deadline: float,
+        info: SearchInfo,
+        settings: dict,
+    ) -> tuple[int, float]:
+        gen = self.tt.generation
+        best, best_score, pv = None, -math.inf, -1
+        for d in range(1, max_depth + 1):
+            t_iter = time.perf_counter()
+            moves = hash_move_first(list(legal), pv)
+            self._alpha.value = -math.inf
+            # pv move alone first, its score is the alpha of the others
+            limit = deadline if d > 1 else math.inf
+            first = self._pool.submit(
+                _root_task, board, color, moves[0], d, limit, gen, settings
+            ).result()
+            futures = [
+                self._pool.submit(
+                    _root_task, board, color, m, d, limit, gen, settings
+                )
+                for m in moves[1:]
+            ]
+            scores = [first] + [f.result() for f in futures]
+            for _, w in scores:
+                self._collect(info, w)
+            if any(s is None for s, _ in scores):
+                info.timed_out = True
+                break
+            # ties go to the earliest move in the order
+            i = max(range(len(moves)), key=lambda i: (scores[i][0], -i))
+            best, best_score, pv = moves[i], scores[i][0], moves[i]
+            info.depth = d
+            info.iter_ms.append(int((time.perf_counter() - t_iter) * 1000))
+            if time.perf_counter() > deadline:
+                break
+        return best, best_score
+
+    def _lazy(
+        self,
+        board: BoardBitboard,
+        color: int,
+        depth: int,
+        deadline: float,
+        t0: float,
+        info: SearchInfo,
+        settings: dict,
+    ) -> tuple[int, float]:
+        gen = self.tt.generation
+        fixed = deadline == math.inf
+        futures = [
+            self._pool.submit(
+                _lazy_task,
+                board,
+                color,
+                1 + (i & 1) if i else 1,
+                depth + (i & 1) if fixed else depth,
+                deadline,
+                gen,
+                i == 0,
+                settings,
+            )
+            for i in range(self.workers)
+        ]
+        # helpers are stopped once the main worker is done
+        results = [futures[0].result()]
+        self._stop.set()
+        results += [f.result() for f in futures[1:]]
+
+        best, first_done = None, {}
+        for done, w in results:
+            self._collect(info, w)
+            for d, move, score, t in done:
+                # helpers one ply deeper only fill the table, the result is
+                # the one of the requested depth
+                if d > depth:
+                    continue
+                first_done[d] = min(t, first_done.get(d, math.inf))
+                if best is None or d > best[0]:
+                    best = (d, move, score)
+        info.timed_out = not fixed and best[0] < depth
+        info.depth = best[0]
+        t_prev = t0
+        for d in sorted(first_done):
+            t = max(first_done[d], t_prev)
+            info.iter_ms.append(int((t - t_prev) * 1000))
+            t_prev = t
+        return best[1], best[2]
@@ -0,0 +1,176 @@
+import argparse, time
+from array import array
+
+import numpy as np
+
+from src.engine.board_bitboard import BoardBitboard
+from src.engine.symmetry import TRANSFORMS
+from src.ai.book import self_play
+from src.ai.endgame import solve
+from src.ai.patterns import (
+    BIAS,
+    N_INSTANCES,
+    N_PHASES,
+    N_WEIGHTS,
+    WEIGHTS_PATH,
+    pattern_indices,
+    phase,
+    save_weights,
+)
+
+# Least-squares fit of the pattern weights on labeled positions :
+#   python -m src.ai.pattern_trainer --games 2000 --save-data positions.npz
+#   python -m src.ai.pattern_trainer --data positions.npz more.npz --l2 50
+# Positions come from self-play games, labeled with the final disc margin for
+# the side to move, or with the exact endgame score near the end.
+
+
+def generate(
+    n_games: int,
+    depth: int = 2,
+    random_plies: int = 10,
+    exact_empties: int = 10,
+    seed: int = 0,
+) -> dict[str, np.ndarray]:
+    """
+    Labeled positions (P, O, score for P) of self-play games
+    """
+    P, O, score = [], [], []
+    for moves in self_play(n_games, depth, random_plies, seed):
+        board, color, game = BoardBitboard(), 2, []
+        for move in moves:
+            if not board.legal_moves_bb(color):
+                color = 3 - color
+            game.append((board.white, board.black, color))
+            board.make(move, color)
+            color = 3 - color
+        margin = board.black.bit_count() - board.white.bit_count()
+        for white, black, color in game:
+            p, o = (white, black) if color == 1 else (black, white)
+            s = margin if color == 2 else -margin
+            if 64 - (white | black).bit_count() <= exact_empties:
+                pos = BoardBitboard()
+                pos.white, pos.black = white, black
+                s = solve(pos, color)[1]
+            P.append(p)
+            O.append(o)
+            score.append(s)
+    return {
+        "P": np.array(P, dtype=np.uint64),
+        "O": np.array(O, dtype=np.uint64),
+        "score": np.array(score, dtype=np.float32),
+    }
+
+
+def features(data: dict[str, np.ndarray], augment: bool = True):
+    """
+    (weight idx of the instances + bias per position, phases, targets), with
+    the 8 symmetric forms of every position when augmenting
+    """
+    forms = TRANSFORMS if augment else TRANSFORMS[:1]
+    n = len(data["score"]) * len(forms)
+    F = np.empty((n, N_INSTANCES + 1), dtype=np.int32)
+    F[:, -1] = BIAS
+    phases = np.empty(n, dtype=np.int8)
+    i = 0
+    for p, o in zip(data["P"].tolist(), data["O"].tolist()):
+        phases[i : i + len(forms)] = phase(64 - (p | o).bit_count())
+        for t in forms:
+            F[i, :-1] = pattern_indices(t(p), t(o))
+            i += 1
+    return F, phases, np.repeat(data["score"].astype(np.float64), len(forms))
+
+
+def fit(F: np.ndarray, y: np.ndarray, l2: float = 20.0, iters: int = 200):
+    """
+    Weights minimizing |Xw - y|^2 + l2 |w|^2, X the sparse 0/1 design matrix
+    whose rows have ones at F's columns, by conjugate gradient on the normal
+    equations (CGLS)
+    """
+    n, k = F.shape
+    flat = F.ravel()
+
+    def Xt(r):
+        return np.bincount(flat, weights=np.repeat(r, k), minlength=N_WEIGHTS)
+
+    w = np.zeros(N_WEIGHTS)
+    r = y.copy()
+    g = Xt(r)
+    d = g.copy()
+    gg = g @ g
+    for _ in range(iters):
+        if gg < 1e-12:
+            break
+        q = d[F].sum(axis=1)
+        a = gg / (q @ q + l2 * (d @ d))
+        w += a * d
+        r -= a * q
+        g = Xt(r) - l2 * w
+        gg, gg_old = g @ g, gg
+        d = g + (gg / gg_old) * d
+    return w
+
+
+def train(data, l2: float = 20.0, iters: int = 200, holdout: float = 0.1, seed=0):
+    """
+    Fits each phase on its positions, returns (weights, per phase report)
+    """
+    F, phases, y = features(data)
+    # held out by position, with all its symmetric forms
+    rng = np.random.default_rng(seed)
+    n = len(data["score"])
+    test = np.repeat(rng.random(n) < holdout, len(y) // n)
+    weights, report = [], []
+    for ph in range(N_PHASES):
+        sel = phases == ph
+        tr, te = sel & ~test, sel & test
+        w = fit(F[tr], y[tr], l2, iters) if tr.any() else np.zeros(N_WEIGHTS)
+        weights.append(array("f", w.astype(np.float32).tobytes()))
+        rmse = [
+            float(np.sqrt(np.mean((w[F[m]].sum(axis=1) - y[m]) ** 2)))
+            if m.any()
+            else 0.0
+            for m in (tr, te)
+        ]
+        report.append((ph, int(tr.sum()), *rmse))
+    return weights, report
+
+
+def load_data(paths: list[str]) -> dict[str, np.ndarray]:
+    parts = [np.load(p) for p in paths]
+    return {k: np.concatenate([d[k] for d in parts]) for k in ("P", "O", "score")}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trains the pattern weights")
+    parser.add_argument("--games", type=int, default=0, help="new self-play games")
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--plies", type=int, default=10, help="random opening plies")
+    parser.add_argument("--exact", type=int, default=10, help="solved empties")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data", nargs="*", default=[], help=".npz positions")
+    parser.add_argument("--save-data", help="writes the new positions (.npz)")
+    parser.add_argument("--l2", type=float, default=20.0)
+    parser.add_argument("--iters", type=int, default=200)
+    parser.add_argument("--out", default=WEIGHTS_PATH)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    data = load_data(args.data) if args.data else None
+    if args.games:
+        new = generate(args.games, args.depth, args.plies, args.exact, args.seed)
+        print(f"{len(new['P'])} positions in {time.perf_counter() - t0:.0f}s")
+        if args.save_data:
+            np.savez(args.save_data, **new)
+        if data is not None:
+            new = {k: np.concatenate([data[k], new[k]]) for k in new}
+        data = new
+    if data is None:
+        parser.error("no positions : --games and/or --data")
+
+    t0 = time.perf_counter()
+    weights, report = train(data, args.l2, args.iters, seed=args.seed)
+    for ph, n, rmse_train, rmse_test in report:
+        print(f"phase {ph} : {n} samples | rmse {rmse_train:.2f} / {rmse_test:.2f}")
+    save_weights(weights, args.out)
+    print(f"trained in {time.perf_counter() - t0:.0f}s, weights in {args.out}")
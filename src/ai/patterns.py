@@ -0,0 +1,209 @@
+from array import array
+
+from src.engine.symmetry import SQUARE_MAPS, flip_diagonal
+
+# Logistello-style pattern evaluation : the board is cut into overlapping
+# patterns (edges, corners, lines, diagonals), each instance of a pattern
+# reads its squares as a base-3 number (0 empty, 1 player, 2 opponent) and
+# looks it up in the weight table of the pattern for the game phase.
+# The 8 symmetric instances of a pattern share its table.
+PATTERNS = {
+    "edge2x": [(0, c) for c in range(8)] + [(1, 1), (1, 6)],
+    "corner3x3": [(r, c) for r in range(3) for c in range(3)],
+    "corner2x5": [(r, c) for r in range(2) for c in range(5)],
+    "line2": [(1, c) for c in range(8)],
+    "line3": [(2, c) for c in range(8)],
+    "line4": [(3, c) for c in range(8)],
+    "diag8": [(i, i) for i in range(8)],
+    "diag7": [(i, i + 1) for i in range(7)],
+    "diag6": [(i, i + 2) for i in range(6)],
+    "diag5": [(i, i + 3) for i in range(5)],
+    "diag4": [(i, i + 4) for i in range(4)],
+}
+N_PHASES = 4
+PHASE_EMPTIES = 15  # empties per phase, from the start position
+WEIGHTS_PATH = "patterns.bin"
+MAGIC = b"OTHPAT01"
+
+# collects the bits of squares on distinct columns into one byte, bit = column
+GATHER = 0x0101010101010101
+
+
+def phase(empties: int) -> int:
+    return min(N_PHASES - 1, max(0, 60 - empties) // PHASE_EMPTIES)
+
+
+def _instances(squares: list[tuple[int, int]]) -> list[tuple[int, ...]]:
+    """
+    Distinct instances of a pattern over the 8 symmetries, as square idx
+    """
+    base = [r * 8 + c for r, c in squares]
+    seen, instances = set(), []
+    for m in SQUARE_MAPS:
+        inst = tuple(m[s] for s in base)
+        if frozenset(inst) not in seen:
+            seen.add(frozenset(inst))
+            instances.append(inst)
+    return instances
+
+
+def _ternary_table(digits: list[int]) -> array:
+    """
+    byte -> sum of 3^k over the set bits, digits[bit] = k (-1 : not in it)
+    """
+    table = array("I", bytes(4 * 256))
+    for v in range(256):
+        table[v] = sum(3 ** k for b, k in enumerate(digits) if v >> b & 1 and k >= 0)
+    return table
+
+
+def _plan(inst: tuple[int, ...]) -> tuple:
+    """
+    How to read an instance's index from the bitboards, the cheapest of :
+    - ("gather", transposed, mask, table) : squares on distinct columns
+    - ("rows", transposed, ((shift, table), ...)) : one lookup per row
+    """
+    options = []
+    for transposed in (False, True):
+        sq = [(s & 7) * 8 + (s >> 3) if transposed else s for s in inst]
+        rows = sorted({s >> 3 for s in sq})
+        steps = []
+        for r in rows:
+            digits = [-1] * 8
+            for k, s in enumerate(sq):
+                if s >> 3 == r:
+                    digits[s & 7] = k
+            steps.append((8 * r, _ternary_table(digits)))
+        options.append((len(rows), ("rows", transposed, tuple(steps))))
+        if len({s & 7 for s in sq}) == len(sq) and len(rows) > 1:
+            digits = [-1] * 8
+            for k, s in enumerate(sq):
+                digits[s & 7] = k
+            mask = sum(1 << s for s in sq)
+            table = _ternary_table(digits)
+            options.append((1.5, ("gather", transposed, mask, table)))
+    return min(options, key=lambda o: o[0])[1]
+
+
+def _layout():
+    """
+    Offset of each pattern's table in a phase's flat weight array (the last
+    weight is the phase bias) and the read plans of the instances, split by
+    kind and by board (as is / transposed)
+    """
+    offsets, size = {}, 0
+    gathers, rows = ([], []), ([], [])
+    for name, squares in PATTERNS.items():
+        offsets[name] = size
+        for inst in _instances(squares):
+            kind, transposed, *plan = _plan(inst)
+            (gathers if kind == "gather" else rows)[transposed].append((size, *plan))
+        size += 3 ** len(squares)
+    return offsets, tuple(map(tuple, gathers)), tuple(map(tuple, rows)), size + 1
+
+
+OFFSETS, GATHERS, ROWS, N_WEIGHTS = _layout()
+BIAS = N_WEIGHTS - 1
+N_INSTANCES = sum(map(len, GATHERS + ROWS))
+
+
+def pattern_indices(P: int, O: int) -> list[int]:
+    """
+    Weight idx of every pattern instance, P to move
+    """
+    indices = []
+    for bb, (p, o) in enumerate(((P, O), (flip_diagonal(P), flip_diagonal(O)))):
+        for off, mask, t in GATHERS[bb]:
+            indices.append(
+                off
+                + t[((p & mask) * GATHER >> 56) & 0xFF]
+                + 2 * t[((o & mask) * GATHER >> 56) & 0xFF]
+            )
+        for off, steps in ROWS[bb]:
+            for shift, t in steps:
+                off += t[(p >> shift) & 0xFF] + 2 * t[(o >> shift) & 0xFF]
+            indices.append(off)
+    return indices
+
+
+# ------ weights : one flat array("f") of N_WEIGHTS per phase
+_active = None
+
+
+def zero_weights() -> list[array]:
+    return [array("f", bytes(4 * N_WEIGHTS)) for _ in range(N_PHASES)]
+
+
+def save_weights(weights: list[array], path: str = WEIGHTS_PATH):
+    """
+    magic | nb of phases (I) | weights per phase (I) | f[N_WEIGHTS] per phase
+    """
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        array("I", [len(weights), N_WEIGHTS]).tofile(f)
+        for w in weights:
+            w.tofile(f)
+
+
+def load_weights(path: str = WEIGHTS_PATH) -> list[array]:
+    """
+    Reads a weights file and makes it the one used by mode="pattern"
+    """
+    global _active
+    with open(path, "rb") as f:
+        header = array("I")
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a pattern weights file : {path}")
+        header.fromfile(f, 2)
+        if tuple(header) != (N_PHASES, N_WEIGHTS):
+            raise ValueError(f"Pattern weights of another layout : {path}")
+        weights = []
+        for _ in range(N_PHASES):
+            w = array("f")
+            w.fromfile(f, N_WEIGHTS)
+            weights.append(w)
+    _active = weights
+    return weights
+
+
+def active_weights() -> list[array]:
+    """
+    Weights of mode="pattern", read from WEIGHTS_PATH on first use
+    """
+    if _active is None:
+        try:
+            return load_weights()
+        except FileNotFoundError:
+            raise FileNotFoundError(
+                f"No pattern weights in {WEIGHTS_PATH}, "
+                "train them with python -m src.ai.pattern_trainer"
+            ) from None
+    return _active
+
+
+def set_active_weights(weights: list[array] | None):
+    global _active
+    _active = weights
+
+
+def evaluate_patterns(board, color: int, weights=None) -> float:
+    """
+    Sum of the instances' weights for the phase, in discs for color
+    weights : per phase arrays, the active ones by default
+    """
+    P = board.white if color == 1 else board.black
+    O = board.black if color == 1 else board.white
+    w = (weights or active_weights())[phase(64 - (P | O).bit_count())]
+    score = w[BIAS]
+    for bb, (p, o) in enumerate(((P, O), (flip_diagonal(P), flip_diagonal(O)))):
+        for off, mask, t in GATHERS[bb]:
+            score += w[
+                off
+                + t[((p & mask) * GATHER >> 56) & 0xFF]
+                + 2 * t[((o & mask) * GATHER >> 56) & 0xFF]
+            ]
+        for off, steps in ROWS[bb]:
+            for shift, t in steps:
+                off += t[(p >> shift) & 0xFF] + 2 * t[(o >> shift) & 0xFF]
+            score += w[off]
+    return score
@@ -0,0 +1,87 @@
+import json
+
+from src.ai.patterns import phase
+
+# Multi-ProbCut (Buro) : the score of a deep search is predicted from a
+# shallow one by a linear fit  v_depth ~ a * v_shallow + b, with residuals of
+# deviation sigma. When the shallow score makes v_depth >= beta (or <= alpha)
+# likely by t sigmas, the deep search is skipped. Parameters are fitted per
+# evaluation (mode, or mode and custom weights), game phase, depth and
+# shallow depth by src.ai.probcut_calibration. An evaluation without fitted
+# parameters is never cut.
+PROBCUT_PATH = "probcut.json"
+PROBCUT_T = 1.5
+PROBCUT_MIN_DEPTH = 3
+# shallow depths tried before a search of depth d, cheapest first, same
+# parity as d (odd / even depths score differently)
+SHALLOW_GAPS = (4, 2)
+
+
+def shallow_depths(depth: int) -> list[int]:
+    return [depth - gap for gap in SHALLOW_GAPS if depth - gap >= 0]
+
+
+def eval_key(mode: str, weights: dict[str, float] | None = None) -> str:
+    """
+    Name of an evaluation in the parameters : the mode, with its nonzero
+    custom weights if any (e.g. "mixed:disc=0.4,mob=1,pos=0.8")
+    """
+    if weights is None:
+        return mode
+    terms = ",".join(f"{k}={v:g}" for k, v in sorted(weights.items()) if v)
+    return f"{mode}:{terms}"
+
+
+class ProbCut:
+    """
+    Fitted Multi-ProbCut parameters : params[(eval key, phase, depth)] is a
+    list of (shallow depth, a, b, sigma), cf eval_key. Depths past the
+    deepest fitted one reuse its parameters with the shallow depths shifted
+    as much.
+    t : cut threshold in sigmas, lower prunes more and errs more
+    """
+
+    def __init__(self, params: dict | None = None, t: float = PROBCUT_T):
+        self.params = params or {}
+        self.t = t
+        self.max_depth = max((d for _, _, d in self.params), default=0)
+        self._checks = {}
+
+    def checks(
+        self, mode: str, weights: dict | None, empties: int, depth: int
+    ) -> list[tuple]:
+        """
+        (shallow depth, a, b, margin) of the cut tests before a depth search
+        """
+        key = (eval_key(mode, weights), phase(empties), depth)
+        if key not in self._checks:
+            shift = max(0, depth - self.max_depth)
+            fitted = self.params.get((key[0], key[1], depth - shift), [])
+            self._checks[key] = [
+                (shallow + shift, a, b, self.t * sigma)
+                for shallow, a, b, sigma in fitted
+                if a > 0
+            ]
+        return self._checks[key]
+
+    def save(self, path: str = PROBCUT_PATH):
+        """
+        {eval key: {phase: {depth: [[shallow, a, b, sigma], ...]}}}
+        """
+        tree = {}
+        for (mode, ph, depth), fits in sorted(self.params.items()):
+            tree.setdefault(mode, {}).setdefault(str(ph), {})[str(depth)] = fits
+        with open(path, "w") as f:
+            json.dump(tree, f, indent=1)
+
+    @classmethod
+    def load(cls, path: str = PROBCUT_PATH, t: float = PROBCUT_T) -> "ProbCut":
+        with open(path) as f:
+            tree = json.load(f)
+        params = {
+            (mode, int(ph), int(depth)): [tuple(fit) for fit in fits]
+            for mode, phases in tree.items()
+            for ph, depths in phases.items()
+            for depth, fits in depths.items()
+        }
+        return cls(params, t)
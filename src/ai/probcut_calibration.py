@@ -0,0 +1,142 @@
+import argparse, math, os, statistics, time
+
+from src.engine.board_bitboard import BoardBitboard, squares
+from src.ai.book import self_play
+from src.ai.heuristics import WEIGHTS_ABSOLUTE, evaluate
+from src.ai.move_ordering import MoveOrderer
+from src.ai.negamax import _search_root
+from src.ai.patterns import N_PHASES, phase
+from src.ai.probcut import (
+    PROBCUT_MIN_DEPTH,
+    PROBCUT_PATH,
+    ProbCut,
+    eval_key,
+    shallow_depths,
+)
+from src.ai.search_info import SearchContext, SearchInfo
+from src.ai.transposition import TranspositionTable
+
+# Fits the Multi-ProbCut parameters (cf ai.probcut) :
+#   python -m src.ai.probcut_calibration --games 60 --max-depth 6
+#   python -m src.ai.probcut_calibration --weights 0.4/0.8/1/0.4/0.6
+# Positions are sampled from self-play games and searched by the engine
+# (iterative deepening, plain alpha-beta) ; the score at each depth is fitted
+# on the score at its shallow depths, per game phase.
+
+# fewer positions than this in a phase : no parameters, no cut
+MIN_SAMPLES = 30
+
+
+def positions(n_games: int, depth: int, random_plies: int, every: int, seed: int):
+    """
+    (board, color) every `every` plies of self-play games, game over excluded
+    """
+    for moves in self_play(n_games, depth, random_plies, seed):
+        board, color = BoardBitboard(), 2
+        for ply, move in enumerate(moves):
+            if not board.legal_moves_bb(color):
+                color = 3 - color
+            if ply % every == 0:
+                yield board.copy(), color
+            board.make(move, color)
+            color = 3 - color
+
+
+def depth_scores(
+    board: BoardBitboard,
+    color: int,
+    max_depth: int,
+    mode: str,
+    weights: dict[str, float] | None,
+    tt: TranspositionTable,
+    orderer: MoveOrderer,
+) -> list[float]:
+    """
+    Negamax values of the position searched at depths 0 to max_depth
+    """
+    tt.clear()
+    tt.new_search()
+    orderer.new_search()
+    ctx = SearchContext(SearchInfo(), True, tt, orderer, mode=mode, weights=weights)
+    legal = list(squares(board.legal_moves_bb(color)))
+    scores = [evaluate(board, color, mode, weights)]
+    move = -1
+    for d in range(1, max_depth + 1):
+        move, score = _search_root(board, color, legal, d, ctx, move)
+        scores.append(score)
+    return scores
+
+
+def fit(samples: list[list[list[float]]], max_depth: int, key: str) -> dict:
+    """
+    ProbCut params of one evaluation (cf probcut.eval_key) from the depth
+    scores of each phase's positions : least squares line and deviation of
+    its residuals
+    """
+    params = {}
+    for ph, rows in enumerate(samples):
+        if len(rows) < MIN_SAMPLES:
+            continue
+        for depth in range(PROBCUT_MIN_DEPTH, max_depth + 1):
+            fits = []
+            for shallow in shallow_depths(depth):
+                x = [r[shallow] for r in rows]
+                y = [r[depth] for r in rows]
+                a, b = statistics.linear_regression(x, y)
+                res = sum((yi - a * xi - b) ** 2 for xi, yi in zip(x, y))
+                sigma = math.sqrt(res / (len(rows) - 2))
+                fits.append([shallow, round(a, 4), round(b, 3), round(sigma, 3)])
+            params[(key, ph, depth)] = fits
+    return params
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fits the ProbCut parameters")
+    parser.add_argument("--games", type=int, default=60, help="self-play games")
+    parser.add_argument("--depth", type=int, default=2, help="self-play depth")
+    parser.add_argument("--plies", type=int, default=8, help="random opening plies")
+    parser.add_argument("--every", type=int, default=3, help="plies between samples")
+    parser.add_argument("--max-depth", type=int, default=6)
+    parser.add_argument("--mode", default="mixed", help="heuristics mode")
+    parser.add_argument(
+        "--weights", help="custom weights, disc/pos/mob/front[/stab]"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=PROBCUT_PATH)
+    args = parser.parse_args()
+    weights = None
+    if args.weights:
+        values = list(map(float, args.weights.split("/")))
+        if len(values) not in (len(WEIGHTS_ABSOLUTE) - 1, len(WEIGHTS_ABSOLUTE)):
+            parser.error(f"weights are {'/'.join(WEIGHTS_ABSOLUTE)}")
+        weights = dict(zip(WEIGHTS_ABSOLUTE, values))
+    key = eval_key(args.mode, weights)
+
+    t0 = time.perf_counter()
+    tt, orderer = TranspositionTable(16), MoveOrderer()
+    samples = [[] for _ in range(N_PHASES)]
+    pos = positions(args.games, args.depth, args.plies, args.every, args.seed)
+    for board, color in pos:
+        empties = 64 - (board.white | board.black).bit_count()
+        if empties <= args.max_depth:
+            continue
+        scores = depth_scores(
+            board, color, args.max_depth, args.mode, weights, tt, orderer
+        )
+        samples[phase(empties)].append(scores)
+    n = sum(map(len, samples))
+    print(f"{n} positions searched in {time.perf_counter() - t0:.0f}s")
+
+    # the other evaluations' parameters are kept
+    old = ProbCut.load(args.out).params if os.path.exists(args.out) else {}
+    params = {k: v for k, v in old.items() if k[0] != key}
+    params.update(fit(samples, args.max_depth, key))
+    print(key)
+    for (k, ph, depth), fits in sorted(params.items()):
+        if k == key:
+            print(
+                f"phase {ph} depth {depth} : "
+                + " | ".join(f"from {s} a={a} b={b} sigma={sg}" for s, a, b, sg in fits)
+            )
+    ProbCut(params).save(args.out)
+    print(f"parameters in {args.out}")
@@ -0,0 +1,109 @@
+import math
+from itertools import accumulate
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from threading import Event
+    from src.ai.eval_cache import EvalCache
+    from src.ai.incremental import IncrementalEvaluator
+    from src.ai.move_ordering import MoveOrderer
+    from src.ai.probcut import ProbCut
+    from src.ai.transposition import TranspositionTable
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when the time budget is exhausted or the search
+    is stopped from outside
+    """
+
+
+@dataclass
+class SearchInfo:
+    nodes: int = 0
+    ms: int = 0
+    score: float = 0.0
+    depth: int = 0
+    algo: str = ""
+    # transposition table
+    tt_hits: int = 0
+    tt_misses: int = 0
+    tt_collisions: int = 0
+    # iterative deepening
+    iter_ms: list[int] = field(default_factory=list)
+    timed_out: bool = False
+    # move ordering
+    cutoffs: int = 0
+    first_move_cutoffs: int = 0
+    # leaf evaluation cache
+    eval_hits: int = 0
+    eval_misses: int = 0
+    # endgame solver, nodes/s
+    solve_nps: int = 0
+    # parallel search
+    workers: int = 1
+    # monte carlo tree search
+    playouts: int = 0
+    # principal variation search : null window probes searched again with
+    # the full window, root searches redone after an aspiration window miss
+    researches: int = 0
+    aspiration_fails: int = 0
+    # selective search : Multi-ProbCut cuts, late moves not searched deeper
+    # than their reduced search
+    probcuts: int = 0
+    reductions: int = 0
+
+    @property
+    def first_cutoff_rate(self) -> float:
+        """
+        Share of beta cutoffs produced by the first move tried
+        """
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def nps(self) -> int:
+        """
+        Nodes per second, summed over the workers
+        """
+        return int(self.nodes * 1000 / self.ms) if self.ms else 0
+
+    @property
+    def playouts_per_s(self) -> int:
+        return int(self.playouts * 1000 / self.ms) if self.ms else 0
+
+    @property
+    def time_to_depth(self) -> list[int]:
+        """
+        ms elapsed when each depth of iterative deepening was completed
+        """
+        return list(accumulate(self.iter_ms))
+
+
+@dataclass
+class SearchContext:
+    """
+    Per-call settings & state threaded through the recursive search
+    """
+
+    info: SearchInfo
+    use_ab: bool = True
+    tt: "TranspositionTable | None" = None
+    orderer: "MoveOrderer | None" = None
+    deadline: float = math.inf
+    evaluator: "IncrementalEvaluator | None" = None
+    eval_cache: "EvalCache | None" = None
+    # evaluation strategy, cf heuristics.evaluate
+    mode: str = "mixed"
+    weights: "dict[str, float] | None" = None
+    # set from outside to abort the search like a timeout (threading or
+    # multiprocessing event)
+    stop: "Event | None" = None
+    # called with (info, depth, move idx) when the root best move changes,
+    # move -1 when a depth starts
+    progress: "Callable[[SearchInfo, int, int], None] | None" = None
+    # principal variation search (null windows after the first move)
+    use_pvs: bool = False
+    # selective search, cf ai.probcut and negamax.LMR_MOVES
+    probcut: "ProbCut | None" = None
+    lmr: bool = False
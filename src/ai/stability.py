@@ -0,0 +1,158 @@
+from src.engine.board_bitboard import FULL
+
+# Stable discs : discs that no sequence of moves can flip anymore.
+# Edge discs are looked up exactly in a table over the 3^8 configurations
+# of an edge, inner discs are stable when each of their 4 lines is full or
+# holds a stable neighbour of theirs (a subset of the truly stable discs).
+
+CENTRAL = 0x007E7E7E7E7E7E00
+FILE_A = 0x0101010101010101
+# gathers the a-file into the top byte, bit k = row k
+FILE_GATHER = 0x0102040810204080
+
+
+def _line_flips(p: int, o: int, bit: int) -> int:
+    """
+    Discs of o flipped on an 8-square line when p plays bit
+    """
+    flips = 0
+    for step in (1, -1):
+        run = 0
+        x = bit << 1 if step > 0 else bit >> 1
+        while x & o:
+            run |= x
+            x = x << 1 if step > 0 else x >> 1
+        if x & p:
+            flips |= run
+    return flips
+
+
+def _edge_table() -> bytearray:
+    """
+    table[p << 8 | o] : discs of p that stay p whatever moves (of either
+    side, on any empty square) are played on the line
+    """
+    memo = {}
+
+    def stable(p: int, o: int) -> int:
+        key = p << 8 | o
+        if key in memo:
+            return memo[key]
+        s = p
+        empty = ~(p | o) & 0xFF
+        while empty and s:
+            bit = empty & -empty
+            empty ^= bit
+            f = _line_flips(p, o, bit)
+            s &= stable(p | bit | f, o & ~f)
+            f = _line_flips(o, p, bit)
+            s &= stable(p & ~f, o | bit | f)
+        memo[key] = s
+        return s
+
+    table = bytearray(1 << 16)
+    for p in range(256):
+        for o in range(256):
+            if not p & o:
+                table[p << 8 | o] = stable(p, o)
+    return table
+
+
+EDGE_STABLE = _edge_table()
+# byte of a-file bits -> a-file bitboard
+FILE_BITS = [sum(1 << 8 * k for k in range(8) if b >> k & 1) for b in range(256)]
+
+
+def _reach_masks(dr: int, dc: int) -> tuple[int, int, int]:
+    """
+    Squares less than 1, 2 and 4 steps from the edge in direction (dr, dc)
+    """
+    masks = []
+    for k in (1, 2, 4):
+        mask = 0
+        for idx in range(64):
+            r, c = divmod(idx, 8)
+            if not (0 <= r + k * dr < 8 and 0 <= c + k * dc < 8):
+                mask |= 1 << idx
+        masks.append(mask)
+    return tuple(masks)
+
+
+# a1-h8 diagonals (step 9) then a8-h1 (step 7), down and up the board
+D9_DOWN = _reach_masks(1, 1)
+D9_UP = _reach_masks(-1, -1)
+D7_DOWN = _reach_masks(1, -1)
+D7_UP = _reach_masks(-1, 1)
+
+
+def _full_lines(occupied: int) -> tuple[int, int, int, int]:
+    """
+    Squares on a full row, column, a8-h1 and a1-h8 diagonal
+    """
+    # bit 0 of each row ends up set when the row is full
+    h = occupied & (occupied >> 4)
+    h &= h >> 2
+    h &= h >> 1
+    h = (h & FILE_A) * 0xFF
+    v = occupied & (occupied >> 32)
+    v &= v >> 16
+    v &= v >> 8
+    v = (v & 0xFF) * FILE_A
+    # squares occupied all the way to the edge both ways, in 3 doubling steps
+    a1, a2, a4 = D9_DOWN
+    b1, b2, b4 = D9_UP
+    d = occupied & (a1 | occupied >> 9)
+    u = occupied & (b1 | occupied << 9)
+    d &= a2 | d >> 18
+    u &= b2 | u << 18
+    d9 = d & (a4 | d >> 36) & u & (b4 | u << 36)
+    a1, a2, a4 = D7_DOWN
+    b1, b2, b4 = D7_UP
+    d = occupied & (a1 | occupied >> 7)
+    u = occupied & (b1 | occupied << 7)
+    d &= a2 | d >> 14
+    u &= b2 | u << 14
+    d7 = d & (a4 | d >> 28) & u & (b4 | u << 28)
+    return h, v, d7, d9
+
+
+def _file(x: int, c: int) -> int:
+    return (((x >> c) & FILE_A) * FILE_GATHER >> 56) & 0xFF
+
+
+def stable_discs(P: int, O: int) -> int:
+    """
+    Bitboard of the stable discs of P
+    """
+    t = EDGE_STABLE
+    stable = t[(P & 0xFF) << 8 | (O & 0xFF)]
+    stable |= t[(P >> 56) << 8 | (O >> 56)] << 56
+    stable |= FILE_BITS[t[_file(P, 0) << 8 | _file(O, 0)]]
+    stable |= FILE_BITS[t[_file(P, 7) << 8 | _file(O, 7)]] << 7
+
+    h, v, d7, d9 = _full_lines(P | O)
+    central = P & CENTRAL
+    stable |= central & h & v & d7 & d9
+    # central discs with, on each line, a stable neighbour or no empty
+    while True:
+        grown = stable | (
+            central
+            & ((stable >> 1) | (stable << 1) | h)
+            & ((stable >> 8) | (stable << 8) | v)
+            & ((stable >> 7) | (stable << 7) | d7)
+            & ((stable >> 9) | (stable << 9) | d9)
+        )
+        if grown == stable:
+            return stable & FULL
+        stable = grown
+
+
+def stability_bounds(P: int, O: int) -> tuple[int, int]:
+    """
+    (lower, upper) bounds of the final disc margin for P : stable discs of
+    P keep their color, the other squares can at best all go to P
+    """
+    return (
+        2 * stable_discs(P, O).bit_count() - 64,
+        64 - 2 * stable_discs(O, P).bit_count(),
+    )
@@ -0,0 +1,193 @@
+import random
+from array import array
+from multiprocessing import shared_memory
+
+# Bound types
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Replacement policies
+# - always : newest entry wins
+# - depth : keep the deepest entry
+# - age : keep the deepest entry of the current search, overwrite older searches
+POLICIES = ("always", "depth", "age")
+
+# keys (Q) + values (d) + depth, flag, move, age (b/B)
+ENTRY_BYTES = 8 + 8 + 4
+
+# fixed seed : hashes must be stable across runs (books, logs)
+_rng = random.Random(0x0DE110)
+ZOBRIST_WHITE = [_rng.getrandbits(64) for _ in range(64)]
+ZOBRIST_BLACK = [_rng.getrandbits(64) for _ in range(64)]
+ZOBRIST_SIDE = _rng.getrandbits(64)  # xored when white is to move
+
+
+def _byte_tables(keys: list[int]) -> list[list[int]]:
+    """
+    For each of the 8 bytes of a bitboard, precompute the xor of the keys of
+    every subset of its 8 squares -> hashing a bitboard costs 8 lookups
+    """
+    tables = []
+    for byte in range(8):
+        t = [0] * 256
+        for v in range(1, 256):
+            lsb = v & -v
+            t[v] = t[v & (v - 1)] ^ keys[byte * 8 + lsb.bit_length() - 1]
+        tables.append(t)
+    return tables
+
+
+_BYTE_TABLES = list(zip(_byte_tables(ZOBRIST_WHITE), _byte_tables(ZOBRIST_BLACK)))
+
+
+def zobrist_hash(white: int, black: int, color: int) -> int:
+    """
+    Zobrist hash of a position with `color` to move
+    """
+    h = ZOBRIST_SIDE if color == 1 else 0
+    for wt, bt in _BYTE_TABLES:
+        h ^= wt[white & 0xFF] ^ bt[black & 0xFF]
+        white >>= 8
+        black >>= 8
+    return h
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results, one entry per slot.
+    Values are stored from the side to move point of view so the same table
+    can be shared by minimax and negamax.
+    """
+
+    def __init__(self, size_mb: float = 16, policy: str = "depth"):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown replacement policy : {policy}")
+        n = max(1, int(size_mb * 1024 * 1024) // ENTRY_BYTES)
+        self.size = 1 << (n.bit_length() - 1)  # power of 2 below the cap
+        self.mask = self.size - 1
+        self.policy = policy
+        self.generation = 0
+        self.clear()
+
+    def clear(self):
+        n = self.size
+        self.keys = array("Q", bytes(8 * n))
+        self.values = array("d", bytes(8 * n))
+        self.depths = array("b", bytes(n))
+        self.flags = array("b", bytes(n))
+        self.moves = array("b", [-1]) * n
+        self.ages = array("B", bytes(n))
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def new_search(self):
+        """
+        Marks entries stored so far as old (used by the age policy)
+        """
+        self.generation = (self.generation + 1) & 0xFF
+
+    def lookup(self, key: int) -> tuple[int, float, int, int] | None:
+        """
+        Returns (depth, value, flag, move) stored for key, or None
+        """
+        i = key & self.mask
+        stored = self.keys[i]
+        if stored == key:
+            self.hits += 1
+            return self.depths[i], self.values[i], self.flags[i], self.moves[i]
+        if stored:
+            # slot owned by another position
+            self.collisions += 1
+        else:
+            self.misses += 1
+        return None
+
+    def store(self, key: int, depth: int, value: float, flag: int, move: int):
+        i = key & self.mask
+        stored = self.keys[i]
+        if stored and stored != key and self.depths[i] > depth:
+            if self.policy == "depth":
+                return
+            if self.policy == "age" and self.ages[i] == self.generation:
+                return
+        self.keys[i] = key
+        self.values[i] = value
+        self.depths[i] = depth
+        self.flags[i] = flag
+        self.moves[i] = move
+        self.ages[i] = self.generation
+
+    def stats(self) -> tuple[int, int, int]:
+        return self.hits, self.misses, self.collisions
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """
+    Same table with its columns in a shared memory block, for searches running
+    in several processes (Lazy SMP). Pickling only sends the block name, the
+    receiving process maps the same memory. Entries are written without locks :
+    a torn entry can only mislead ordering or a bound, never the move legality.
+    """
+
+    def __init__(self, size_mb: float = 16, policy: str = "depth"):
+        self._shm = None
+        super().__init__(size_mb, policy)
+
+    def _attach(self, name: str | None):
+        n = self.size
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=ENTRY_BYTES * n)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self._owner = name is None
+        buf = self._shm.buf
+        self.keys = buf[: 8 * n].cast("Q")
+        self.values = buf[8 * n : 16 * n].cast("d")
+        self.depths = buf[16 * n : 17 * n].cast("b")
+        self.flags = buf[17 * n : 18 * n].cast("b")
+        self.moves = buf[18 * n : 19 * n].cast("b")
+        self.ages = buf[19 * n : 20 * n]
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def clear(self):
+        if self._shm is None:
+            self._attach(None)
+        n = self.size
+        buf = self._shm.buf
+        buf[: 18 * n] = bytes(18 * n)
+        buf[18 * n : 19 * n] = b"\xff" * n
+        buf[19 * n :] = bytes(len(buf) - 19 * n)
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def __getstate__(self):
+        return self._shm.name, self.size, self.policy, self.generation
+
+    def __setstate__(self, state):
+        name, self.size, self.policy, self.generation = state
+        self.mask = self.size - 1
+        self._attach(name)
+
+    def close(self):
+        """
+        Unmaps the block, the creating process also frees it
+        """
+        for col in (self.keys, self.values, self.depths, self.flags, self.moves):
+            col.release()
+        self.ages.release()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def hash_move_first(legal: list[int], hash_move: int) -> list[int]:
+    """
+    Moves the stored best move in front of the legal moves (square indices)
+    """
+    if hash_move in legal:
+        legal.remove(hash_move)
+        legal.insert(0, hash_move)
+    return legal
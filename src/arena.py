@@ -0,0 +1,351 @@
+import argparse, json, math, os, random, time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import combinations
+
+from src.engine.board_bitboard import BoardBitboard, squares
+from src.ai.book import OpeningBook, position_key
+from src.ai.minimax import choose_move_minimax
+from src.ai.move_ordering import MoveOrderer
+from src.ai.negamax import choose_move_negamax
+from src.ai.probcut import ProbCut
+from src.ai.transposition import TranspositionTable
+
+# Headless engine-vs-engine matches :
+#   python -m src.arena negamax-ab:depth=4 "negamax-ab:depth=4,mode=mobility" \
+#       --games 1000 --workers 8 --out results.jsonl
+# A player spec is algo[:key=value,...] with keys
+#   depth, time (ms per move, negamax-pvs then deepens iteratively),
+#   mode (heuristics mode, pattern reads the weights in
+#   ai.patterns.WEIGHTS_PATH),
+#   weights (disc/pos/mob/front[/stab], e.g. 0.4/0.8/1/0.4/0.6),
+#   endgame (solved empties),
+#   probcut (Multi-ProbCut threshold in sigmas, reads the parameters in
+#   ai.probcut.PROBCUT_PATH), lmr (1 : late move reductions)
+ALGOS = (
+    "random",
+    "minimax",
+    "minimax-ab",
+    "negamax",
+    "negamax-ab",
+    "negamax-id",
+    "negamax-pvs",
+)
+WEIGHT_TERMS = ("disc", "pos", "mob", "front", "stab")
+TT_SIZE_MB = 8
+
+
+def parse_player(spec: str) -> dict:
+    algo, _, opts = spec.partition(":")
+    if algo not in ALGOS:
+        raise ValueError(f"Unknown algo : {algo}")
+    player = {"name": spec, "algo": algo, "depth": 4, "time": None}
+    player.update({"mode": "mixed", "weights": None, "endgame": 0})
+    player.update({"probcut": 0.0, "lmr": False})
+    for opt in filter(None, opts.split(",")):
+        key, _, value = opt.partition("=")
+        if key in ("depth", "time", "endgame"):
+            player[key] = int(value)
+        elif key == "mode":
+            player["mode"] = value
+        elif key == "probcut":
+            player["probcut"] = float(value)
+        elif key == "lmr":
+            player["lmr"] = bool(int(value))
+        elif key == "weights":
+            values = list(map(float, value.split("/")))
+            if len(values) not in (len(WEIGHT_TERMS) - 1, len(WEIGHT_TERMS)):
+                raise ValueError(f"Weights are {'/'.join(WEIGHT_TERMS)} : {value}")
+            player["weights"] = dict(zip(WEIGHT_TERMS, values))
+        else:
+            raise ValueError(f"Unknown player option : {key}")
+    if algo == "negamax-id" and player["time"] is None:
+        player["time"] = 100
+    return player
+
+
+def random_opening(rng: random.Random, plies: int, book=None) -> list[int]:
+    """
+    Random moves from the start position. With a book, only moves leading to
+    book positions are drawn, the line ends when there are none.
+    """
+    board, color, moves = BoardBitboard(), 2, []
+    while len(moves) < plies:
+        legal = list(squares(board.legal_moves_bb(color)))
+        if book is not None:
+            legal = [m for m in legal if _in_book(book, board, color, m)]
+        if not legal:
+            break
+        move = rng.choice(legal)
+        board.make(move, color)
+        moves.append(move)
+        color = 3 - color
+    return moves
+
+
+def _in_book(book: OpeningBook, board: BoardBitboard, color: int, move: int):
+    b = board.copy()
+    b.make(move, color)
+    return book.lookup(position_key(b, 3 - color)[0]) is not None
+
+
+# worker process state : one table & orderer per player spec, kept across games
+_tables = {}
+# ProbCut parameters by threshold
+_probcuts = {}
+
+
+def _choose(player: dict, board: BoardBitboard, color: int, rng: random.Random):
+    if player["algo"] == "random":
+        return rng.choice(list(squares(board.legal_moves_bb(color)))), None
+    if player["name"] not in _tables:
+        _tables[player["name"]] = (TranspositionTable(TT_SIZE_MB), MoveOrderer())
+    tt, orderer = _tables[player["name"]]
+    algo = player["algo"]
+    kwargs = {"tt": tt, "mode": player["mode"], "weights": player["weights"]}
+    if algo.startswith("minimax"):
+        if algo == "minimax-ab":
+            kwargs["ordering"] = orderer
+        move, info = choose_move_minimax(
+            board, color, player["depth"], algo == "minimax-ab", **kwargs
+        )
+    else:
+        if algo != "negamax":
+            kwargs["ordering"] = orderer
+        if algo == "negamax-id":
+            kwargs["time_ms"] = player["time"]
+        if algo == "negamax-pvs":
+            kwargs["pvs"] = True
+            kwargs["time_ms"] = player["time"]
+        if player["probcut"]:
+            t = player["probcut"]
+            if t not in _probcuts:
+                _probcuts[t] = ProbCut.load(t=t)
+            kwargs["probcut"] = _probcuts[t]
+        kwargs["lmr"] = player["lmr"]
+        move, info = choose_move_negamax(
+            board,
+            color,
+            player["depth"],
+            algo != "negamax",
+            endgame_empties=player["endgame"],
+            **kwargs,
+        )
+    return move[0] * 8 + move[1], info
+
+
+def play_game(black: dict, white: dict, opening: list[int], seed: int) -> dict:
+    """
+    Plays one game from the opening moves, returns its result record
+    """
+    rng = random.Random(seed)
+    for player in (black, white):
+        if player["name"] in _tables:
+            _tables[player["name"]][0].clear()
+    board, color = BoardBitboard(), 2
+    for move in opening:
+        board.make(move, color)
+        color = 3 - color
+
+    players = {2: black, 1: white}
+    stats = {p["name"]: {"moves": 0, "ms": 0.0, "nodes": 0} for p in (black, white)}
+    moves = []
+    while True:
+        if not board.legal_moves_bb(color):
+            color = 3 - color
+            if not board.legal_moves_bb(color):
+                break
+        player = players[color]
+        t0 = time.perf_counter()
+        move, info = _choose(player, board, color, rng)
+        s = stats[player["name"]]
+        s["ms"] += (time.perf_counter() - t0) * 1000
+        s["moves"] += 1
+        s["nodes"] += info.nodes if info is not None else 0
+        board.make(move, color)
+        moves.append(move)
+        color = 3 - color
+
+    b, w = board.black.bit_count(), board.white.bit_count()
+    return {
+        "black": black["name"],
+        "white": white["name"],
+        "opening": opening,
+        "moves": moves,
+        "discs": [b, w],
+        "winner": "black" if b > w else "white" if w > b else "draw",
+        "stats": stats,
+    }
+
+
+def elo(score: float) -> float:
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+
+def elo_interval(w: int, d: int, l: int) -> tuple[float, float, float]:
+    """
+    Elo difference and its 95% confidence interval from W/D/L counts
+    """
+    n = w + d + l
+    s = (w + d / 2) / n
+    var = (w + d / 4) / n - s * s
+    margin = 1.96 * math.sqrt(var / n)
+    return elo(s), elo(s - margin), elo(s + margin)
+
+
+def sprt_llr(w: int, d: int, l: int, elo0: float, elo1: float) -> float:
+    """
+    Log-likelihood ratio of H1 (elo1) vs H0 (elo0), normal approximation of
+    the trinomial game outcomes
+    """
+    n = w + d + l
+    if not n:
+        return 0.0
+    s = (w + d / 2) / n
+    var = ((w + d / 4) / n - s * s) / n
+    if var <= 0:
+        return 0.0
+    s0 = 1 / (1 + 10 ** (-elo0 / 400))
+    s1 = 1 / (1 + 10 ** (-elo1 / 400))
+    return (s1 - s0) * (2 * s - s0 - s1) / (2 * var)
+
+
+def sprt_bounds(alpha: float, beta: float) -> tuple[float, float]:
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+class Results:
+    """
+    Running W/D/L per pairing & per-engine speed, fed with game records
+    """
+
+    def __init__(self, names: list[str]):
+        self.order = {name: i for i, name in enumerate(names)}
+        self.wdl = {}  # (a, b) -> [a wins, draws, b wins], a listed first
+        self.engines = {}
+
+    def add(self, game: dict):
+        a, b = sorted((game["black"], game["white"]), key=self.order.get)
+        wdl = self.wdl.setdefault((a, b), [0, 0, 0])
+        if game["winner"] == "draw":
+            wdl[1] += 1
+        else:
+            winner = game[game["winner"]]
+            wdl[0 if winner == a else 2] += 1
+        for name, s in game["stats"].items():
+            e = self.engines.setdefault(name, {"moves": 0, "ms": 0.0, "nodes": 0})
+            for k in e:
+                e[k] += s[k]
+
+    def sprt(self, pair, elo0, elo1, alpha, beta) -> tuple[float, str]:
+        llr = sprt_llr(*self.wdl[pair], elo0, elo1)
+        lower, upper = sprt_bounds(alpha, beta)
+        if llr >= upper:
+            return llr, "H1 accepted"
+        if llr <= lower:
+            return llr, "H0 accepted"
+        return llr, "continue"
+
+    def report(self, elo0, elo1, alpha, beta) -> list[str]:
+        lines = []
+        for (a, b), (w, d, l) in self.wdl.items():
+            n = w + d + l
+            diff, lo, hi = elo_interval(w, d, l)
+            llr, status = self.sprt((a, b), elo0, elo1, alpha, beta)
+            lines.append(
+                f"{a} vs {b} : +{w} ={d} -{l} ({(w + d / 2) / n:.1%}) "
+                f"| elo {diff:+.0f} [{lo:+.0f}, {hi:+.0f}] "
+                f"| sprt({elo0:g}, {elo1:g}) llr={llr:.2f} {status}"
+            )
+        for name, e in sorted(self.engines.items()):
+            ms = e["ms"] / e["moves"] if e["moves"] else 0.0
+            nps = int(e["nodes"] * 1000 / e["ms"]) if e["ms"] else 0
+            lines.append(f"{name} : {ms:.1f} ms/move | {nps} nodes/s")
+        return lines
+
+
+def schedule(players: list[dict], n_games: int, plies: int, book, seed: int):
+    """
+    Round robin of game pairs : each opening is played twice, colors swapped
+    """
+    rng = random.Random(seed)
+    pairs = list(combinations(players, 2))
+    i = 0
+    while i < n_games:
+        opening = random_opening(rng, plies, book)
+        for a, b in pairs:
+            for black, white in ((a, b), (b, a)):
+                if i < n_games:
+                    yield black, white, opening, seed + i
+                    i += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine vs engine matches")
+    parser.add_argument("players", nargs="+", help="player specs, at least 2")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--plies", type=int, default=8, help="random opening plies")
+    parser.add_argument("--book", help="draw openings from this book's lines")
+    parser.add_argument("--out", default="arena.jsonl", help="one game per line")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--elo0", type=float, default=0.0)
+    parser.add_argument("--elo1", type=float, default=10.0)
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument(
+        "--sprt-stop", action="store_true", help="2 players : stop once SPRT decides"
+    )
+    parser.add_argument("--report-every", type=int, default=100)
+    args = parser.parse_args()
+
+    players = [parse_player(spec) for spec in args.players]
+    if len(players) < 2 or len(set(args.players)) < len(players):
+        parser.error("at least 2 distinct players are needed")
+    book = OpeningBook(args.book) if args.book else None
+    games = schedule(players, args.games, args.plies, book, args.seed)
+    results = Results([p["name"] for p in players])
+    sprt = (args.elo0, args.elo1, args.alpha, args.beta)
+    t0 = time.perf_counter()
+    done, next_report = 0, args.report_every
+
+    with open(args.out, "w") as out, ProcessPoolExecutor(args.workers) as pool:
+        # a bounded nb of games in flight, results streamed as they finish
+        pending = set()
+        stopped = False
+        while True:
+            while not stopped and len(pending) < 2 * args.workers:
+                game = next(games, None)
+                if game is None:
+                    break
+                pending.add(pool.submit(play_game, *game))
+            if not pending:
+                break
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in finished:
+                if f.cancelled():
+                    continue
+                game = f.result()
+                done += 1
+                game["game"] = done
+                out.write(json.dumps(game) + "\n")
+                results.add(game)
+            out.flush()
+            if done >= next_report:
+                next_report += args.report_every
+                rate = done / (time.perf_counter() - t0)
+                print(f"-- {done} games, {rate:.1f} games/s")
+                print("\n".join(results.report(*sprt)))
+            if args.sprt_stop and len(players) == 2 and not stopped:
+                (pair,) = results.wdl
+                if results.sprt(pair, *sprt)[1] != "continue":
+                    stopped = True
+                    for f in pending:
+                        f.cancel()
+
+    print(f"== {done} games in {time.perf_counter() - t0:.0f}s, results in {args.out}")
+    print("\n".join(results.report(*sprt)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import numpy as np
+
+from src.engine.board_bitboard import FULL, LEFT, RIGHT, BoardBitboard
+
+_U = np.uint64
+_NOT_LEFT = _U(FULL ^ LEFT)
+_NOT_RIGHT = _U(FULL ^ RIGHT)
+_FULL = _U(FULL)
+
+# (shift, left shift ?, wrap mask), same layout as board_bitboard
+_DIRECTIONS = [
+    (_U(8), False, _FULL),  # n
+    (_U(8), True, _FULL),  # s
+    (_U(1), True, _NOT_LEFT),  # e
+    (_U(1), False, _NOT_RIGHT),  # w
+    (_U(7), False, _NOT_LEFT),  # ne
+    (_U(9), False, _NOT_RIGHT),  # nw
+    (_U(9), True, _NOT_LEFT),  # se
+    (_U(7), True, _NOT_RIGHT),  # sw
+]
+
+_BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(x: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):  # numpy >= 2.0
+        return np.bitwise_count(x).astype(np.int64)
+    return _BYTE_POPCOUNT[x.astype("<u8").view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+def _fill(gen: np.ndarray, pro: np.ndarray, s, left: bool, mask) -> np.ndarray:
+    """
+    Kogge-Stone occluded fill of gen through pro in one direction
+    """
+    s2, s4 = s * _U(2), s * _U(4)
+    p = pro & mask
+    if left:
+        g = gen | (p & (gen << s))
+        p &= p << s
+        g |= p & (g << s2)
+        p &= p << s2
+        g |= p & (g << s4)
+    else:
+        g = gen | (p & (gen >> s))
+        p &= p >> s
+        g |= p & (g >> s2)
+        p &= p >> s2
+        g |= p & (g >> s4)
+    return g
+
+
+def _shift(x: np.ndarray, s, left: bool, mask) -> np.ndarray:
+    return ((x << s) if left else (x >> s)) & mask
+
+
+def moves_bb(P: np.ndarray, O: np.ndarray) -> np.ndarray:
+    """
+    Legal moves bitboards of the player P against O, for the whole batch
+    """
+    empty = ~(P | O)
+    moves = np.zeros_like(P)
+    for s, left, mask in _DIRECTIONS:
+        g = _fill(P, O, s, left, mask)
+        moves |= _shift(g ^ P, s, left, mask)
+    return moves & empty
+
+
+def flips_bb(P: np.ndarray, O: np.ndarray, move_bits: np.ndarray) -> np.ndarray:
+    """
+    Discs flipped by playing move_bits (one bit per position, 0 = no move)
+    """
+    flips = np.zeros_like(P)
+    zero = _U(0)
+    for s, left, mask in _DIRECTIONS:
+        g = _fill(move_bits, O, s, left, mask)
+        closed = _shift(g, s, left, mask) & P
+        flips |= np.where(closed != zero, g ^ move_bits, zero)
+    return flips
+
+
+def random_squares(moves: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Picks one uniformly random set square per bitboard (-1 if empty)
+    """
+    counts = popcount(moves)
+    pick = (rng.random(len(moves)) * counts).astype(np.int64)
+    # clear the `pick` lowest bits, the lsb left is the chosen square
+    m = moves.copy()
+    one = _U(1)
+    for j in range(int(pick.max(initial=0))):
+        m = np.where(pick > j, m & (m - one), m)
+    lsb = m & (~m + one)
+    # single bit -> exact log2 in float64
+    idx = np.log2(lsb.astype(np.float64), where=lsb != 0, out=np.zeros(len(m)))
+    return np.where(counts > 0, idx.astype(np.int64), -1)
+
+
+class BoardBatch:
+    """
+    N positions stored as uint64 arrays, stepped together with NumPy shifts
+    and masks. Results match BoardBitboard position by position.
+    """
+
+    def __init__(self, n: int):
+        start = BoardBitboard()
+        self.white = np.full(n, start.white, dtype=np.uint64)
+        self.black = np.full(n, start.black, dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return len(self.white)
+
+    @classmethod
+    def from_boards(cls, boards: list[BoardBitboard]) -> "BoardBatch":
+        batch = cls.__new__(cls)
+        batch.white = np.array([b.white for b in boards], dtype=np.uint64)
+        batch.black = np.array([b.black for b in boards], dtype=np.uint64)
+        return batch
+
+    def to_board(self, i: int) -> BoardBitboard:
+        board = BoardBitboard.__new__(BoardBitboard)
+        board.white, board.black = int(self.white[i]), int(self.black[i])
+        return board
+
+    def _sides(self, color) -> tuple[np.ndarray, np.ndarray]:
+        """
+        color : 1/2 for the whole batch, or an (N,) array of colors
+        """
+        if np.isscalar(color):
+            if color == 1:
+                return self.white, self.black
+            return self.black, self.white
+        is_white = np.asarray(color) == 1
+        P = np.where(is_white, self.white, self.black)
+        O = np.where(is_white, self.black, self.white)
+        return P, O
+
+    def legal_moves_bb(self, color) -> np.ndarray:
+        return moves_bb(*self._sides(color))
+
+    def mobility_count(self, color) -> np.ndarray:
+        return popcount(self.legal_moves_bb(color))
+
+    def apply_moves(self, moves: np.ndarray, color) -> np.ndarray:
+        """
+        Plays one square idx per position (-1 = no move) and returns the flips
+        bitboards. Moves are assumed legal.
+        """
+        moves = np.asarray(moves)
+        played = moves >= 0
+        shifts = np.maximum(moves, 0).astype(np.uint64)
+        bits = np.where(played, _U(1) << shifts, _U(0))
+        P, O = self._sides(color)
+        flips = flips_bb(P, O, bits)
+        P = P | bits | flips
+        O = O & ~flips
+        if np.isscalar(color):
+            is_white = np.full(len(self), color == 1)
+        else:
+            is_white = np.asarray(color) == 1
+        self.white = np.where(is_white, P, O)
+        self.black = np.where(is_white, O, P)
+        return flips
+
+    def random_moves(
+        self, moves: np.ndarray, rng: np.random.Generator
+    ) -> np.ndarray:
+        return random_squares(moves, rng)
+
+    def random_playouts(
+        self, color, rng: np.random.Generator | None = None
+    ) -> np.ndarray:
+        """
+        Plays every position to the end with uniform random moves (passes
+        handled) and returns the final disc difference from white's pov
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        to_move = np.broadcast_to(np.asarray(color), (len(self),)).copy()
+        active = np.ones(len(self), dtype=bool)
+        while active.any():
+            moves = self.legal_moves_bb(to_move)
+            no_move = moves == 0
+            # pass : the other side moves, game over if it can't either
+            other = np.where(no_move, 3 - to_move, to_move)
+            moves = np.where(no_move, self.legal_moves_bb(other), moves)
+            active &= moves != 0
+            to_move = other
+            chosen = np.where(active, self.random_moves(moves, rng), -1)
+            self.apply_moves(chosen, to_move)
+            to_move = 3 - to_move
+        return popcount(self.white) - popcount(self.black)
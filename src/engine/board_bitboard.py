@@ -26,7 +26,233 @@ DIRECTIONS = [
 ]
 
 
+def squares(bb: int):
+    """
+    Iterates over the square indices (0..63) set in a bitboard, lsb first
+    """
+    while bb:
+        lsb = bb & -bb
+        yield lsb.bit_length() - 1
+        bb ^= lsb
+
+
+# wrap masks : a shift with an east (resp. west) component must not land on
+# the leftmost (resp. rightmost) column
+NOT_LEFT = FULL ^ LEFT
+NOT_RIGHT = FULL ^ RIGHT
+
+
+def _moves_line_cap(P: int, O: int) -> int:
+    """
+    Inspired by the Line Cap Moves algorithm by Cameron Browne, "Bitboard Methods for Games", ICGA Journal, June 2014.
+    """
+    empty = ~(P | O) & FULL
+    moves_bb = 0
+
+    for d in DIRECTIONS:
+        candidates = O & d(P)
+        while candidates:
+            moves_bb |= empty & d(candidates)
+            candidates = O & d(candidates)
+
+    return moves_bb
+
+
+def _moves_kogge_stone(P: int, O: int) -> int:
+    """
+    Branch-free Kogge-Stone occluded fills, one block per direction :
+    grows the runs of opponent discs starting next to a player disc by 1, 2
+    then 4 squares (parallel prefix), then shifts once more onto empties.
+    Shifts are inlined and the propagator is pre-masked against wraps.
+    """
+    empty = ~(P | O) & FULL
+    moves_bb = 0
+
+    # n
+    p = O
+    g = P | (p & (P >> 8))
+    p &= p >> 8
+    g |= p & (g >> 16)
+    p &= p >> 16
+    g |= p & (g >> 32)
+    moves_bb |= ((g ^ P) >> 8) & FULL
+
+    # s
+    p = O
+    g = P | (p & (P << 8))
+    p &= p << 8
+    g |= p & (g << 16)
+    p &= p << 16
+    g |= p & (g << 32)
+    moves_bb |= ((g ^ P) << 8) & FULL
+
+    # e
+    p = O & NOT_LEFT
+    g = P | (p & (P << 1))
+    p &= p << 1
+    g |= p & (g << 2)
+    p &= p << 2
+    g |= p & (g << 4)
+    moves_bb |= ((g ^ P) << 1) & NOT_LEFT
+
+    # w
+    p = O & NOT_RIGHT
+    g = P | (p & (P >> 1))
+    p &= p >> 1
+    g |= p & (g >> 2)
+    p &= p >> 2
+    g |= p & (g >> 4)
+    moves_bb |= ((g ^ P) >> 1) & NOT_RIGHT
+
+    # ne
+    p = O & NOT_LEFT
+    g = P | (p & (P >> 7))
+    p &= p >> 7
+    g |= p & (g >> 14)
+    p &= p >> 14
+    g |= p & (g >> 28)
+    moves_bb |= ((g ^ P) >> 7) & NOT_LEFT
+
+    # nw
+    p = O & NOT_RIGHT
+    g = P | (p & (P >> 9))
+    p &= p >> 9
+    g |= p & (g >> 18)
+    p &= p >> 18
+    g |= p & (g >> 36)
+    moves_bb |= ((g ^ P) >> 9) & NOT_RIGHT
+
+    # se
+    p = O & NOT_LEFT
+    g = P | (p & (P << 9))
+    p &= p << 9
+    g |= p & (g << 18)
+    p &= p << 18
+    g |= p & (g << 36)
+    moves_bb |= ((g ^ P) << 9) & NOT_LEFT
+
+    # sw
+    p = O & NOT_RIGHT
+    g = P | (p & (P << 7))
+    p &= p << 7
+    g |= p & (g << 14)
+    p &= p << 14
+    g |= p & (g << 28)
+    moves_bb |= ((g ^ P) << 7) & NOT_RIGHT
+
+    return moves_bb & empty
+
+
+MOVE_GENERATORS = {
+    "line-cap": _moves_line_cap,
+    "kogge-stone": _moves_kogge_stone,
+}
+_generate_moves = _moves_kogge_stone
+
+
+def set_move_generator(name: str):
+    """
+    Selects the move generator used by BoardBitboard.legal_moves_bb
+    """
+    global _generate_moves
+    if name not in MOVE_GENERATORS:
+        raise ValueError(f"Unknown move generator : {name}")
+    _generate_moves = MOVE_GENERATORS[name]
+
+
+def moves_bb(P: int, O: int) -> int:
+    """
+    Legal moves bitboard of the player P against O (selected generator)
+    """
+    return _generate_moves(P, O)
+
+
+def flips_bb(P: int, O: int, move_idx: int) -> int:
+    """
+    Discs flipped when P plays move_idx, 0 if the move is illegal.
+    Walks each direction from the move with inlined shifts.
+    """
+    bit = 1 << move_idx
+    flips = 0
+
+    # n
+    x = bit >> 8
+    f = 0
+    while x & O:
+        f |= x
+        x >>= 8
+    if x & P:
+        flips |= f
+
+    # s
+    x = (bit << 8) & FULL
+    f = 0
+    while x & O:
+        f |= x
+        x = (x << 8) & FULL
+    if x & P:
+        flips |= f
+
+    # e
+    x = (bit << 1) & NOT_LEFT
+    f = 0
+    while x & O:
+        f |= x
+        x = (x << 1) & NOT_LEFT
+    if x & P:
+        flips |= f
+
+    # w
+    x = (bit >> 1) & NOT_RIGHT
+    f = 0
+    while x & O:
+        f |= x
+        x = (x >> 1) & NOT_RIGHT
+    if x & P:
+        flips |= f
+
+    # ne
+    x = (bit >> 7) & NOT_LEFT
+    f = 0
+    while x & O:
+        f |= x
+        x = (x >> 7) & NOT_LEFT
+    if x & P:
+        flips |= f
+
+    # nw
+    x = (bit >> 9) & NOT_RIGHT
+    f = 0
+    while x & O:
+        f |= x
+        x = (x >> 9) & NOT_RIGHT
+    if x & P:
+        flips |= f
+
+    # se
+    x = (bit << 9) & NOT_LEFT
+    f = 0
+    while x & O:
+        f |= x
+        x = (x << 9) & NOT_LEFT
+    if x & P:
+        flips |= f
+
+    # sw
+    x = (bit << 7) & NOT_RIGHT
+    f = 0
+    while x & O:
+        f |= x
+        x = (x << 7) & NOT_RIGHT
+    if x & P:
+        flips |= f
+
+    return flips
+
+
 class BoardBitboard:
+    __slots__ = ("white", "black")
+
     def __init__(self):
         self.white = 0
         self.black = 0
@@ -44,70 +270,66 @@ class BoardBitboard:
     def _opponent_bb(self, color: int) -> int:
         return self.black if color == 1 else self.white
 
+    def copy(self) -> "BoardBitboard":
+        nb = BoardBitboard.__new__(BoardBitboard)
+        nb.white, nb.black = self.white, self.black
+        return nb
+
+    def legal_moves_bb(self, color: int) -> int:
+        """
+        Returns the bitboard of legal moves for a given color
+        """
+        if color == 1:
+            return _generate_moves(self.white, self.black)
+        return _generate_moves(self.black, self.white)
+
     def legal_moves(self, color: int) -> list[tuple[int, int]]:
         """
-        Returns the list of legal moves for a given color
-        Inspired by the Line Cap Moves algorithm by Cameron Browne, "Bitboard Methods for Games", ICGA Journal, June 2014.
+        Returns the list of legal moves (r,c) for a given color
         """
-        P = self._player_bb(color)
-        O = self._opponent_bb(color)
-        empty = ~(P | O) & FULL
-        moves_bb = 0
-
-        for d in DIRECTIONS:
-            candidates = O & d(P)
-            while candidates:
-                moves_bb |= empty & d(candidates)
-                candidates = O & d(candidates)
-
-        # convert bb to list of moves (r,c) extracting each lsb
-        moves = []
-        while moves_bb:
-            lsb = moves_bb & -moves_bb
-            idx = lsb.bit_length() - 1
-            moves.append(divmod(idx, 8))
-            moves_bb &= moves_bb - 1
-
-        return moves
+        return [divmod(idx, 8) for idx in squares(self.legal_moves_bb(color))]
 
-    def apply_move(self, move: tuple[int, int], color: int) -> list[tuple[int, int]]:
+    def mobility_count(self, color: int) -> int:
+        return self.legal_moves_bb(color).bit_count()
+
+    def make(self, move_idx: int, color: int) -> int:
         """
-        Play a move (r,c) for a given color and returns all flipped pieces pos
+        Play a move (square idx) in place and returns the flipped discs bb,
+        to be given back to unmake
         """
-        r, c = move
-        P = self._player_bb(color)
-        O = self._opponent_bb(color)
-        flips_bb = 0
-        bit = 1 << (r * 8 + c)
-
-        for d in DIRECTIONS:
-            candidate = d(bit)
-            mask = 0
-            # stack successive opponents
-            while candidate & O:
-                mask |= candidate
-                candidate = d(candidate)
-            # valid if the line finish on the player color
-            if candidate & P:
-                flips_bb |= mask
-
-        # update bitboards
+        bit = 1 << move_idx
         if color == 1:
-            self.white |= bit | flips_bb
-            self.black &= ~flips_bb
+            flips = flips_bb(self.white, self.black, move_idx)
+            self.white |= bit | flips
+            self.black &= ~flips
         else:
-            self.black |= bit | flips_bb
-            self.white &= ~flips_bb
+            flips = flips_bb(self.black, self.white, move_idx)
+            self.black |= bit | flips
+            self.white &= ~flips
+        return flips
 
-        # convert bb to list of flips (r,c) extracting each lsb
-        flips = []
-        while flips_bb:
-            lsb = flips_bb & -flips_bb
-            idx = lsb.bit_length() - 1
-            flips.append(divmod(idx, 8))
-            flips_bb &= flips_bb - 1
+    # low-level alias of make for non search callers
+    apply_move_idx = make
 
-        return flips
+    def unmake(self, move_idx: int, flips_bb: int, color: int):
+        """
+        Undo a move played by make
+        """
+        bit = 1 << move_idx
+        if color == 1:
+            self.white ^= bit | flips_bb
+            self.black |= flips_bb
+        else:
+            self.black ^= bit | flips_bb
+            self.white |= flips_bb
+
+    def apply_move(self, move: tuple[int, int], color: int) -> list[tuple[int, int]]:
+        """
+        Play a move (r,c) for a given color and returns all flipped pieces pos
+        """
+        r, c = move
+        flips_bb = self.make(r * 8 + c, color)
+        return [divmod(idx, 8) for idx in squares(flips_bb)]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,180 @@
+import argparse, time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.engine.board_bitboard import (
+    MOVE_GENERATORS,
+    BoardBitboard,
+    flips_bb,
+    moves_bb,
+    set_move_generator,
+    squares,
+)
+
+# Leaf counts from the start position, a pass is a ply and a finished game
+# is a leaf even above the last ply
+KNOWN_PERFT = {
+    1: 4,
+    2: 12,
+    3: 56,
+    4: 244,
+    5: 1396,
+    6: 8200,
+    7: 55092,
+    8: 390216,
+    9: 3005288,
+    10: 24571284,
+}
+
+# perft(P, O, depth) of subtrees above this depth are memoized with --hash
+HASH_MIN_DEPTH = 3
+HASH_MAX_ENTRIES = 1 << 22
+
+
+def perft(P: int, O: int, depth: int, passed: bool = False, table=None) -> int:
+    """
+    Nb of leaves `depth` plies below the position, P to move. The last ply is
+    counted with a popcount of the moves instead of playing them.
+    table : optional dict memoizing (P, O, depth) -> count
+    """
+    moves = moves_bb(P, O)
+    if not moves:
+        if passed:
+            # game over
+            return 1
+        if depth == 1:
+            # the pass is the leaf, unless the game is over
+            return 1
+        return perft(O, P, depth - 1, True, table)
+    if depth == 1:
+        return moves.bit_count()
+
+    if table is not None and depth >= HASH_MIN_DEPTH:
+        key = (P, O, depth)
+        n = table.get(key)
+        if n is not None:
+            return n
+    n = 0
+    for idx in squares(moves):
+        f = flips_bb(P, O, idx)
+        n += perft(O & ~f, P | (1 << idx) | f, depth - 1, False, table)
+    if table is not None and depth >= HASH_MIN_DEPTH:
+        if len(table) >= HASH_MAX_ENTRIES:
+            table.clear()
+        table[key] = n
+    return n
+
+
+def _children(P: int, O: int, depth: int, passed: bool = False):
+    """
+    (P, O, depth, passed) of the positions one ply below, a pass included
+    """
+    moves = moves_bb(P, O)
+    if not moves:
+        return [(O, P, depth - 1, True)]
+    children = []
+    for idx in squares(moves):
+        f = flips_bb(P, O, idx)
+        children.append((O & ~f, P | (1 << idx) | f, depth - 1, False))
+    return children
+
+
+def _perft_task(args) -> int:
+    P, O, depth, passed, use_hash = args
+    return perft(P, O, depth, passed, {} if use_hash else None)
+
+
+def perft_parallel(
+    P: int, O: int, depth: int, workers: int, use_hash: bool = False
+) -> int:
+    """
+    Splits the tree a few plies down into subtrees counted across processes
+    (each with its own table)
+    """
+    nodes = [(P, O, depth, False)]
+    leaves = 0
+    while len(nodes) < 8 * workers:
+        expanded = []
+        for p, o, d, passed in nodes:
+            if d <= 2 or (passed and not moves_bb(p, o)):
+                # small or finished, counted here
+                leaves += perft(p, o, d, passed)
+            else:
+                expanded.extend(_children(p, o, d, passed))
+        if not expanded:
+            break
+        nodes = expanded
+    with ProcessPoolExecutor(workers) as pool:
+        tasks = [(p, o, d, passed, use_hash) for p, o, d, passed in nodes]
+        leaves += sum(pool.map(_perft_task, tasks, chunksize=4))
+    return leaves
+
+
+def divide(P: int, O: int, depth: int, table=None) -> dict[int, int]:
+    """
+    Leaf count below each root move (-1 for a pass)
+    """
+    moves = moves_bb(P, O)
+    if not moves:
+        return {-1: perft(O, P, depth - 1, True, table) if depth > 1 else 1}
+    counts = {}
+    for idx in squares(moves):
+        f = flips_bb(P, O, idx)
+        o, p = O & ~f, P | (1 << idx) | f
+        counts[idx] = perft(o, p, depth - 1, False, table) if depth > 1 else 1
+    return counts
+
+
+def parse_board(text: str) -> BoardBitboard:
+    """
+    64 chars row by row : X black, O white, anything else empty
+    """
+    text = "".join(text.split())
+    if len(text) != 64:
+        raise ValueError(f"A board is 64 squares, got {len(text)}")
+    board = BoardBitboard()
+    board.white = board.black = 0
+    for idx, ch in enumerate(text):
+        if ch in "Xx":
+            board.black |= 1 << idx
+        elif ch in "Oo":
+            board.white |= 1 << idx
+    return board
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Othello perft")
+    parser.add_argument("depth", type=int)
+    parser.add_argument("--board", help="64 chars, X black / O white")
+    parser.add_argument("--color", choices=("black", "white"), default="black")
+    parser.add_argument("--hash", action="store_true", help="memoize subtrees")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--divide", action="store_true")
+    parser.add_argument("--generator", choices=list(MOVE_GENERATORS))
+    parser.add_argument("--check", action="store_true", help="known counts, 1..depth")
+    args = parser.parse_args()
+    if args.generator:
+        set_move_generator(args.generator)
+
+    board = parse_board(args.board) if args.board else BoardBitboard()
+    black = args.color == "black"
+    P, O = (board.black, board.white) if black else (board.white, board.black)
+
+    depths = range(1, args.depth + 1) if args.check else [args.depth]
+    for d in depths:
+        t0 = time.perf_counter()
+        table = {} if args.hash else None
+        if args.divide:
+            counts = divide(P, O, d, table)
+            for idx, n in counts.items():
+                print(f"  {'pass' if idx < 0 else divmod(idx, 8)} : {n}")
+            n = sum(counts.values())
+        elif args.workers > 1:
+            n = perft_parallel(P, O, d, args.workers, args.hash)
+        else:
+            n = perft(P, O, d, False, table)
+        dt = time.perf_counter() - t0
+        status = ""
+        if args.check:
+            ok = n == KNOWN_PERFT.get(d, n)
+            status = "ok" if ok else f"MISMATCH, expected {KNOWN_PERFT[d]}"
+        print(f"perft({d}) = {n} | {dt:.2f}s | {n / dt:.0f} leaves/s {status}")
@@ -0,0 +1,111 @@
+from src.engine.board_bitboard import FULL
+
+# The 8 symmetries of the board (dihedral group) on bitboards, idx = r*8 + c
+# 0 identity, 1 vertical flip (rows), 2 horizontal flip (cols), 3 rotation 180,
+# 4 diagonal (r, c) -> (c, r), 5 rotation 90 cw, 6 rotation 90 ccw,
+# 7 anti-diagonal (r, c) -> (7-c, 7-r)
+
+
+def flip_vertical(x: int) -> int:
+    """
+    Row r -> 7 - r : a byte swap
+    """
+    return int.from_bytes(x.to_bytes(8, "little"), "big")
+
+
+def flip_horizontal(x: int) -> int:
+    """
+    Column c -> 7 - c, swapping bits then pairs then nibbles of each byte
+    """
+    x = ((x >> 1) & 0x5555555555555555) | ((x & 0x5555555555555555) << 1)
+    x = ((x >> 2) & 0x3333333333333333) | ((x & 0x3333333333333333) << 2)
+    return ((x >> 4) & 0x0F0F0F0F0F0F0F0F) | ((x & 0x0F0F0F0F0F0F0F0F) << 4)
+
+
+def flip_diagonal(x: int) -> int:
+    """
+    (r, c) -> (c, r), three delta swaps
+    """
+    t = 0x0F0F0F0F00000000 & (x ^ (x << 28))
+    x ^= t ^ (t >> 28)
+    t = 0x3333000033330000 & (x ^ (x << 14))
+    x ^= t ^ (t >> 14)
+    t = 0x5500550055005500 & (x ^ (x << 7))
+    return (x ^ t ^ (t >> 7)) & FULL
+
+
+def flip_anti_diagonal(x: int) -> int:
+    """
+    (r, c) -> (7 - c, 7 - r)
+    """
+    t = x ^ (x << 36)
+    x ^= 0xF0F0F0F00F0F0F0F & (t ^ (x >> 36))
+    t = 0xCCCC0000CCCC0000 & (x ^ (x << 18))
+    x ^= t ^ (t >> 18)
+    t = 0xAA00AA00AA00AA00 & (x ^ (x << 9))
+    return (x ^ t ^ (t >> 9)) & FULL
+
+
+def _rotate_180(x: int) -> int:
+    return flip_horizontal(flip_vertical(x))
+
+
+def _rotate_cw(x: int) -> int:
+    return flip_horizontal(flip_diagonal(x))
+
+
+def _rotate_ccw(x: int) -> int:
+    return flip_vertical(flip_diagonal(x))
+
+
+def _identity(x: int) -> int:
+    return x
+
+
+TRANSFORMS = (
+    _identity,
+    flip_vertical,
+    flip_horizontal,
+    _rotate_180,
+    flip_diagonal,
+    _rotate_cw,
+    _rotate_ccw,
+    flip_anti_diagonal,
+)
+
+# square idx -> transformed idx, for each transform
+SQUARE_MAPS = tuple(
+    tuple(t(1 << idx).bit_length() - 1 for idx in range(64)) for t in TRANSFORMS
+)
+# transform undoing each transform
+INVERSE = tuple(
+    next(j for j in range(8) if all(SQUARE_MAPS[j][m[s]] == s for s in range(64)))
+    for m in SQUARE_MAPS
+)
+
+
+def transform(x: int, t: int) -> int:
+    return TRANSFORMS[t](x)
+
+
+def transform_square(idx: int, t: int) -> int:
+    return SQUARE_MAPS[t][idx]
+
+
+def canonical(white: int, black: int) -> tuple[int, int, int]:
+    """
+    Minimal (white, black) over the 8 symmetries and the transform t giving
+    it. A move m of the canonical position is transform_square(m, INVERSE[t])
+    in the original one.
+    """
+    v = flip_vertical(white), flip_vertical(black)
+    h = flip_horizontal(white), flip_horizontal(black)
+    vh = flip_horizontal(v[0]), flip_horizontal(v[1])
+    d = flip_diagonal(white), flip_diagonal(black)
+    dv = flip_vertical(d[0]), flip_vertical(d[1])
+    dh = flip_horizontal(d[0]), flip_horizontal(d[1])
+    dvh = flip_horizontal(dv[0]), flip_horizontal(dv[1])
+    # same order as TRANSFORMS
+    forms = ((white, black), v, h, vh, d, dh, dv, dvh)
+    best = min(range(8), key=forms.__getitem__)
+    return forms[best][0], forms[best][1], best
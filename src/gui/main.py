@@ -1,7 +1,13 @@
-import pygame, sys
+import math, os, pygame, sys
 from src.engine.board_bitboard import BoardBitboard
+from src.ai.book import OpeningBook
+from src.ai.mcts import MCTSTree, choose_move_mcts
 from src.ai.minimax import choose_move_minimax
 from src.ai.negamax import choose_move_negamax
+from src.ai.eval_cache import EvalCache
+from src.ai.move_ordering import MoveOrderer
+from src.ai.transposition import TranspositionTable, zobrist_hash
+from src.gui.search_worker import Ponderer, SearchWorker
 
 # -- GUI SETTINGS
 CELL_SIZE = 60
@@ -22,8 +28,23 @@ PANEL_BG = (48, 48, 48)
 FONT_COLOR = (220, 220, 220)
 
 # -- AI SETTINGS
-PLAYER_TYPES = ["human", "minimax", "minimax-ab", "negamax", "negamax-ab"]
+PLAYER_TYPES = [
+    "human",
+    "minimax",
+    "minimax-ab",
+    "negamax",
+    "negamax-ab",
+    "negamax-id",
+    "mcts",
+]
 SEARCH_DEPTH = 4
+MOVE_TIME_MS = 1000  # time budget of iterative deepening & mcts players
+ENDGAME_EMPTIES = 10  # negamax-ab/-id solve perfectly from this nb of empties
+TT_SIZE_MB = 64
+EVAL_CACHE_MB = 16
+BOOK_PATH = "book.bin"  # built with python -m src.ai.book, optional
+PONDER_MODELS = ("negamax-ab", "negamax-id")  # think on the human's time
+MCTS_PRIOR = "mixed"  # heuristics mode biasing mcts towards good moves
 
 pygame.init()
 pygame.display.set_caption("Othello AI")
@@ -31,6 +52,16 @@ screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 font = pygame.font.SysFont(None, 24)
 clock = pygame.time.Clock()
 
+# shared by every AI player and kept across moves
+tt = TranspositionTable(TT_SIZE_MB)
+orderer = MoveOrderer()
+eval_cache = EvalCache(EVAL_CACHE_MB)
+book = OpeningBook(BOOK_PATH) if os.path.exists(BOOK_PATH) else None
+mcts_tree = MCTSTree()
+# AI searches run in the background, the loop polls them
+worker = SearchWorker()
+ponderer = Ponderer()
+
 CTRL_BUTTON = pygame.Rect(
     BOARD_ORIGIN[0] + BOARD_SIZE + RIGHT_PANEL_WIDTH - 100, 12, 100, 32
 )
@@ -50,7 +81,8 @@ def game_is_over(board: BoardBitboard) -> bool:
 
 
 def reset_game():
-    stats = {"B": {"total": 0, "moves": 0}, "W": {"total": 0, "moves": 0}}
+    ponderer.reset()
+    stats = {side: {"total": 0, "moves": 0, "playouts": 0} for side in "BW"}
     board = BoardBitboard()
     turn = 2
     logs = ["Game reset, waiting for start"]
@@ -114,7 +146,7 @@ def draw_board(board: BoardBitboard, legal_moves):
         pygame.draw.circle(screen, HIGHLIGHT, (x, y), CELL_SIZE // 2 - 4, 2)
 
 
-def draw_side_panel(logs, settings):
+def draw_side_panel(logs, settings, status: str = ""):
     x0 = BOARD_ORIGIN[0] + BOARD_SIZE + 10
     y0 = TOP_PANEL_HEIGHT
     w = RIGHT_PANEL_WIDTH
@@ -141,6 +173,10 @@ def draw_side_panel(logs, settings):
         screen.blit(font.render(txt, True, FONT_COLOR), (r.x + 6, r.y + 4))
         settings["_rects"].append(r)
 
+    # search progress
+    if status:
+        screen.blit(font.render(status, True, FONT_COLOR), (x0 + 10, y0 + 98))
+
     # logs
     for i, line in enumerate(logs[-15:]):
         screen.blit(font.render(line, True, FONT_COLOR), (x0 + 5, y0 + 120 + i * 20))
@@ -151,6 +187,10 @@ def handle_side_click(settings, pos):
     if not settings.get("_rects"):
         return
     r_black, r_white, r_depth = settings["_rects"]
+    if r_black.collidepoint(pos) or r_white.collidepoint(pos):
+        # the search in flight may belong to the player being changed
+        worker.cancel()
+        ponderer.cancel()
     if r_black.collidepoint(pos):
         i = PLAYER_TYPES.index(settings["black_type"])
         settings["black_type"] = PLAYER_TYPES[(i + 1) % len(PLAYER_TYPES)]
@@ -162,27 +202,114 @@ def handle_side_click(settings, pos):
         settings["depth_buffer"] = ""
 
 
+def start_pondering(board, color: int, settings):
+    """
+    Once the AI `color` has moved and the human is to play, searches the
+    position after the predicted human reply
+    """
+    model = settings["black_type"] if color == 2 else settings["white_type"]
+    empties = 64 - (board.white | board.black).bit_count()
+    # the endgame solver answers right away anyway
+    if model not in PONDER_MODELS or empties <= ENDGAME_EMPTIES + 1:
+        return
+    # predicted reply : stored best move, else a shallow search
+    opp = 3 - color
+    entry = tt.lookup(zobrist_hash(board.white, board.black, opp))
+    legal = board.legal_moves_bb(opp)
+    if entry is not None and entry[3] >= 0 and legal >> entry[3] & 1:
+        predicted = entry[3]
+    else:
+        (r, c), _ = choose_move_negamax(board, opp, depth=2)
+        predicted = r * 8 + c
+
+    shared = {"tt": tt, "ordering": orderer, "eval_cache": eval_cache, "book": book}
+    if model == "negamax-ab":
+        limit = {"depth": settings["depth"]}
+    else:
+        # deepens until the human moves
+        limit = {"time_ms": math.inf}
+    ponderer.start(choose_move_negamax, board, color, predicted, **limit, **shared)
+
+
 def ai_turn(board, turn, settings):
+    """
+    Starts the search of the AI to move in the background worker. Returns
+    (move, info) right away when pondering already found the move.
+    """
     model = settings["black_type"] if turn == 2 else settings["white_type"]
     if model == "human":
-        return False
+        return None
     depth = settings["depth"]
+    move_time = MOVE_TIME_MS
+
+    pondered = ponderer.resolve(board, turn)
+    if pondered is not None and pondered[0] is not None:
+        move, info = pondered
+        if model == "negamax-ab" and info.depth >= depth:
+            ponderer.saved_ms += info.ms
+            info.algo, info.ms = info.algo + "-ponder", 0
+            return move, info
+        if model == "negamax-id":
+            if info.ms >= MOVE_TIME_MS:
+                ponderer.saved_ms += MOVE_TIME_MS
+                info.algo, info.ms = info.algo + "-ponder", 0
+                return move, info
+            # rest of the budget, on the tables warmed by pondering
+            ponderer.saved_ms += info.ms
+            move_time = MOVE_TIME_MS - info.ms
+
+    # tables shared by every AI player
+    shared = {"tt": tt, "eval_cache": eval_cache, "book": book}
 
     if model == "minimax":
-        move, info = choose_move_minimax(board, turn, depth=depth, use_ab=False)
+        worker.start(
+            choose_move_minimax, board, turn, depth=depth, use_ab=False, **shared
+        )
     elif model == "minimax-ab":
-        move, info = choose_move_minimax(board, turn, depth=depth, use_ab=True)
+        worker.start(
+            choose_move_minimax,
+            board,
+            turn,
+            depth=depth,
+            use_ab=True,
+            ordering=orderer,
+            **shared,
+        )
     elif model == "negamax":
-        move, info = choose_move_negamax(board, turn, depth=depth, use_ab=False)
+        worker.start(
+            choose_move_negamax, board, turn, depth=depth, use_ab=False, **shared
+        )
     elif model == "negamax-ab":
-        move, info = choose_move_negamax(board, turn, depth=depth, use_ab=True)
-    else:
-        return False
-
-    if move is not None:
-        flips = board.apply_move(move, turn)
-        return True, move, flips, info, model
-    return False
+        worker.start(
+            choose_move_negamax,
+            board,
+            turn,
+            depth=depth,
+            use_ab=True,
+            ordering=orderer,
+            endgame_empties=ENDGAME_EMPTIES,
+            **shared,
+        )
+    elif model == "negamax-id":
+        worker.start(
+            choose_move_negamax,
+            board,
+            turn,
+            time_ms=move_time,
+            ordering=orderer,
+            endgame_empties=ENDGAME_EMPTIES,
+            **shared,
+        )
+    elif model == "mcts":
+        worker.start(
+            choose_move_mcts,
+            board,
+            turn,
+            time_ms=MOVE_TIME_MS,
+            tree=mcts_tree,
+            prior_mode=MCTS_PRIOR,
+        )
+    return None
 
 
 def main():
@@ -221,36 +348,50 @@ def main():
                         logs.append(
                             f"{side} [{name}] : total={tot} ms | avg={avg:.1f} ms over {stats[side]['moves']} moves"
                         )
+                        playouts = stats[side]["playouts"]
+                        if playouts:
+                            rate = int(playouts * 1000 / tot) if tot else 0
+                            logs.append(f"    playouts={playouts} ({rate}/s)")
+                if ponderer.hits + ponderer.misses:
+                    logs.append(ponderer.summary())
                 end_logged = True
 
-        # ai turn
-        if state == "running":
-            model = settings["black_type"] if turn == 2 else settings["white_type"]
-            if model != "human":
-                res = ai_turn(board, turn, settings)
-                if res:
-                    _, move, flips, info, model_used = res
-                    # log
-                    logs.append(
-                        f"{'B' if turn==2 else 'W'} : {info.algo} d={info.depth} "
-                        f"{move} +{len(flips)} | nodes={info.nodes} t={info.ms}ms s={info.score:.1f}"
-                    )
-                    # AI stats
-                    side_key = "B" if turn == 2 else "W"
-                    stats[side_key]["total"] += info.ms
-                    stats[side_key]["moves"] += 1
-                    # passes
+        # ai turn : started in the background, applied once found
+        res = None
+        if state == "running" and not worker.busy:
+            res = ai_turn(board, turn, settings)
+        if res is None:
+            res = worker.poll()
+        if res is not None and state == "running":
+            move, info = res
+            if move is not None:
+                flips = board.apply_move(move, turn)
+                # log
+                logs.append(
+                    f"{'B' if turn==2 else 'W'} : {info.algo} d={info.depth} "
+                    f"{move} +{len(flips)} | nodes={info.nodes} tt={info.tt_hits} t={info.ms}ms s={info.score:.1f}"
+                )
+                # AI stats
+                side_key = "B" if turn == 2 else "W"
+                stats[side_key]["total"] += info.ms
+                stats[side_key]["moves"] += 1
+                stats[side_key]["playouts"] += info.playouts
+                # passes
+                turn = 3 - turn
+                if board.legal_moves(turn) == [] and not game_is_over(board):
+                    logs.append(f"{'B' if turn==2 else 'W'} passes")
                     turn = 3 - turn
-                    if (
-                        state == "running"
-                        and board.legal_moves(turn) == []
-                        and not game_is_over(board)
-                    ):
-                        logs.append(f"{'B' if turn==2 else 'W'} passes")
-                        turn = 3 - turn
+                # human to move : think on their time
+                next_type = (
+                    settings["black_type"] if turn == 2 else settings["white_type"]
+                )
+                if next_type == "human" and not game_is_over(board):
+                    start_pondering(board, 3 - turn, settings)
 
         for evt in pygame.event.get():
             if evt.type == pygame.QUIT:
+                worker.cancel()
+                ponderer.cancel()
                 running = False
 
             elif evt.type == pygame.MOUSEBUTTONDOWN and evt.button == 1:
@@ -263,7 +404,13 @@ def main():
                         logs.append("Game running")
                     elif state == "running":
                         state = "paused"
-                        logs.append("Paused")
+                        ponderer.cancel()
+                        if worker.busy:
+                            # restarted from scratch on resume
+                            worker.cancel()
+                            logs.append("Paused, search cancelled")
+                        else:
+                            logs.append("Paused")
                     elif state == "ended":
                         board, turn, logs, state, end_logged, stats = reset_game()
                     continue
@@ -327,7 +474,13 @@ def main():
         screen.fill(BG)
         draw_top_panel(board, turn, state)
         draw_board(board, board.legal_moves(turn) if state == "running" else [])
-        draw_side_panel(logs, settings)
+        if worker.busy:
+            status = worker.status()
+        elif ponderer.worker.busy:
+            status = ponderer.worker.status("pondering")
+        else:
+            status = ""
+        draw_side_panel(logs, settings, status)
         pygame.display.flip()
         clock.tick(60)
 
@@ -0,0 +1,157 @@
+import threading, time
+
+from src.ai.search_info import SearchInfo, SearchTimeout
+
+
+class SearchWorker:
+    """
+    Runs one AI search at a time on a daemon thread so the GUI loop keeps
+    running. The loop polls for the result, reads the live progress and can
+    cancel the search in flight.
+    """
+
+    def __init__(self):
+        self._thread = None
+        self._stop = threading.Event()
+        self._keep = False
+        self._result = None
+        # live progress, written by the search thread
+        self.info: SearchInfo | None = None
+        self.depth = 0
+        self.best: tuple[int, int] | None = None
+        self.t0 = 0.0
+
+    @property
+    def busy(self) -> bool:
+        return self._thread is not None
+
+    def start(self, choose_move, board, color: int, **kwargs):
+        """
+        Starts choose_move(board copy, color, **kwargs) in the background
+        """
+        if self.busy:
+            raise RuntimeError("A search is already running")
+        self._stop = threading.Event()
+        self._keep = False
+        self._result = None
+        self.info, self.depth, self.best = None, 0, None
+        self.t0 = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(choose_move, board.copy(), color, kwargs),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _run(self, choose_move, board, color, kwargs):
+        try:
+            result = choose_move(
+                board, color, stop=self._stop, progress=self._progress, **kwargs
+            )
+        except SearchTimeout:
+            result = None
+        # results of a cancelled search are dropped, even if it completed
+        self._result = None if self._stop.is_set() and not self._keep else result
+
+    def _progress(self, info: SearchInfo, depth: int, move: int):
+        self.info, self.depth = info, depth
+        if move >= 0:
+            self.best = divmod(move, 8)
+
+    def cancel(self, wait: bool = False):
+        """
+        Asks the search to stop, poll() then returns None once it has.
+        wait : blocks until the thread is done and releases the worker
+        """
+        if self.busy:
+            self._stop.set()
+            if wait:
+                self._thread.join()
+                self.poll()
+
+    def finish(self) -> tuple[tuple[int, int] | None, SearchInfo] | None:
+        """
+        Stops the search now and waits for it, keeping its result : iterative
+        deepening returns its last completed depth
+        """
+        if not self.busy:
+            return None
+        self._keep = True
+        self._stop.set()
+        self._thread.join()
+        return self.poll()
+
+    def poll(self) -> tuple[tuple[int, int] | None, SearchInfo] | None:
+        """
+        (move, info) once the search is done, None while it runs or when it
+        was cancelled
+        """
+        if self._thread is None or self._thread.is_alive():
+            return None
+        self._thread = None
+        return self._result
+
+    def status(self, label: str = "thinking") -> str:
+        """
+        One-line progress of the running search
+        """
+        ms = int((time.perf_counter() - self.t0) * 1000)
+        nodes = self.info.nodes if self.info is not None else 0
+        return f"{label} : d={self.depth} nodes={nodes} best={self.best} {ms}ms"
+
+
+class Ponderer:
+    """
+    Searches on the opponent's time : while a human thinks, the position after
+    their predicted reply is searched for the AI. When the prediction hits,
+    the next AI turn reuses the result (and the warm tables).
+    """
+
+    def __init__(self):
+        self.worker = SearchWorker()
+        self.key = None
+        self.reset()
+
+    def reset(self):
+        self.cancel()
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0
+
+    def start(self, choose_move, board, color: int, predicted: int, **kwargs):
+        """
+        Ponders for `color` the position after the opponent plays predicted
+        """
+        self.cancel()
+        pos = board.copy()
+        pos.make(predicted, 3 - color)
+        self.key = (pos.white, pos.black, color)
+        self.worker.start(choose_move, pos, color, **kwargs)
+
+    def cancel(self):
+        self.worker.cancel(wait=True)
+        self.key = None
+
+    def resolve(self, board, color: int):
+        """
+        Stops pondering once the AI is to move. On a hit returns the ponder
+        (move, info), None if it had not completed a single depth.
+        Returns None on a miss.
+        """
+        if self.key is None:
+            return None
+        if self.key != (board.white, board.black, color):
+            self.misses += 1
+            self.cancel()
+            return None
+        self.hits += 1
+        self.key = None
+        return self.worker.finish()
+
+    def summary(self) -> str:
+        tot = self.hits + self.misses
+        rate = self.hits / tot if tot else 0.0
+        return (
+            f"ponder : {self.hits}/{tot} hits ({rate:.0%}) | "
+            f"saved {self.saved_ms} ms"
+        )
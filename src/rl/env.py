@@ -0,0 +1,157 @@
+import math
+
+import numpy as np
+
+from src.engine.board_batch import flips_bb, moves_bb, popcount, random_squares
+from src.engine.board_bitboard import BoardBitboard
+
+_U = np.uint64
+_START = BoardBitboard()
+_START_MOVES = _START.legal_moves_bb(2)
+SQUARE_BITS = _U(1) << np.arange(64, dtype=np.uint64)
+
+# Preallocated step outputs, one row per game : name -> (dtype, row shape)
+# obs planes are player (side to move), opponent and the legal moves mask
+FIELDS = {
+    "obs": (np.float32, (3, 8, 8)),
+    "reward": (np.float32, ()),
+    "done": (np.bool_, ()),
+    "passed": (np.bool_, ()),
+    "margin": (np.int8, ()),
+    "color": (np.int8, ()),
+    "action": (np.int64, ()),
+}
+
+
+def buffer_bytes(n: int) -> int:
+    """
+    Size of the FIELDS arrays of n games laid out by buffer_arrays
+    """
+    size = 0
+    for dtype, shape in FIELDS.values():
+        size += -(-n * np.dtype(dtype).itemsize * math.prod(shape) // 8) * 8
+    return size
+
+
+def buffer_arrays(n: int, buf=None) -> dict[str, np.ndarray]:
+    """
+    FIELDS arrays of n games as views over buf (any writable buffer of
+    buffer_bytes(n), e.g. a shared memory block), allocated if None
+    """
+    buf = bytearray(buffer_bytes(n)) if buf is None else buf
+    arrays, offset = {}, 0
+    for name, (dtype, shape) in FIELDS.items():
+        a = np.ndarray((n, *shape), dtype=dtype, buffer=buf, offset=offset)
+        arrays[name] = a
+        offset += -(-a.nbytes // 8) * 8
+    return arrays
+
+
+def policy_actions(scores, legal_mask, rng, greedy: bool = False) -> np.ndarray:
+    """
+    Actions from (n, 64) policy logits, illegal squares masked : the best
+    legal square when greedy, else sampled from the softmax (Gumbel-max)
+    """
+    scores = np.where(legal_mask > 0, scores, -np.inf)
+    if not greedy:
+        scores = scores + rng.gumbel(size=scores.shape)
+    return scores.argmax(axis=1)
+
+
+class OthelloVecEnv:
+    """
+    n games stepped in lockstep with NumPy bitboards. Each step plays one move
+    per game for its side to move, then :
+    - passes are played automatically, `passed` flags the games where the
+      side to move did not change
+    - finished games get their reward (sign of the final margin for the
+      player who moved) and `done`, and restart from the start position
+    Observations, rewards, ... are written in place in preallocated arrays
+    (FIELDS), the ones returned are overwritten by the next step.
+    arrays : FIELDS views to write to instead (cf buffer_arrays)
+    """
+
+    def __init__(self, n: int, seed=None, arrays: dict | None = None):
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        for name, a in (arrays or buffer_arrays(n)).items():
+            setattr(self, name, a)
+        self._planes = self.obs.reshape(n, 3, 64)
+        self._scratch = np.empty((n, 64), dtype=np.uint64)
+        self.steps = 0
+        self.games = 0
+        self.reset()
+
+    def reset(self) -> np.ndarray:
+        self.P = np.full(self.n, _START.black, dtype=np.uint64)
+        self.O = np.full(self.n, _START.white, dtype=np.uint64)
+        self.legal = np.full(self.n, _START_MOVES, dtype=np.uint64)
+        self.color[:] = 2
+        for a in (self.reward, self.done, self.passed, self.margin):
+            a[:] = 0
+        self._observe()
+        return self.obs
+
+    def _observe(self):
+        for plane, bb in enumerate((self.P, self.O, self.legal)):
+            np.bitwise_and(bb[:, None], SQUARE_BITS, out=self._scratch)
+            np.not_equal(self._scratch, 0, out=self._planes[:, plane])
+
+    def legal_mask(self) -> np.ndarray:
+        """
+        (n, 64) view of the legal moves plane
+        """
+        return self._planes[:, 2]
+
+    def step(self, actions) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Plays one square idx per game, every game having a legal move.
+        Returns (obs, reward, done).
+        """
+        self.action[:] = actions
+        if (self.action < 0).any() or (self.action > 63).any():
+            raise ValueError("Actions are square idx in 0..63")
+        bits = _U(1) << self.action.astype(np.uint64)
+        if ((bits & self.legal) == 0).any():
+            raise ValueError("Illegal action")
+        flips = flips_bb(self.P, self.O, bits)
+        mover = self.P | bits | flips
+        opp = self.O & ~flips
+
+        opp_moves = moves_bb(opp, mover)
+        self.passed[:] = opp_moves == 0
+        stuck = np.flatnonzero(self.passed)
+        mover_moves = np.zeros_like(opp_moves)
+        mover_moves[stuck] = moves_bb(mover[stuck], opp[stuck])
+        self.done[:] = self.passed & (mover_moves == 0)
+        self.passed &= ~self.done
+
+        # the opponent moves next, unless it has to pass
+        self.P = np.where(self.passed, mover, opp)
+        self.O = np.where(self.passed, opp, mover)
+        self.legal = np.where(self.passed, mover_moves, opp_moves)
+        self.color[:] = np.where(self.passed, self.color, 3 - self.color)
+
+        self.reward[:] = 0
+        finished = np.flatnonzero(self.done)
+        if len(finished):
+            margin = popcount(mover[finished]) - popcount(opp[finished])
+            self.margin[finished] = margin
+            self.reward[finished] = np.sign(margin)
+            self.P[finished] = _START.black
+            self.O[finished] = _START.white
+            self.legal[finished] = _START_MOVES
+            self.color[finished] = 2
+            self.games += len(finished)
+        self.steps += self.n
+        self._observe()
+        return self.obs, self.reward, self.done
+
+    def random_actions(self) -> np.ndarray:
+        return random_squares(self.legal, self.rng)
+
+    def policy_actions(self, scores: np.ndarray, greedy: bool = False):
+        return policy_actions(scores, self.legal_mask(), self.rng, greedy)
+
+    def step_random(self):
+        return self.step(self.random_actions())
@@ -0,0 +1,119 @@
+import os
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.rl.env import (
+    FIELDS,
+    OthelloVecEnv,
+    buffer_arrays,
+    buffer_bytes,
+    policy_actions,
+)
+
+
+def _worker(conn, name: str, n: int, lo: int, hi: int, seed):
+    shm = shared_memory.SharedMemory(name=name)
+    arrays = {k: a[lo:hi] for k, a in buffer_arrays(n, shm.buf).items()}
+    env = OthelloVecEnv(hi - lo, seed, arrays)
+    while True:
+        cmd = conn.recv()
+        if cmd == "close":
+            break
+        try:
+            if cmd == "step":
+                env.step(env.action.copy())
+            elif cmd == "random":
+                env.step_random()
+            else:
+                env.reset()
+        except ValueError as e:
+            # checked before any change, the games are left as they were
+            conn.send(e)
+            continue
+        conn.send((env.steps, env.games))
+    del env, arrays
+    shm.close()
+
+
+class ProcVecEnv:
+    """
+    OthelloVecEnv split over worker processes, each stepping its slice of
+    the games. Actions and step outputs (FIELDS) live in one shared memory
+    block : the arrays read here are written in place by the workers, only
+    the commands go through pipes.
+    """
+
+    def __init__(self, n: int, workers: int | None = None, seed: int = 0):
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        self.workers = workers or os.cpu_count() or 1
+        self._shm = shared_memory.SharedMemory(create=True, size=buffer_bytes(n))
+        for name, a in buffer_arrays(n, self._shm.buf).items():
+            setattr(self, name, a)
+        self.steps = 0
+        self.games = 0
+        bounds = np.linspace(0, n, self.workers + 1).astype(int)
+        self._conns, self._procs = [], []
+        for i in range(self.workers):
+            parent, child = mp.Pipe()
+            args = (child, self._shm.name, n, bounds[i], bounds[i + 1], [seed, i])
+            p = mp.Process(target=_worker, args=args, daemon=True)
+            p.start()
+            self._conns.append(parent)
+            self._procs.append(p)
+        self.reset()
+
+    def _broadcast(self, cmd: str):
+        for conn in self._conns:
+            conn.send(cmd)
+        replies = [conn.recv() for conn in self._conns]
+        for reply in replies:
+            if isinstance(reply, Exception):
+                raise reply
+        self.steps = sum(steps for steps, _ in replies)
+        self.games = sum(games for _, games in replies)
+
+    def reset(self) -> np.ndarray:
+        self._broadcast("reset")
+        return self.obs
+
+    def legal_mask(self) -> np.ndarray:
+        return self.obs.reshape(self.n, 3, 64)[:, 2]
+
+    def policy_actions(self, scores: np.ndarray, greedy: bool = False):
+        return policy_actions(scores, self.legal_mask(), self.rng, greedy)
+
+    def step(self, actions) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        self.action[:] = actions
+        # checked here so that no worker steps when another one would refuse
+        if (self.action < 0).any() or (self.action > 63).any():
+            raise ValueError("Actions are square idx in 0..63")
+        if not self.legal_mask()[np.arange(self.n), self.action].all():
+            raise ValueError("Illegal action")
+        self._broadcast("step")
+        return self.obs, self.reward, self.done
+
+    def step_random(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Random legal moves drawn in the workers
+        """
+        self._broadcast("random")
+        return self.obs, self.reward, self.done
+
+    def close(self):
+        for conn in self._conns:
+            conn.send("close")
+        for p in self._procs:
+            p.join()
+        for name in FIELDS:
+            delattr(self, name)
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,59 @@
+import time
+import random
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.engine.board_batch import BoardBatch
+from src.engine.board_bitboard import BoardBitboard, squares
+
+n_games = 256
+batch_size = 4096
+
+# ------ cross-check against BoardBitboard on random games
+rng = np.random.default_rng(0)
+random.seed(0)
+boards = [BoardBitboard() for _ in range(n_games)]
+batch = BoardBatch(n_games)
+color = 2
+for ply in range(70):
+    colors = np.full(n_games, color)
+    moves = batch.legal_moves_bb(colors)
+    for i, b in enumerate(boards):
+        assert int(moves[i]) == b.legal_moves_bb(color), (ply, i)
+    chosen = []
+    for i, b in enumerate(boards):
+        legal = list(squares(b.legal_moves_bb(color)))
+        chosen.append(random.choice(legal) if legal else -1)
+    flips = batch.apply_moves(np.array(chosen), colors)
+    for i, b in enumerate(boards):
+        expected = b.make(chosen[i], color) if chosen[i] >= 0 else 0
+        assert int(flips[i]) == expected, (ply, i)
+        assert (int(batch.white[i]), int(batch.black[i])) == (b.white, b.black)
+    color = 3 - color
+print(f"BoardBatch: matches BoardBitboard on {n_games} random games")
+
+# ------ random playouts throughput
+t0 = time.perf_counter()
+for i in range(200):
+    bb = BoardBitboard()
+    color = 2
+    while True:
+        moves = list(squares(bb.legal_moves_bb(color)))
+        if not moves:
+            color = 3 - color
+            moves = list(squares(bb.legal_moves_bb(color)))
+            if not moves:
+                break
+        bb.make(random.choice(moves), color)
+        color = 3 - color
+t1 = time.perf_counter()
+print(f"BoardBitboard: {200/(t1-t0):.0f} playouts/s")
+
+t0 = time.perf_counter()
+BoardBatch(batch_size).random_playouts(2, rng)
+t1 = time.perf_counter()
+print(f"BoardBatch[{batch_size}]: {batch_size/(t1-t0):.0f} playouts/s")
@@ -0,0 +1,70 @@
+import time
+import random
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.engine.board_bitboard import BoardBitboard, squares
+from src.ai.book import BookBuilder, OpeningBook, position_key, self_play
+from src.ai.negamax import choose_move_negamax
+
+n_games = 40
+max_plies = 16
+n_lookups = 100_000
+
+t0 = time.perf_counter()
+games = self_play(n_games, depth=2)
+builder = BookBuilder()
+for g in games:
+    builder.add_game(g, max_plies)
+path = os.path.join(tempfile.mkdtemp(), "book.bin")
+n = builder.write(path)
+print(f"built {n} positions from {n_games} games in {time.perf_counter() - t0:.1f}s")
+
+t0 = time.perf_counter()
+book = OpeningBook(path)
+dt = time.perf_counter() - t0
+print(f"open : {dt * 1e6:.0f} us, {os.path.getsize(path)} bytes")
+
+# ------ every book position is found with a legal move, random ones are not
+positions = []
+for g in games:
+    board, color = BoardBitboard(), 2
+    for move in g[:max_plies]:
+        if not board.legal_moves_bb(color) >> move & 1:
+            color = 3 - color
+        positions.append((board.copy(), color))
+        board.make(move, color)
+        color = 3 - color
+for board, color in positions:
+    entry = book.probe(board, color)
+    assert entry is not None and board.legal_moves_bb(color) >> entry[0] & 1
+    assert entry[2] >= 1
+print(f"{len(positions)} game positions found in the book")
+
+rng = random.Random(0)
+keys = [rng.getrandbits(64) for _ in range(1000)]
+assert sum(book.lookup(k) is not None for k in keys) == 0
+
+# ------ lookup cost
+hashes = [position_key(b, c)[0] for b, c in positions]
+lookups = (hashes * (n_lookups // len(hashes) + 1))[:n_lookups]
+t0 = time.perf_counter()
+for k in lookups:
+    book.lookup(k)
+dt = time.perf_counter() - t0
+print(f"lookup : {dt / n_lookups * 1e6:.2f} us")
+
+t0 = time.perf_counter()
+for b, c in positions:
+    book.probe(b, c)
+dt = time.perf_counter() - t0
+print(f"probe (hash + legality) : {dt / len(positions) * 1e6:.2f} us")
+
+# ------ consulted by the search
+move, info = choose_move_negamax(BoardBitboard(), 2, depth=6, book=book)
+assert info.algo == "book"
+print(f"start position : {move} from book in {info.ms} ms, score={info.score:.1f}")
+book.close()
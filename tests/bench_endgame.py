@@ -0,0 +1,56 @@
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.engine.board_bitboard import squares
+from src.ai.endgame import solve
+from random_positions import random_positions
+
+n_positions = 20
+
+
+def brute_force(bb, color):
+    """
+    Plain full-width negamax on the final disc margin (reference)
+    """
+    moves = list(squares(bb.legal_moves_bb(color)))
+    if not moves:
+        if not bb.legal_moves_bb(3 - color):
+            p = (bb.white if color == 1 else bb.black).bit_count()
+            o = (bb.black if color == 1 else bb.white).bit_count()
+            e = 64 - p - o
+            return p - o + (e if p > o else -e if p < o else 0)
+        return -brute_force(bb, 3 - color)
+    best = -65
+    for m in moves:
+        flips = bb.make(m, color)
+        best = max(best, -brute_force(bb, 3 - color))
+        bb.unmake(m, flips, color)
+    return best
+
+
+# ------ correctness against brute force on small endgames
+for empties in range(1, 9):
+    for bb, color in random_positions(5, empties=empties, seed=empties):
+        _, exact, _ = solve(bb, color)
+        _, wld, _ = solve(bb, color, "wld")
+        ref = brute_force(bb, color)
+        assert exact == ref, (empties, exact, ref)
+        assert wld == (ref > 0) - (ref < 0)
+print("solve matches brute force for 1..8 empties")
+
+# ------ throughput
+for empties in (8, 10, 12):
+    positions = random_positions(n_positions, empties=empties, seed=empties)
+    for mode in ("exact", "wld"):
+        nodes = 0
+        t0 = time.perf_counter()
+        for bb, color in positions:
+            nodes += solve(bb, color, mode)[2].nodes
+        dt = time.perf_counter() - t0
+        print(
+            f"{empties} empties [{mode}] : {n_positions/dt:.1f} positions/s "
+            f"| {nodes/dt:.0f} nodes/s | {nodes/n_positions:.0f} nodes/position"
+        )
@@ -0,0 +1,111 @@
+import time
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.engine.board_bitboard import BoardBitboard, squares
+from src.ai.heuristics import STABILITY, _positional, evaluate
+
+n_games = 200
+repeats = 5
+
+
+def positional_loop(board, color: int) -> int:
+    """
+    Previous 64-iteration implementation, kept as reference
+    """
+    w, b = board.white, board.black
+    score = 0
+    for idx in range(64):
+        bit = 1 << idx
+        if not ((w | b) & bit):
+            continue
+        r, c = divmod(idx, 8)
+        v = STABILITY[r][c]
+        if (color == 1 and (w & bit)) or (color == 2 and (b & bit)):
+            score += v
+        else:
+            score -= v
+    return score
+
+
+# seeded corpus of positions from random games
+random.seed(0)
+positions = []
+for _ in range(n_games):
+    bb = BoardBitboard()
+    color = 2
+    while True:
+        moves = list(squares(bb.legal_moves_bb(color)))
+        if not moves:
+            color = 3 - color
+            moves = list(squares(bb.legal_moves_bb(color)))
+            if not moves:
+                break
+        bb.make(random.choice(moves), color)
+        color = 3 - color
+        positions.append(bb.copy())
+
+for b in positions:
+    for color in (1, 2):
+        assert _positional(b, color) == positional_loop(b, color)
+print(f"{len(positions)} positions, table lookup matches the loop")
+
+
+def per_leaf_us(fn) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        for b in positions:
+            fn(b, 2)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(positions) * 1e6
+
+
+print(f"positional loop  : {per_leaf_us(positional_loop):.2f} us/leaf")
+print(f"positional table : {per_leaf_us(_positional):.2f} us/leaf")
+for mode in ("absolute", "positional", "mobility", "mixed"):
+    us = per_leaf_us(lambda b, c: evaluate(b, c, mode))
+    print(f"evaluate[{mode}] : {us:.2f} us/leaf")
+
+
+# ------ incremental evaluator : exact match along random games & per-leaf cost
+from src.ai.incremental import IncrementalEvaluator
+
+random.seed(1)
+for _ in range(50):
+    board = BoardBitboard()
+    ev = IncrementalEvaluator(board)
+    color, history = 2, []
+    while True:
+        moves = list(squares(board.legal_moves_bb(color)))
+        if not moves:
+            color = 3 - color
+            moves = list(squares(board.legal_moves_bb(color)))
+            if not moves:
+                break
+        move = random.choice(moves)
+        history.append((move, ev.make(move, color), color))
+        for mode in ("absolute", "positional", "mobility", "mixed"):
+            ev.mode = mode
+            for c in (1, 2):
+                assert ev.evaluate(c) == evaluate(board, c, mode)
+        color = 3 - color
+    # unwinds back to the start position
+    for move, flips, c in reversed(history):
+        ev.unmake(move, flips, c)
+    assert ev.counts == [0, 2, 2] and ev.pos == [0, 2, 2]
+    assert (board.white, board.black) == (BoardBitboard().white, BoardBitboard().black)
+print("IncrementalEvaluator matches evaluate for every mode")
+
+for mode in ("absolute", "positional", "mobility", "mixed"):
+    evaluators = [IncrementalEvaluator(b, mode) for b in positions]
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        for ev in evaluators:
+            ev.evaluate(2)
+        best = min(best, time.perf_counter() - t0)
+    print(f"incremental[{mode}] : {best / len(positions) * 1e6:.2f} us/leaf")
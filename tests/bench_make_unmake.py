@@ -0,0 +1,67 @@
+import time
+import tracemalloc
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.engine.board_bitboard import BoardBitboard
+
+# full-width tree walk from the start position, no evaluation
+depth = 6
+boards_allocated = 0
+
+
+def clone_and_play(board, move, color):
+    global boards_allocated
+    boards_allocated += 1
+    nb = BoardBitboard.__new__(BoardBitboard)
+    nb.white, nb.black = board.white, board.black
+    nb.apply_move(move, color)
+    return nb
+
+
+def walk_clone(board, color, depth):
+    if depth == 0:
+        return 1
+    legal = board.legal_moves(color)
+    if not legal:
+        return walk_clone(board, 3 - color, depth - 1)
+    nodes = 1
+    for move in legal:
+        nodes += walk_clone(clone_and_play(board, move, color), 3 - color, depth - 1)
+    return nodes
+
+
+def walk_make(board, color, depth):
+    if depth == 0:
+        return 1
+    legal = board.legal_moves(color)
+    if not legal:
+        return walk_make(board, 3 - color, depth - 1)
+    nodes = 1
+    for r, c in legal:
+        idx = r * 8 + c
+        flips = board.make(idx, color)
+        nodes += walk_make(board, 3 - color, depth - 1)
+        board.unmake(idx, flips, color)
+    return nodes
+
+
+for name, walk in (("clone/node", walk_clone), ("make/unmake", walk_make)):
+    boards_allocated = 0
+    t0 = time.perf_counter()
+    nodes = walk(BoardBitboard(), 2, depth)
+    t1 = time.perf_counter()
+    allocated = boards_allocated
+
+    # memory traced in a separate run, tracemalloc slows the walk down
+    tracemalloc.start()
+    walk(BoardBitboard(), 2, depth)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{name}: {nodes} nodes in {t1-t0:.4f}s -> {nodes/(t1-t0):.0f} nodes/s "
+        f"| boards allocated={allocated} | peak traced={peak} B"
+    )
@@ -0,0 +1,40 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.engine.board_bitboard import BoardBitboard
+from src.ai.mcts import MCTSTree, choose_move_mcts
+from random_positions import random_positions
+
+# Playouts/s of MCTS with and without heuristic priors, and how much of the
+# tree is reused from one move to the next in self-play
+playouts = 1000
+
+
+if __name__ == "__main__":
+    positions = [(BoardBitboard(), 2)] + random_positions(3, 20)
+    for prior in (None, "mixed"):
+        done = ms = 0
+        for board, color in positions:
+            _, info = choose_move_mcts(board, color, playouts, prior_mode=prior)
+            done += info.playouts
+            ms += info.ms
+        print(f"prior={prior} : {done * 1000 / ms:.0f} playouts/s")
+
+    tree, board, color = MCTSTree(), BoardBitboard(), 2
+    moves = reused = 0
+    while True:
+        if not board.legal_moves_bb(color):
+            color = 3 - color
+            if not board.legal_moves_bb(color):
+                break
+        (r, c), info = choose_move_mcts(board, color, playouts, tree=tree, seed=0)
+        reused += tree.reused
+        moves += 1
+        board.make(r * 8 + c, color)
+        color = 3 - color
+    print(
+        f"self-play : {moves} moves, {reused / moves:.0f} playouts reused per "
+        f"move ({reused / (moves * playouts):.0%} of the budget)"
+    )
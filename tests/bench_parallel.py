@@ -0,0 +1,41 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ai.negamax import choose_move_negamax
+from src.ai.parallel import ParallelSearch
+from random_positions import random_positions
+
+depth = 6
+n_positions = 4
+
+
+if __name__ == "__main__":
+    positions = random_positions(n_positions, 20)
+    serial = [choose_move_negamax(b, c, depth)[1].score for b, c in positions]
+    counts = sorted({1, 2, 4, os.cpu_count() or 1})
+
+    for mode in ("root", "lazy"):
+        base = None
+        for workers in counts:
+            nodes = ms = 0
+            ttd = [0] * depth
+            with ParallelSearch(workers, mode, tt_size_mb=16) as search:
+                for (b, c), ref in zip(positions, serial):
+                    search.tt.clear()
+                    _, info = search.search(b, c, depth)
+                    if mode == "root":
+                        # exact root scores : same value as the serial search
+                        assert info.score == ref, (info.score, ref)
+                    nodes += info.nodes
+                    ms += info.ms
+                    for d, t in enumerate(info.time_to_depth[:depth]):
+                        ttd[d] += t
+            base = base or ms
+            print(
+                f"{mode} x{workers} : {nodes * 1000 // max(ms, 1)} nodes/s | "
+                f"time to depth {depth} {ttd[depth - 1]} ms | "
+                f"speedup {base / max(ms, 1):.2f} "
+                f"(efficiency {base / max(ms, 1) / workers:.0%})"
+            )
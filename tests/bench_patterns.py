@@ -0,0 +1,61 @@
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ai.heuristics import evaluate
+from src.ai.patterns import WEIGHTS_PATH, load_weights
+from src.arena import Results, parse_player, play_game, random_opening
+from random_positions import game_positions
+
+# Pattern evaluation vs mixed : eval speed, then strength in color-swapped
+# game pairs from random openings
+#   python tests/bench_patterns.py --weights patterns.bin --games 200 --depth 3
+
+
+def speed(mode: str, boards, repeats=5) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        for bb, color in boards:
+            evaluate(bb, color, mode)
+        best = min(best, time.perf_counter() - t0)
+    return len(boards) / best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--weights", default=WEIGHTS_PATH)
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--plies", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    load_weights(args.weights)
+
+    boards = game_positions(20)
+    for mode in ("mixed", "pattern"):
+        print(f"evaluate/{mode:8} {speed(mode, boards):9.0f} evals/s")
+
+    players = [
+        parse_player(f"negamax-ab:depth={args.depth},mode={m}")
+        for m in ("pattern", "mixed")
+    ]
+    rng = random.Random(0)
+    games = []
+    while len(games) < args.games:
+        opening = random_opening(rng, args.plies)
+        games += [(*players, opening, 0), (*players[::-1], opening, 0)]
+    results = Results([p["name"] for p in players])
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(
+        args.workers, initializer=load_weights, initargs=(args.weights,)
+    ) as pool:
+        for game in pool.map(play_game, *zip(*games)):
+            results.add(game)
+    print(f"{len(games)} games in {time.perf_counter() - t0:.0f}s")
+    print("\n".join(results.report(0.0, 10.0, 0.05, 0.05)))
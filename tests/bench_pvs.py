@@ -0,0 +1,90 @@
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.engine.board_bitboard import squares
+from src.ai.move_ordering import MoveOrderer
+from src.ai.negamax import _search_aspiration, _search_root, choose_move_negamax
+from src.ai.search_info import SearchContext, SearchInfo
+from src.ai.transposition import TranspositionTable
+from random_positions import random_positions
+
+# Nodes of principal variation search against plain alpha-beta on a fixed
+# set of positions : fixed depth searches, then iterative deepening to a
+# fixed depth with aspiration windows at the root
+n_positions = 30
+id_depth = 7
+
+
+def fixed_depth(positions, depth, pvs, tables):
+    nodes = ms = researches = 0
+    scores = []
+    for board, color in positions:
+        kwargs = {}
+        if tables:
+            kwargs = {"tt": TranspositionTable(4), "ordering": MoveOrderer()}
+        _, info = choose_move_negamax(board, color, depth, pvs=pvs, **kwargs)
+        nodes += info.nodes
+        ms += info.ms
+        researches += info.researches
+        scores.append(info.score)
+    return nodes, ms, researches, scores
+
+
+def deepen(positions, depth, aspiration):
+    """
+    Iterative deepening to depth with PVS, as choose_move_negamax does on a
+    time budget, the root window being full or an aspiration window
+    """
+    nodes = ms = fails = 0
+    for board, color in positions:
+        t0 = time.perf_counter()
+        info = SearchInfo()
+        ctx = SearchContext(info, True, TranspositionTable(4), MoveOrderer())
+        ctx.use_pvs = True
+        ctx.tt.new_search()
+        ctx.orderer.new_search()
+        legal = list(squares(board.legal_moves_bb(color)))
+        board = board.copy()
+        move, score = -1, -math.inf
+        for d in range(1, depth + 1):
+            if aspiration and d > 1:
+                move, score = _search_aspiration(
+                    board, color, legal, d, ctx, move, score
+                )
+            else:
+                move, score = _search_root(board, color, legal, d, ctx, move)
+        nodes += info.nodes
+        fails += info.aspiration_fails
+        ms += (time.perf_counter() - t0) * 1000
+    return nodes, ms, fails
+
+
+if __name__ == "__main__":
+    pos = random_positions(n_positions, (8, 40))
+    print(f"{n_positions} positions")
+    for depth in (4, 6):
+        for tables in (False, True):
+            ab = fixed_depth(pos, depth, False, tables)
+            pvs = fixed_depth(pos, depth, True, tables)
+            if not tables:
+                # same minimax value, null windows only prune
+                for a, b in zip(ab[3], pvs[3]):
+                    assert abs(a - b) < 1e-6, (a, b)
+            label = "tt + ordering" if tables else "no tt"
+            print(
+                f"depth {depth} {label} : alpha-beta {ab[0]} nodes {ab[1]} ms | "
+                f"pvs {pvs[0]} nodes {pvs[1]} ms ({pvs[0] / ab[0] - 1:+.1%} "
+                f"nodes, {pvs[2]} re-searches)"
+            )
+
+    full = deepen(pos, id_depth, False)
+    asp = deepen(pos, id_depth, True)
+    print(
+        f"iterative deepening to {id_depth}, pvs : full root window {full[0]} "
+        f"nodes {full[1]:.0f} ms | aspiration {asp[0]} nodes {asp[1]:.0f} ms "
+        f"({asp[0] / full[0] - 1:+.1%} nodes, {asp[2]} misses)"
+    )
@@ -0,0 +1,77 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.engine.board_bitboard import BoardBitboard, squares
+from src.rl.env import OthelloVecEnv
+from src.rl.proc_env import ProcVecEnv
+
+# Batched environment : cross-check against BoardBitboard, then steps/s of
+# random self-play for a few batch sizes and worker counts
+#   python tests/bench_rl_env.py --seconds 3 --workers 1 2 4
+
+
+def check(n_games=64, plies=300):
+    env = OthelloVecEnv(n_games, seed=0)
+    boards, colors = [BoardBitboard() for _ in range(n_games)], [2] * n_games
+    rng = random.Random(0)
+    for ply in range(plies):
+        actions = []
+        for i, b in enumerate(boards):
+            legal = list(squares(b.legal_moves_bb(colors[i])))
+            assert np.flatnonzero(env.legal_mask()[i]).tolist() == legal, (ply, i)
+            assert env.color[i] == colors[i], (ply, i)
+            actions.append(rng.choice(legal))
+        _, reward, done = env.step(actions)
+        for i, b in enumerate(boards):
+            c = colors[i]
+            b.make(actions[i], c)
+            if b.legal_moves_bb(3 - c):
+                colors[i] = 3 - c
+            elif not b.legal_moves_bb(c):
+                margin = b.white.bit_count() - b.black.bit_count()
+                margin = margin if c == 1 else -margin
+                assert done[i] and env.margin[i] == margin, (ply, i)
+                assert reward[i] == np.sign(margin), (ply, i)
+                boards[i], colors[i] = BoardBitboard(), 2
+                continue
+            assert not done[i] and env.passed[i] == (colors[i] == c), (ply, i)
+    print(f"OthelloVecEnv : matches BoardBitboard, {env.games} games")
+
+
+def rate(env, seconds: float) -> tuple[float, float]:
+    env.step_random()
+    steps0, games0 = env.steps, env.games
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        env.step_random()
+    dt = time.perf_counter() - t0
+    return (env.steps - steps0) / dt, (env.games - games0) / dt
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 1024, 4096])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    check()
+    for n in args.sizes:
+        steps, games = rate(OthelloVecEnv(n, seed=0), args.seconds)
+        print(f"OthelloVecEnv[{n}] : {steps:10.0f} steps/s | {games:7.0f} games/s")
+    n = max(args.sizes)
+    for workers in args.workers:
+        with ProcVecEnv(n * workers, workers) as env:
+            steps, games = rate(env, args.seconds)
+        print(
+            f"ProcVecEnv[{n}x{workers}] : {steps:10.0f} steps/s "
+            f"| {games:7.0f} games/s"
+        )
+    print(f"({os.cpu_count()} cpus)")
@@ -0,0 +1,88 @@
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import arena
+from src.ai.move_ordering import MoveOrderer
+from src.ai.negamax import choose_move_negamax
+from src.ai.probcut import PROBCUT_PATH, PROBCUT_T, ProbCut
+from src.ai.transposition import TranspositionTable
+from random_positions import random_positions
+
+# Selective search (Multi-ProbCut, late move reductions) against full-width
+# PVS : nodes and time at fixed depth, depth reached and strength at matched
+# time budgets. Needs fitted parameters :
+#   python -m src.ai.probcut_calibration --out probcut.json
+#   python tests/bench_selective.py --params probcut.json
+
+
+def _load_params(path: str, t: float):
+    arena._probcuts[t] = ProbCut.load(path, t)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--params", default=PROBCUT_PATH)
+    parser.add_argument("--t", type=float, default=PROBCUT_T, help="cut threshold")
+    parser.add_argument("--positions", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=6, help="fixed depth part")
+    parser.add_argument("--time", type=int, default=100, help="ms per move")
+    parser.add_argument("--games", type=int, default=40, help="per pairing")
+    parser.add_argument("--plies", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    probcut = ProbCut.load(args.params, args.t)
+
+    configs = {
+        "pvs": {},
+        "pvs+mpc": {"probcut": probcut},
+        "pvs+lmr": {"lmr": True},
+        "pvs+mpc+lmr": {"probcut": probcut, "lmr": True},
+    }
+    positions = random_positions(args.positions, (12, 36))
+    for name, kwargs in configs.items():
+        nodes = ms = 0
+        for board, color in positions:
+            tables = {"tt": TranspositionTable(4), "ordering": MoveOrderer()}
+            _, info = choose_move_negamax(
+                board, color, args.depth, pvs=True, **tables, **kwargs
+            )
+            nodes += info.nodes
+            ms += info.ms
+        depths = []
+        for board, color in positions:
+            tables = {"tt": TranspositionTable(4), "ordering": MoveOrderer()}
+            _, info = choose_move_negamax(
+                board, color, pvs=True, time_ms=args.time, **tables, **kwargs
+            )
+            depths.append(info.depth)
+        print(
+            f"{name:12} depth {args.depth} : {nodes} nodes {ms} ms | "
+            f"{args.time} ms/move : depth {sum(depths) / len(depths):.1f}"
+        )
+
+    base = f"negamax-pvs:time={args.time}"
+    players = [arena.parse_player(base)] + [
+        arena.parse_player(f"{base},{opts}")
+        for opts in (f"probcut={args.t}", "lmr=1", f"probcut={args.t},lmr=1")
+    ]
+    rng = random.Random(0)
+    games = []
+    while len(games) < args.games * (len(players) - 1):
+        opening = arena.random_opening(rng, args.plies)
+        for p in players[1:]:
+            games += [(p, players[0], opening, 0), (players[0], p, opening, 0)]
+    results = arena.Results([p["name"] for p in players])
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(
+        args.workers, initializer=_load_params, initargs=(args.params, args.t)
+    ) as pool:
+        for game in pool.map(arena.play_game, *zip(*games)):
+            results.add(game)
+    print(f"{len(games)} games in {time.perf_counter() - t0:.0f}s")
+    print("\n".join(results.report(0.0, 10.0, 0.05, 0.05)))
@@ -0,0 +1,243 @@
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.engine.board_array import BoardArray
+from src.engine.board_bitboard import (
+    MOVE_GENERATORS,
+    BoardBitboard,
+    set_move_generator,
+    squares,
+)
+from src.ai.heuristics import evaluate
+from src.ai.minimax import choose_move_minimax
+from src.ai.negamax import choose_move_negamax
+
+# Benchmark suite on a fixed, seeded corpus of positions :
+#   python tests/bench_suite.py run --out bench.json
+#   python tests/bench_suite.py compare baseline.json bench.json
+# Every benchmark is warmed up then timed `repeats` times, the median and the
+# interquartile range of the runs are reported.
+
+CORPUS_SEED = 0
+CORPUS_GAMES = 20
+SEARCH_POSITIONS = 8  # subset of the corpus searched, spread over the game
+
+
+def corpus(seed: int = CORPUS_SEED, n_games: int = CORPUS_GAMES):
+    """
+    Positions of seeded random games : (BoardBitboard, BoardArray, color)
+    """
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(n_games):
+        bb, ba, color = BoardBitboard(), BoardArray(), 2
+        while True:
+            moves = list(squares(bb.legal_moves_bb(color)))
+            if not moves:
+                color = 3 - color
+                moves = list(squares(bb.legal_moves_bb(color)))
+                if not moves:
+                    break
+            positions.append((bb.copy(), _copy_array(ba), color))
+            move = rng.choice(moves)
+            bb.make(move, color)
+            ba.apply_move(divmod(move, 8), color)
+            color = 3 - color
+    return positions
+
+
+def _copy_array(ba: BoardArray) -> BoardArray:
+    nb = BoardArray.__new__(BoardArray)
+    nb.board = [row[:] for row in ba.board]
+    return nb
+
+
+# ------ benchmarks : fn(positions) -> (ops, nodes)
+def movegen_array(positions):
+    for _, ba, color in positions:
+        ba.legal_moves(color)
+        ba.legal_moves(3 - color)
+    return 2 * len(positions), 0
+
+
+def movegen_bitboard(gen: str):
+    def bench(positions):
+        set_move_generator(gen)
+        for bb, _, color in positions:
+            bb.legal_moves_bb(color)
+            bb.legal_moves_bb(3 - color)
+        set_move_generator("kogge-stone")
+        return 2 * len(positions), 0
+
+    return bench
+
+
+def apply_array(positions):
+    ops = 0
+    for _, ba, color in positions:
+        for move in ba.legal_moves(color):
+            _copy_array(ba).apply_move(move, color)
+            ops += 1
+    return ops, 0
+
+
+def apply_bitboard(positions):
+    ops = 0
+    for bb, _, color in positions:
+        for move in bb.legal_moves(color):
+            bb.copy().apply_move(move, color)
+            ops += 1
+    return ops, 0
+
+
+def make_unmake(positions):
+    ops = 0
+    for bb, _, color in positions:
+        for move in squares(bb.legal_moves_bb(color)):
+            flips = bb.make(move, color)
+            bb.unmake(move, flips, color)
+            ops += 1
+    return ops, 0
+
+
+def evaluate_mode(mode: str):
+    def bench(positions):
+        for bb, _, color in positions:
+            evaluate(bb, color, mode)
+        return len(positions), 0
+
+    return bench
+
+
+def search(choose_move, depth: int, **kwargs):
+    def bench(positions):
+        step = max(1, len(positions) // SEARCH_POSITIONS)
+        nodes = 0
+        for bb, _, color in positions[::step][:SEARCH_POSITIONS]:
+            nodes += choose_move(bb, color, depth, **kwargs)[1].nodes
+        return SEARCH_POSITIONS, nodes
+
+    return bench
+
+
+BENCHMARKS = {
+    "movegen/array": movegen_array,
+    **{f"movegen/bitboard[{g}]": movegen_bitboard(g) for g in MOVE_GENERATORS},
+    "apply/array": apply_array,
+    "apply/bitboard": apply_bitboard,
+    "apply/make-unmake": make_unmake,
+    **{
+        f"evaluate/{m}": evaluate_mode(m)
+        for m in ("absolute", "positional", "mobility", "mixed")
+    },
+    "search/minimax d3": search(choose_move_minimax, 3),
+    "search/minimax-ab d4": search(choose_move_minimax, 4, use_ab=True),
+    "search/negamax d3": search(choose_move_negamax, 3, use_ab=False),
+    "search/negamax-ab d4": search(choose_move_negamax, 4),
+}
+
+
+def measure(fn, positions, repeats: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        fn(positions)
+    runs = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        ops, nodes = fn(positions)
+        runs.append(time.perf_counter() - t0)
+    median = statistics.median(runs)
+    q = statistics.quantiles(runs, n=4) if len(runs) > 1 else [median] * 3
+    return {
+        "median_s": median,
+        "iqr_s": q[2] - q[0],
+        "runs_s": runs,
+        "ops": ops,
+        "ops_per_s": ops / median,
+        "nodes": nodes,
+        "nps": nodes / median,
+    }
+
+
+def run(args):
+    positions = corpus()
+    selected = [n for n in BENCHMARKS if not args.filter or args.filter in n]
+    results = {}
+    for name in selected:
+        r = measure(BENCHMARKS[name], positions, args.repeats, args.warmup)
+        results[name] = r
+        extra = f" | {r['nps']:.0f} nodes/s" if r["nodes"] else ""
+        print(
+            f"{name:28} {r['median_s'] * 1000:9.2f} ms "
+            f"(iqr {r['iqr_s'] * 1000:.2f}) | {r['ops_per_s']:.0f} ops/s{extra}"
+        )
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "corpus": {"seed": CORPUS_SEED, "positions": len(positions)},
+            "repeats": args.repeats,
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"results written to {args.out}")
+
+
+def compare(args) -> int:
+    """
+    Flags benchmarks slower than the baseline by more than the threshold
+    and by more than the run-to-run noise (sum of both IQRs)
+    """
+    with open(args.baseline) as f:
+        base = json.load(f)["results"]
+    with open(args.current) as f:
+        cur = json.load(f)["results"]
+    regressions = 0
+    for name in (n for n in base if n in cur):
+        b, c = base[name], cur[name]
+        ratio = c["median_s"] / b["median_s"]
+        noise = b["iqr_s"] + c["iqr_s"]
+        status = ""
+        if ratio > 1 + args.threshold and c["median_s"] - b["median_s"] > noise:
+            status = "REGRESSION"
+            regressions += 1
+        elif ratio < 1 - args.threshold and b["median_s"] - c["median_s"] > noise:
+            status = "faster"
+        if b["nodes"] != c["nodes"]:
+            # same corpus & depth : the search itself changed
+            status += f" nodes {b['nodes']} -> {c['nodes']}"
+        print(f"{name:28} {ratio:6.2f}x {status}")
+    for name in (n for n in base if n not in cur):
+        print(f"{name:28} missing")
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark suite")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_run = sub.add_parser("run")
+    p_run.add_argument("--out", help="JSON results file")
+    p_run.add_argument("--repeats", type=int, default=7)
+    p_run.add_argument("--warmup", type=int, default=1)
+    p_run.add_argument("--filter", help="only benchmarks containing this")
+    p_cmp = sub.add_parser("compare")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+    if args.cmd == "run":
+        run(args)
+    else:
+        sys.exit(compare(args))
@@ -6,10 +6,11 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.engine.board_array import BoardArray
-from src.engine.board_bitboard import BoardBitboard
+from src.engine.board_bitboard import BoardBitboard, MOVE_GENERATORS, set_move_generator
 
 nb_moves = 64
 iters = 5000
+random.seed(0)
 
 t0 = time.perf_counter()
 for i in range(iters):
@@ -25,42 +26,43 @@ t1 = time.perf_counter()
 
 print(f"BoardArray: {t1-t0:.4f}s for {iters} iterations")
 
-t0 = time.perf_counter()
-for i in range(iters):
-    bb = BoardBitboard()
-    for i in range(nb_moves):
-        color = 2 if i % 2 == 0 else 1
-        moves = bb.legal_moves(color)
-        if not moves:
-            break
-        move = random.choice(moves)
-        bb.apply_move(move, color)
-t1 = time.perf_counter()
-
-print(f"BoardBitboard: {t1-t0:.4f}s for {iters} iterations")
-
-
-# ------ debug
-"""
-ba = BoardArray()
-bb = BoardBitboard()
+for gen in MOVE_GENERATORS:
+    set_move_generator(gen)
+    t0 = time.perf_counter()
+    for i in range(iters):
+        bb = BoardBitboard()
+        for i in range(nb_moves):
+            color = 2 if i % 2 == 0 else 1
+            moves = bb.legal_moves(color)
+            if not moves:
+                break
+            move = random.choice(moves)
+            bb.apply_move(move, color)
+    t1 = time.perf_counter()
 
-for i in range(nb_moves):
-    color = 2 if i % 2 == 0 else 1
-    moves_a = set(ba.legal_moves(color))
-    moves_b = set(bb.legal_moves(color))
-    # print(moves_a)
-    # print(moves_b)
-    assert moves_a == moves_b
+    print(f"BoardBitboard [{gen}]: {t1-t0:.4f}s for {iters} iterations")
 
-    if not moves_a:
-        break
 
-    move = random.choice(list(moves_a))
-    flips_a = set(ba.apply_move(move, color))
-    flips_b = set(bb.apply_move(move, color))
-    assert flips_a == flips_b
+# ------ cross-check of each generator against BoardArray (passes included)
+for gen in MOVE_GENERATORS:
+    set_move_generator(gen)
+    for game in range(200):
+        ba = BoardArray()
+        bb = BoardBitboard()
+        color = 2
+        while True:
+            moves_a = set(ba.legal_moves(color))
+            moves_b = set(bb.legal_moves(color))
+            assert moves_a == moves_b, (gen, game)
+            if not moves_a:
+                color = 3 - color
+                if not ba.legal_moves(color):
+                    break
+                continue
+            move = random.choice(list(moves_a))
+            flips_a = set(ba.apply_move(move, color))
+            flips_b = set(bb.apply_move(move, color))
+            assert flips_a == flips_b, (gen, game)
+            color = 3 - color
+    print(f"BoardBitboard [{gen}]: matches BoardArray on 200 random games")
 
-for row in ba.board:
-    print(row)
-"""
@@ -0,0 +1,73 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ai.negamax import choose_move_negamax
+from src.ai.parallel import ParallelSearch
+from src.ai.probcut import ProbCut
+from random_positions import random_positions
+
+# The parallel search searches like the serial one : at a fixed depth, root
+# splitting returns the exact score of the serial search with the same
+# evaluation settings and PVS, Lazy SMP returns a result of the requested
+# depth, and the selective search options reach the workers
+depth = 4
+n_positions = 6
+SETTINGS = (
+    {"mode": "positional"},
+    {"mode": "mobility"},
+    {"weights": {"disc": 1.0, "pos": 0.5, "mob": 0.0, "front": 1.0}},
+    {"pvs": True},
+)
+# made up fits, only the cuts count here
+PROBCUT = ProbCut(
+    {("mixed", ph, d): [(d - 2, 1.0, 0.0, 5.0)] for ph in range(4) for d in (3, 4)}
+)
+
+
+if __name__ == "__main__":
+    positions = random_positions(n_positions, (8, 30))
+    with ParallelSearch(2, "root", tt_size_mb=4) as search:
+        for settings in SETTINGS:
+            for board, color in positions:
+                serial = choose_move_negamax(board, color, depth, **settings)[1]
+                search.tt.clear()
+                _, info = choose_move_negamax(
+                    board, color, depth, parallel=search, **settings
+                )
+                assert abs(info.score - serial.score) < 1e-9, (
+                    settings,
+                    info.score,
+                    serial.score,
+                )
+            print(f"{settings} : parallel scores match the serial search")
+
+        for search_mode in ("root", "lazy"):
+            search.mode = search_mode
+            board, color = positions[0]
+            search.tt.clear()
+            _, info = choose_move_negamax(
+                board, color, depth, parallel=search, probcut=PROBCUT, lmr=True
+            )
+            assert info.probcuts and info.reductions, info
+            print(
+                f"{search_mode} : {info.probcuts} probcuts, "
+                f"{info.reductions} reductions"
+            )
+
+        try:
+            choose_move_negamax(board, color, depth, parallel=search, progress=print)
+        except ValueError:
+            print("progress refused with parallel")
+        else:
+            raise AssertionError("progress accepted with parallel")
+
+    # helpers one ply deeper often complete first on shallow searches
+    with ParallelSearch(4, "lazy", tt_size_mb=4) as search:
+        for d in range(2, depth + 1):
+            for board, color in positions:
+                search.tt.clear()
+                _, info = choose_move_negamax(board, color, d, parallel=search)
+                assert info.depth == d, (d, info.depth)
+        print("lazy : results of the requested depth")
@@ -0,0 +1,79 @@
+import time
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.engine.board_array import BoardArray
+from src.engine.board_bitboard import BoardBitboard, MOVE_GENERATORS, set_move_generator
+from src.engine.perft import KNOWN_PERFT, perft
+
+array_depth = 6
+n_positions = 30
+
+
+def perft_array(ba, color: int, depth: int, passed: bool = False) -> int:
+    """
+    Reference perft on BoardArray, every move played on a copy
+    """
+    moves = ba.legal_moves(color)
+    if not moves:
+        if passed or depth == 1:
+            return 1
+        return perft_array(ba, 3 - color, depth - 1, True)
+    if depth == 1:
+        return len(moves)
+    n = 0
+    for move in moves:
+        child = BoardArray.__new__(BoardArray)
+        child.board = [row[:] for row in ba.board]
+        child.apply_move(move, color)
+        n += perft_array(child, 3 - color, depth - 1)
+    return n
+
+
+def to_array(bb) -> BoardArray:
+    ba = BoardArray()
+    for idx in range(64):
+        r, c = divmod(idx, 8)
+        ba.board[r][c] = 1 if bb.white >> idx & 1 else 2 if bb.black >> idx & 1 else 0
+    return ba
+
+
+# ------ start position : known counts & BoardArray
+t0 = time.perf_counter()
+for d in range(1, array_depth + 1):
+    assert perft_array(BoardArray(), 2, d) == KNOWN_PERFT[d]
+print(f"BoardArray perft 1..{array_depth} ok ({time.perf_counter() - t0:.1f}s)")
+
+# ------ seeded random positions, late ones with passes & finished games
+rng = random.Random(0)
+positions = []
+while len(positions) < n_positions:
+    bb, color = BoardBitboard(), 2
+    plies = rng.randrange(10, 60)
+    for _ in range(plies):
+        moves = bb.legal_moves(color)
+        if not moves:
+            color = 3 - color
+            moves = bb.legal_moves(color)
+            if not moves:
+                break
+        bb.apply_move(rng.choice(moves), color)
+        color = 3 - color
+    positions.append((bb, color))
+
+for gen in MOVE_GENERATORS:
+    set_move_generator(gen)
+    for d in range(1, array_depth + 1):
+        assert perft(BoardBitboard().black, BoardBitboard().white, d) == KNOWN_PERFT[d]
+    for bb, color in positions:
+        P = bb.white if color == 1 else bb.black
+        O = bb.black if color == 1 else bb.white
+        for d in (1, 2, 3, 4):
+            ref = perft_array(to_array(bb), color, d)
+            assert perft(P, O, d) == ref, (gen, d)
+            assert perft(P, O, d, table={}) == ref, (gen, d)
+    print(f"perft [{gen}] matches BoardArray on {n_positions} positions, depths 1..4")
+set_move_generator("kogge-stone")
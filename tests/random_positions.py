@@ -0,0 +1,66 @@
+import random
+
+from src.engine.board_bitboard import BoardBitboard, squares
+
+# Seeded random positions shared by the check and bench scripts, as
+# (BoardBitboard, color to move). Passes are played, plies count moves only.
+
+
+def random_position(rng: random.Random, plies: int = 60, empties: int = 0):
+    """
+    Position after `plies` random moves, or as soon as `empties` squares are
+    left. None if the side to move has no move there
+    """
+    bb, color = BoardBitboard(), 2
+    for _ in range(plies):
+        if 64 - (bb.white | bb.black).bit_count() <= empties:
+            break
+        moves = bb.legal_moves_bb(color)
+        if not moves:
+            color = 3 - color
+            moves = bb.legal_moves_bb(color)
+            if not moves:
+                return None
+        bb.make(rng.choice(list(squares(moves))), color)
+        color = 3 - color
+    if not bb.legal_moves_bb(color):
+        return None
+    return bb, color
+
+
+def random_positions(
+    n: int, plies: int | tuple[int, int] = 60, empties: int = 0, seed: int = 0
+):
+    """
+    n random positions, cf random_position. plies : a count or a (min, max)
+    range drawn per position
+    """
+    lo, hi = plies if isinstance(plies, tuple) else (plies, plies)
+    rng = random.Random(seed)
+    out = []
+    while len(out) < n:
+        pos = random_position(rng, rng.randint(lo, hi), empties)
+        if pos is not None:
+            out.append(pos)
+    return out
+
+
+def game_positions(n_games: int, seed: int = 0):
+    """
+    Every position of n_games random games, game over excluded
+    """
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n_games):
+        bb, color = BoardBitboard(), 2
+        while True:
+            moves = bb.legal_moves_bb(color)
+            if not moves:
+                color = 3 - color
+                moves = bb.legal_moves_bb(color)
+                if not moves:
+                    break
+            out.append((bb.copy(), color))
+            bb.make(rng.choice(list(squares(moves))), color)
+            color = 3 - color
+    return out